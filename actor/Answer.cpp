@@ -1,6 +1,9 @@
+#include <chrono>
 #include <iostream>
 #include <stdio.h>
+#include <stdlib.h>
 #include <string>
+#include <vector>
 
 #include "macros.h"
 
@@ -9,12 +12,16 @@
 #define N_PLAYERS 3
 #define N_TICKS 100
 
-#if TIME_OUTPUT
-    #include <time.h>
-    // CLOCK_MS_DIFF: returns the difference, in ms, between two clocks.
-    #define CLOCK_MS_DIFF(start, finish) \
-        ((double)(finish - start)) * 1000 / CLOCKS_PER_SEC
-#endif
+typedef std::chrono::steady_clock Clock;
+
+/**
+ * nsSince: Returns the time since `start`, in nanoseconds.
+ */
+static inline uint32_t nsSince(const Clock::time_point start)
+{
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        Clock::now() - start).count();
+}
 
 // Macro definition USE_TUNABLES should be provided by compiler flags.
 #ifndef INPUT_TUNABLES
@@ -28,187 +35,300 @@
 #include "actors/actor.hpp" // HurdlesActor, ArcheryActor, SkatingActor,
                             // DivingActor
 #include "polynomial.hpp" // Polynomial
-
-int main()
+#include "protocol.hpp" // TickInput, Action, TelemetryRecord, readTickText,
+                        // readTickBinary, writeAction, writeTelemetry
+
+/**
+ * chooseAction: Decides on an action for a single tick, by weighting each
+ * actor's costs with the given polynomials and picking the cheapest action.
+ * Each actor's processing time, in ns, is stored in `actorTimes`, unless it
+ * is NULL.
+ */
+Action chooseAction(const int tick, Actor** actors, Polynomial* weights,
+                    const TickInput& input, uint32_t* actorTimes)
 {
-    #if TIME_OUTPUT
-        clock_t clock_programStart = clock();
+    #if !PRINT_FINAL_COSTS
+        (void)tick;
     #endif
 
-    // initial information
-    int player_idx;
-    std::cin >> player_idx; std::cin.ignore();
-    int nGames;  // prefer N_GAMES macro
-    std::cin >> nGames; std::cin.ignore();
+    // For each game...
+    Costs netCosts;
+    for (int i = 0; i < N_GAMES; i++) {
 
-    // initialize score weights
-    Polynomial weights[N_GAMES];
-    #if INPUT_TUNABLES
-        // read in tunable weights from command command line
-        for (int i = 0; i < N_GAMES; i++)
-            std::cin >> weights[i].a
-                     >> weights[i].b
-                     >> weights[i].c
-                     >> weights[i].d;
-        std::cin.ignore();
-        // declare OK
-        std::cout << "INITIALIZED" << std::endl;
-    #else
-        #warning NOT using built-in tunables! Results will be invalid!
-        // built-in, hard-coded tunables
-        weights[0] = Polynomial( -0.48562301469285085,  14.560719309039953,  11.501279122760458,  15.919786940425276); // HurdlesActor
-        weights[1] = Polynomial(  0.015640058614165953,  0.03477142832844393, -2.6045582061099912, -3.6463286061008153); // ArcheryActor
-        weights[2] = Polynomial(  0.09721789666247926,  7.419701990195123,  1.65630939318324, -4.116144837869353); // SkatingActor
-        weights[3] = Polynomial(  1.8492198786838454,  15.839304318465024, -12.07666784285157,  9.434974481354772); // DivingActor
-    #endif
+        #if PRINT_FINAL_COSTS
+            // Debug -- show all final move costs
+            fprintf(stderr, "======================================\n");
+            fprintf(stderr, "Starting round %d\n", tick);
+        #endif
+
+        // ...take its game information...
+        const std::string gpu = gpuString(input.games[i]);
+        const int16_t* regs = input.games[i].regs;
 
+        Clock::time_point actorProcessingStart;
+        if (actorTimes != NULL)
+            actorProcessingStart = Clock::now();
 
+        // ...decide if it's good...
+        Costs costs = Costs(0);
+        if (gpu.compare("GAME_OVER") != 0)
+            // ...and either forward it accordingly...
+            costs = actors[i]->getCosts(gpu, regs);
+        else
+            // ...or reset if needed.
+            actors[i]->reset();
 
+        // accumulate weights
+        const Costs weightedVoteCosts = weights[i].evaluate(costs);
+        const Costs finalCosts = costs * weightedVoteCosts;
 
+        #if PRINT_FINAL_COSTS
+            // Debug -- show all final move costs
+            fprintf(stderr, "Costs for game %d:\n", i);
+            fprintf(stderr,
+                "Move   Base   Weight  NET\n"
+                " UP    %+6.2f *%+6.2f =%+6.2f\n"
+                " DOWN  %+6.2f *%+6.2f =%+6.2f\n"
+                " LEFT  %+6.2f *%+6.2f =%+6.2f\n"
+                " RIGHT %+6.2f *%+6.2f =%+6.2f\n"
+                "--------------------------------------\n",
+                costs.UP,    weightedVoteCosts.UP,    finalCosts.UP,
+                costs.DOWN,  weightedVoteCosts.DOWN,  finalCosts.DOWN,
+                costs.LEFT,  weightedVoteCosts.LEFT,  finalCosts.LEFT,
+                costs.RIGHT, weightedVoteCosts.RIGHT, finalCosts.RIGHT);
+        #endif
+
+        if (actorTimes != NULL)
+            actorTimes[i] = nsSince(actorProcessingStart);
+
+        // Finally, Sum up costs across all these games...
+        netCosts += finalCosts;
+    }
+
+    #if PRINT_FINAL_COSTS
+        // Debug -- show all final move costs
+        fprintf(stderr, "NET COSTS:\n");
+        fprintf(stderr, " UP    %+6.2f\n DOWN  %+6.2f\n" \
+                        " LEFT  %+6.2f\n RIGHT %+6.2f\n",
+                        netCosts.UP,   netCosts.DOWN,
+                        netCosts.LEFT, netCosts.RIGHT);
+    #endif
+
+    // ...and pick the option with the lowest cost.
+    // Prefers UP, then DOWN, then LEFT, then RIGHT, if tie.
+    if      (netCosts.UP <= netCosts.DOWN
+          && netCosts.UP <= netCosts.LEFT
+          && netCosts.UP <= netCosts.RIGHT)
+        return ACTION_UP;
+    else if (netCosts.DOWN <= netCosts.UP
+          && netCosts.DOWN <= netCosts.LEFT
+          && netCosts.DOWN <= netCosts.RIGHT)
+        return ACTION_DOWN;
+    else if (netCosts.LEFT <= netCosts.UP
+          && netCosts.LEFT <= netCosts.DOWN
+          && netCosts.LEFT <= netCosts.RIGHT)
+        return ACTION_LEFT;
+    else // (netCosts.RIGHT <= netCosts.UP
+    //    && netCosts.RIGHT <= netCosts.DOWN
+    //    && netCosts.RIGHT <= netCosts.LEFT)
+        return ACTION_RIGHT;
+}
+
+/**
+ * playGame: Plays a single game of N_TICKS ticks as player `player_idx`,
+ * weighting each actor's costs with the given polynomials. Uses the binary
+ * protocol (see protocol.hpp) if `binary` is set, or the text protocol. If
+ * `telemetry` is set, every action is followed by the tick's timings, see
+ * TelemetryRecord.
+ */
+void playGame(const int player_idx, Polynomial* weights, const bool binary,
+              const bool telemetry)
+{
+    #if TIME_OUTPUT
+        Clock::time_point programStart = Clock::now();
+    #endif
+    const bool timed = telemetry || TIME_OUTPUT;
 
     // initialize actors
-    Actor* actors[N_GAMES];
-    actors[0] = new HurdlesActor(player_idx);
-    actors[1] = new ArcheryActor(player_idx);
-    actors[2] = new SkatingActor(player_idx);
-    actors[3] = new DivingActor( player_idx);
+    HurdlesActor hurdles(player_idx);
+    ArcheryActor archery(player_idx);
+    SkatingActor skating(player_idx);
+    DivingActor  diving( player_idx);
+    Actor* actors[N_GAMES] = { &hurdles, &archery, &skating, &diving };
 
     #if TIME_OUTPUT
-        clock_t clock_initFinish = clock();
-        double ms_init = CLOCK_MS_DIFF(clock_programStart, clock_initFinish);
-        fprintf(stderr, "Init took %.3f ms\n", ms_init);
-        // container for loop timings
-        double actorTimes[N_GAMES] = {0};
+        fprintf(stderr, "Init took %.3f ms\n", nsSince(programStart) / 1e6);
     #endif
+    // loop timings, if timed
+    TelemetryRecord record = {};
 
     // game loop
     for (int tick = 0; tick < N_TICKS; tick++) {
 
-        #if TIME_OUTPUT
-            clock_t clock_loopStart = clock();
-        #endif
-
-        // read in score information
-        int32_t playerScores[N_PLAYERS];
-        int8_t playerMedals[N_PLAYERS][N_GAMES][N_MEDALS];
-        for (int i = 0; i < N_PLAYERS; i++) {
-            std::cin >> playerScores[i];
-            for (int k = 0; k < N_GAMES; k++)
-                for (int j = 0; j < N_MEDALS; j++)
-                    std::cin >> playerMedals[i][k][j];
+        // wait for the tick, so that only its processing is timed
+        Clock::time_point loopStart;
+        if (timed) {
+            if (!waitForTick(binary))
+                return;
+            loopStart = Clock::now();
         }
-        std::cin.ignore();
-        //TODO do something with this
-
-        // For each game...
-        Costs netCosts;
-        for (int i = 0; i < N_GAMES; i++) {
-
-            #if PRINT_FINAL_COSTS
-                // Debug -- show all final move costs
-                fprintf(stderr, "======================================\n");
-                fprintf(stderr, "Starting round %d\n", tick);
-            #endif
-
-            // ...read in its game information...
-            std::string gpu;
-            int16_t regs[7];
-            std::cin >> gpu >> regs[0] >> regs[1] >> \
-                               regs[2] >> regs[3] >> \
-                               regs[4] >> regs[5] >> \
-                               regs[6];
-            std::cin.ignore();
 
-            #if TIME_OUTPUT
-                clock_t clock_actorProcessingStart = clock();
-            #endif
-
-            // ...decide if it's good...
-            Costs costs = Costs(0);
-            if (gpu.compare("GAME_OVER") != 0)
-                // ...and either forward it accordingly...
-                costs = actors[i]->getCosts(gpu, regs);
-            else
-                // ...or reset if needed.
-                actors[i]->reset();
-
-            // accumulate weights
-            const Costs weightedVoteCosts = weights[i].evaluate(costs);
-            const Costs finalCosts = costs * weightedVoteCosts;
-
-            #if PRINT_FINAL_COSTS
-                // Debug -- show all final move costs
-                fprintf(stderr, "Costs for game %d:\n", i);
-                fprintf(stderr,
-                    "Move   Base   Weight  NET\n"
-                    " UP    %+6.2f *%+6.2f =%+6.2f\n"
-                    " DOWN  %+6.2f *%+6.2f =%+6.2f\n"
-                    " LEFT  %+6.2f *%+6.2f =%+6.2f\n"
-                    " RIGHT %+6.2f *%+6.2f =%+6.2f\n"
-                    "--------------------------------------\n",
-                    costs.UP,    weightedVoteCosts.UP,    finalCosts.UP,
-                    costs.DOWN,  weightedVoteCosts.DOWN,  finalCosts.DOWN,
-                    costs.LEFT,  weightedVoteCosts.LEFT,  finalCosts.LEFT,
-                    costs.RIGHT, weightedVoteCosts.RIGHT, finalCosts.RIGHT);
-            #endif
-
-            #if TIME_OUTPUT
-                clock_t clock_actorProcessingStop = clock();
-                double ms_actorProcessing = CLOCK_MS_DIFF(
-                    clock_actorProcessingStart,
-                    clock_actorProcessingStop);
-                actorTimes[i] = ms_actorProcessing;
-            #endif
-
-            // Finally, Sum up costs across all these games...
-            netCosts += finalCosts;
-        }
-
-        #if PRINT_FINAL_COSTS
-            // Debug -- show all final move costs
-            fprintf(stderr, "NET COSTS:\n");
-            fprintf(stderr, " UP    %+6.2f\n DOWN  %+6.2f\n" \
-                            " LEFT  %+6.2f\n RIGHT %+6.2f\n",
-                            netCosts.UP,   netCosts.DOWN,
-                            netCosts.LEFT, netCosts.RIGHT);
-        #endif
-
-        // ...and pick the option with the lowest cost.
-        // Prefers UP, then DOWN, then LEFT, then RIGHT, if tie.
-        if      (netCosts.UP <= netCosts.DOWN
-              && netCosts.UP <= netCosts.LEFT
-              && netCosts.UP <= netCosts.RIGHT)
-            printf("UP\n");
-        else if (netCosts.DOWN <= netCosts.UP
-              && netCosts.DOWN <= netCosts.LEFT
-              && netCosts.DOWN <= netCosts.RIGHT)
-            printf("DOWN\n");
-        else if (netCosts.LEFT <= netCosts.UP
-              && netCosts.LEFT <= netCosts.DOWN
-              && netCosts.LEFT <= netCosts.RIGHT)
-            printf("LEFT\n");
-        else // (netCosts.RIGHT <= netCosts.UP
-        //    && netCosts.RIGHT <= netCosts.DOWN
-        //    && netCosts.RIGHT <= netCosts.LEFT)
-            printf("RIGHT\n");
+        // read in score information and game information
+        TickInput input;
+        if (!(binary ? readTickBinary(input) : readTickText(input)))
+            return;
+        //TODO do something with scores and medals
+        if (timed)
+            record.parse_ns = nsSince(loopStart);
+
+        // decide on an action, and send it
+        const Action action = chooseAction(tick, actors, weights, input,
+                                           timed ? record.costs_ns : NULL);
+        if (timed)
+            record.total_ns = nsSince(loopStart);
+        writeAction(action, binary, !telemetry);
+        if (telemetry)
+            writeTelemetry(record, binary);
 
         #if TIME_OUTPUT
-            clock_t clock_loopStop = clock();
-            const double ms_gameloop = CLOCK_MS_DIFF(
-                clock_loopStart,
-                clock_loopStop);
-            const double ms_net = actorTimes[0] + actorTimes[1]
-                                + actorTimes[2] + actorTimes[3];
+            const uint32_t* actorTimes = record.costs_ns;
+            const double ms_net = (actorTimes[0] + actorTimes[1]
+                                 + actorTimes[2] + actorTimes[3]) / 1e6;
 
             fprintf(stderr, "======================================\n");
-            fprintf(stderr, "Loop %d total took:  %.3f ms\n", tick, ms_gameloop);
-            fprintf(stderr, "  HurdlesActor took:  %.3f ms\n", actorTimes[0]);
-            fprintf(stderr, "  ArcheryActor took:  %.3f ms\n", actorTimes[1]);
-            fprintf(stderr, "  SkatingActor took:  %.3f ms\n", actorTimes[2]);
-            fprintf(stderr, "  DivingActor took:   %.3f ms\n", actorTimes[3]);
-            fprintf(stderr, "  Net intermediate:   %.3f ms\n", ms_gameloop - ms_net);
+            fprintf(stderr, "Loop %d total took:  %.3f ms\n", tick, record.total_ns / 1e6);
+            fprintf(stderr, "  Parsing took:       %.3f ms\n", record.parse_ns / 1e6);
+            fprintf(stderr, "  HurdlesActor took:  %.3f ms\n", actorTimes[0] / 1e6);
+            fprintf(stderr, "  ArcheryActor took:  %.3f ms\n", actorTimes[1] / 1e6);
+            fprintf(stderr, "  SkatingActor took:  %.3f ms\n", actorTimes[2] / 1e6);
+            fprintf(stderr, "  DivingActor took:   %.3f ms\n", actorTimes[3] / 1e6);
+            fprintf(stderr, "  Net intermediate:   %.3f ms\n", record.total_ns / 1e6 - ms_net);
         #endif
 
     }
+}
+
+/**
+ * Slot: A single actor instance hosted by a multiplexed process, with its own
+ * player index and weights.
+ */
+struct Slot
+{
+    Slot(const int player_idx) :
+        hurdles(player_idx), archery(player_idx),
+        skating(player_idx), diving(player_idx),
+        actors{ &hurdles, &archery, &skating, &diving } {}
+
+    HurdlesActor hurdles;
+    ArcheryActor archery;
+    SkatingActor skating;
+    DivingActor  diving;
+    Actor* actors[N_GAMES];
+    Polynomial weights[N_GAMES];
+};
+
+/**
+ * serveMultiplexed: Hosts many independent actor instances in this process,
+ * and answers batches of their ticks with a single write. See SlotInit and
+ * SlotTick in protocol.hpp. Runs until EOF.
+ */
+void serveMultiplexed()
+{
+    std::vector<Slot*> slots;
+    std::vector<uint8_t> replies;
+    int command;
+    while ((command = getchar()) != EOF) {
+        if (command == MULTIPLEX_INIT) {
+            // (re-)initialize a slot
+            SlotInit init;
+            if (fread(&init, sizeof(SlotInit), 1, stdin) != 1)
+                break;
+            if (init.slot >= slots.size())
+                slots.resize(init.slot + 1, NULL);
+            delete slots[init.slot];
+            slots[init.slot] = new Slot(init.player_idx);
+            for (int i = 0; i < N_GAMES; i++)
+                slots[init.slot]->weights[i] = Polynomial(
+                    init.weights[i][0], init.weights[i][1],
+                    init.weights[i][2], init.weights[i][3]);
+        } else if (command == MULTIPLEX_TICK) {
+            // answer a batch of ticks
+            uint16_t count;
+            if (fread(&count, sizeof(uint16_t), 1, stdin) != 1)
+                break;
+            replies.resize(count);
+            for (int k = 0; k < count; k++) {
+                SlotTick tick;
+                if (fread(&tick, sizeof(SlotTick), 1, stdin) != 1)
+                    return;
+                Slot* slot = tick.slot < slots.size() ? slots[tick.slot] : NULL;
+                if (slot == NULL)
+                    replies[k] = MULTIPLEX_BAD_SLOT;
+                else
+                    replies[k] = chooseAction(0, slot->actors, slot->weights,
+                                              tick.input, NULL);
+            }
+            fwrite(replies.data(), 1, count, stdout);
+            fflush(stdout);
+        } else {
+            fprintf(stderr, "Unknown multiplex command %d\n", command);
+            break;
+        }
+    }
+    for (size_t i = 0; i < slots.size(); i++)
+        delete slots[i];
+}
+
+int main(int argc, char** argv)
+{
+    // `--binary` switches ticks to the packed binary protocol (see
+    // protocol.hpp). without it, the text protocol of the game servers is used.
+    // `--multiplex` hosts many actor instances in this one process instead,
+    // see serveMultiplexed.
+    bool binary = false;
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--binary") == 0)
+            binary = true;
+        if (strcmp(argv[i], "--multiplex") == 0) {
+            serveMultiplexed();
+            return 0;
+        }
+    }
 
+    // initial information. the header may be re-sent after a game finishes
+    // to re-seed this process with a new player index and new genes (the
+    // "reset" handshake), so that one process can play many games in a row.
+    int player_idx;
+    while (std::cin >> player_idx) {
+        std::cin.ignore();
+        int nGames;  // prefer N_GAMES macro
+        std::cin >> nGames;
+        // optional flags, on the same line; see ACTOR_FLAG_TELEMETRY
+        std::string flags;
+        std::getline(std::cin, flags);
+        const bool telemetry = atoi(flags.c_str()) & ACTOR_FLAG_TELEMETRY;
+
+        // initialize score weights
+        Polynomial weights[N_GAMES];
+        #if INPUT_TUNABLES
+            // read in tunable weights from command command line
+            for (int i = 0; i < N_GAMES; i++)
+                std::cin >> weights[i].a
+                         >> weights[i].b
+                         >> weights[i].c
+                         >> weights[i].d;
+            std::cin.ignore();
+            // declare OK
+            std::cout << "INITIALIZED" << std::endl;
+        #else
+            #warning NOT using built-in tunables! Results will be invalid!
+            // built-in, hard-coded tunables
+            weights[0] = Polynomial( -0.48562301469285085,  14.560719309039953,  11.501279122760458,  15.919786940425276); // HurdlesActor
+            weights[1] = Polynomial(  0.015640058614165953,  0.03477142832844393, -2.6045582061099912, -3.6463286061008153); // ArcheryActor
+            weights[2] = Polynomial(  0.09721789666247926,  7.419701990195123,  1.65630939318324, -4.116144837869353); // SkatingActor
+            weights[3] = Polynomial(  1.8492198786838454,  15.839304318465024, -12.07666784285157,  9.434974481354772); // DivingActor
+        #endif
+
+        playGame(player_idx, weights, binary, telemetry);
+    }
 }
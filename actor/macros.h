@@ -10,7 +10,8 @@
 #define PRINT_FINAL_COSTS false
 
 // TIME_OUTPUT: whether or not to time each part of execution and print their
-// timings to stderr.
+// timings to stderr. (Timings can also be sent to the harness at runtime, see
+// ACTOR_FLAG_TELEMETRY in protocol.hpp.)
 #define TIME_OUTPUT false
 
 #endif // MACROS_H
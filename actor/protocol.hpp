@@ -0,0 +1,185 @@
+#ifndef PROTOCOL_H
+#define PROTOCOL_H
+
+#include <iostream>
+#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+#include <string>
+
+// Requires N_GAMES, N_MEDALS and N_PLAYERS to be defined by the includer.
+
+// BINARY_GPU_LENGTH: fixed size of a GPU string in the binary protocol. GPUs
+// shorter than this are padded with '\0's.
+#define BINARY_GPU_LENGTH 32
+
+/**
+ * Action: The four possible actions, with the values used by the binary
+ *         protocol's one-byte reply.
+ */
+enum Action : uint8_t
+{
+    ACTION_UP    = 0,
+    ACTION_DOWN  = 1,
+    ACTION_LEFT  = 2,
+    ACTION_RIGHT = 3,
+};
+
+#pragma pack(push, 1)
+/**
+ * GameInput: A single minigame's GPU and registers.
+ */
+struct GameInput
+{
+    char gpu[BINARY_GPU_LENGTH];
+    int16_t regs[7];
+};
+
+/**
+ * TickInput: Everything read in a single tick. In binary mode, this struct is
+ *            read as-is from stdin (little-endian, no padding).
+ */
+struct TickInput
+{
+    int32_t scores[N_PLAYERS];
+    uint8_t medals[N_PLAYERS][N_GAMES][N_MEDALS];
+    GameInput games[N_GAMES];
+};
+
+/**
+ * TelemetryRecord: Per-tick timings, in nanoseconds, sent right after the
+ *                  action when telemetry is enabled in the header: the time
+ *                  to parse the tick, each actor's getCosts, and the whole
+ *                  tick up to the action. In binary mode, this struct is
+ *                  written as-is; in text mode, as a line of its six numbers.
+ */
+struct TelemetryRecord
+{
+    uint32_t parse_ns;
+    uint32_t costs_ns[N_GAMES];
+    uint32_t total_ns;
+};
+
+/**
+ * SlotInit: Multiplexed mode -- (re-)initializes the actor instance in
+ *           `slot` as player `player_idx`, with the given tunable weights.
+ *           Follows a MULTIPLEX_INIT command byte. Has no reply.
+ */
+struct SlotInit
+{
+    uint16_t slot;
+    uint8_t player_idx;
+    double weights[N_GAMES][4];
+};
+
+/**
+ * SlotTick: Multiplexed mode -- a single tick for the actor in `slot`. A
+ *           MULTIPLEX_TICK command byte is followed by a uint16_t count and
+ *           that many SlotTicks; the reply is one Action byte per SlotTick,
+ *           in order, or MULTIPLEX_BAD_SLOT for uninitialized slots.
+ */
+struct SlotTick
+{
+    uint16_t slot;
+    TickInput input;
+};
+#pragma pack(pop)
+
+#define MULTIPLEX_INIT 'I'
+#define MULTIPLEX_TICK 'T'
+#define MULTIPLEX_BAD_SLOT 0xFF
+
+// ACTOR_FLAG_TELEMETRY: header flag, see TelemetryRecord.
+#define ACTOR_FLAG_TELEMETRY 1
+
+/**
+ * waitForTick: Blocks until the next tick starts arriving, so that it can be
+ *              timed without the wait. Returns false on EOF.
+ */
+inline bool waitForTick(const bool binary)
+{
+    if (!binary)
+        return std::cin.peek() != EOF;
+    const int c = getchar();
+    return c != EOF && ungetc(c, stdin) != EOF;
+}
+
+/**
+ * readTickText: Reads a tick in the text protocol, as sent by the game
+ *               servers. Returns false on EOF.
+ */
+inline bool readTickText(TickInput& input)
+{
+    // read in score information
+    for (int i = 0; i < N_PLAYERS; i++) {
+        std::cin >> input.scores[i];
+        for (int k = 0; k < N_GAMES; k++)
+            for (int j = 0; j < N_MEDALS; j++) {
+                int medals;
+                std::cin >> medals;
+                input.medals[i][k][j] = medals;
+            }
+    }
+    std::cin.ignore();
+
+    // read in each game's information
+    for (int i = 0; i < N_GAMES; i++) {
+        std::string gpu;
+        std::cin >> gpu >> input.games[i].regs[0] >> input.games[i].regs[1] >> \
+                           input.games[i].regs[2] >> input.games[i].regs[3] >> \
+                           input.games[i].regs[4] >> input.games[i].regs[5] >> \
+                           input.games[i].regs[6];
+        std::cin.ignore();
+        strncpy(input.games[i].gpu, gpu.c_str(), BINARY_GPU_LENGTH);
+    }
+    return bool(std::cin);
+}
+
+/**
+ * readTickBinary: Reads a tick in the binary protocol. Returns false on EOF.
+ */
+inline bool readTickBinary(TickInput& input)
+{
+    return fread(&input, sizeof(TickInput), 1, stdin) == 1;
+}
+
+/**
+ * gpuString: Returns a game's GPU as a string, without its padding.
+ */
+inline std::string gpuString(const GameInput& game)
+{
+    return std::string(game.gpu, strnlen(game.gpu, BINARY_GPU_LENGTH));
+}
+
+/**
+ * writeAction: Writes the chosen action, either as a word in the text
+ *              protocol or as a single byte in the binary protocol. Unless
+ *              `flush` is unset, eg. because more follows, it is sent at once.
+ */
+inline void writeAction(const Action action, const bool binary, const bool flush = true)
+{
+    static const char* const names[] = { "UP", "DOWN", "LEFT", "RIGHT" };
+    if (binary)
+        putchar(action);
+    else
+        printf("%s\n", names[action]);
+    if (flush)
+        fflush(stdout);
+}
+
+/**
+ * writeTelemetry: Writes a tick's TelemetryRecord, and sends it along with
+ *                 the action before it.
+ */
+inline void writeTelemetry(const TelemetryRecord& record, const bool binary)
+{
+    if (binary)
+        fwrite(&record, sizeof(TelemetryRecord), 1, stdout);
+    else
+        printf("%u %u %u %u %u %u\n", record.parse_ns,
+               record.costs_ns[0], record.costs_ns[1],
+               record.costs_ns[2], record.costs_ns[3], record.total_ns);
+    fflush(stdout);
+}
+
+#endif // PROTOCOL_H
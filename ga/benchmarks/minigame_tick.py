@@ -0,0 +1,56 @@
+"""
+Microbenchmark of the minigames' per-tick overhead: drives all four
+minigames the way :class:`GameManager` does (reset on game over, GPU and
+registers, tick, game over check, rankings), with random actions, and
+reports the time per tick.
+
+Only the minigames' public interface is used. Every repeat draws its
+scenarios and actions from a fresh ``random.Random(0)``, so repeats do the
+same work, and the global :mod:`random` state is left alone.
+
+Run from the `ga/` directory:
+    python -m benchmarks.minigame_tick [n_ticks] [n_repeats]
+"""
+import sys
+import time
+import random
+
+from game.minigames import \
+    PlayerAction, HurdlesGame, ArcheryGame, SkatingGame, DivingGame
+
+
+ACTIONS = [ PlayerAction.UP, PlayerAction.DOWN,
+            PlayerAction.LEFT, PlayerAction.RIGHT ]
+
+
+def run(n_ticks: int, rng: random.Random) -> float:
+    """ Plays :const:`n_ticks` ticks of all four minigames; returns seconds. """
+    minigames = [ HurdlesGame(rng), ArcheryGame(rng), SkatingGame(rng), DivingGame(rng) ]
+    for minigame in minigames:
+        minigame.reset()
+    # actions are drawn up front, so only the minigames are timed
+    all_actions = [ [ rng.choice(ACTIONS) for _ in range(3) ]
+                    for _ in range(n_ticks) ]
+
+    start = time.perf_counter()
+    for actions in all_actions:
+        for minigame in minigames:
+            if minigame.should_reset:
+                minigame.reset()
+                minigame.should_reset = False
+            minigame.get_gpu()
+            minigame.fill_registers()
+        for minigame in minigames:
+            minigame.tick(actions)
+            if minigame.is_game_over():
+                minigame.should_reset = True
+                minigame.get_rankings()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    best = min(run(n_ticks, random.Random(0)) for _ in range(n_repeats))
+    print(f"{n_ticks} ticks of 4 minigames, best of {n_repeats}: "
+          f"{best:.3f}s, {best / n_ticks * 1e6:.2f} us/tick")
@@ -0,0 +1,88 @@
+"""
+Benchmark of racing evaluation (see :meth:`PlayerManager.race`) against
+playing every game uniformly at random, on the same populations.
+
+For each of a few random populations, a long uniform evaluation picks the
+reference parent set, the top :const:`TOP_PERCENT_BREED` by total score.
+Then a uniform evaluation and a race with the same game budget each pick a
+parent set, as :meth:`PlayerManager.breed` would (by total score, or by mean
+score per game for the race); reported are the games each played, and the mean overlap of
+their parent sets with the reference one. Games are played in-process, by
+the Python actor.
+
+Run from the `ga/` directory:
+    python -m benchmarks.racing [n_players] [n_games] [n_stages] [n_populations]
+"""
+import sys
+import numpy as np
+
+from game.player_manager import PlayerManager, PlayerSubset, Job
+from game.worker_pool import _play_game
+
+from typing import List, Dict, Set
+
+
+TOP_PERCENT_BREED = 0.10
+
+
+def play(player_manager: PlayerManager, jobs: List[Job]) -> List[Dict[int, int]]:
+    """ Plays :const:`jobs` in-process, on the population's current genes. """
+    results = []
+    for gene_idxs, seed in jobs:
+        subset = PlayerSubset.from_genes(
+            do_debug_printing  = False,
+            do_info_printing   = False,
+            executable_path    = '',
+            gene_frame         = player_manager.gene_history[-1],
+            gene_idxs          = gene_idxs,
+            actor_backend      = 'python')
+        results.append(_play_game(subset, seed, None, 100, False, False))
+    return results
+
+
+def parents(player_manager: PlayerManager) -> Set[int]:
+    """ The players :meth:`PlayerManager.breed` would pick parents from. """
+    return set(player_manager.parent_pool().tolist())
+
+
+if __name__ == '__main__':
+    n_players = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    n_games = int(sys.argv[2]) if len(sys.argv) > 2 else 2048
+    n_stages = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    n_populations = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+
+    print(f"{n_players} players, {n_games} games budget, {n_stages} racing stages")
+    print(f"{'population':>10}  {'uniform games':>13}  {'overlap':>7}  {'race games':>10}  {'overlap':>7}")
+    overlaps = { 'uniform': [], 'race': [] }
+    games = { 'uniform': [], 'race': [] }
+    for population in range(n_populations):
+        player_manager = PlayerManager(
+            do_debug_printing  = False,
+            do_info_printing   = False,
+            executable_path    = '',
+            n_players          = n_players,
+            n_genes            = 16,
+            visualize_every    = 1,
+            rare_mut_chance    = 0.0,
+            top_percent_breed  = TOP_PERCENT_BREED,
+            seed               = population)
+
+        for scores in play(player_manager, player_manager.choose_jobs(8 * n_games)):
+            player_manager.update_scores(scores)
+        reference = parents(player_manager)
+
+        player_manager._clear_player_metadata()
+        for scores in play(player_manager, player_manager.choose_jobs(n_games)):
+            player_manager.update_scores(scores)
+        overlaps['uniform'].append(len(parents(player_manager) & reference) / len(reference))
+        games['uniform'].append(n_games)
+
+        player_manager._clear_player_metadata()
+        n_raced = player_manager.race(lambda jobs: play(player_manager, jobs), n_games, n_stages)
+        overlaps['race'].append(len(parents(player_manager) & reference) / len(reference))
+        games['race'].append(n_raced)
+
+        print(f"{population:>10}  {games['uniform'][-1]:>13}  {overlaps['uniform'][-1]:>7.0%}  "
+              f"{games['race'][-1]:>10}  {overlaps['race'][-1]:>7.0%}")
+    print(f"{'mean':>10}  {np.mean(games['uniform']):>13.0f}  {np.mean(overlaps['uniform']):>7.0%}  "
+          f"{np.mean(games['race']):>10.0f}  {np.mean(overlaps['race']):>7.0%}")
@@ -0,0 +1,88 @@
+"""
+Benchmark of how stable the fitness ranking of a population is, against the
+number of games played, with and without a shared :class:`ScenarioBank`.
+
+A fixed random population is evaluated several times over, each time with
+fresh matchups. Stability at a game count is the mean Spearman rank
+correlation of players' mean scores between every pair of evaluations;
+accuracy is their mean correlation with a much longer evaluation on fresh
+scenarios. Games are played in-process, by the Python actor.
+
+Run from the `ga/` directory:
+    python -m benchmarks.rank_stability [n_players] [n_repeats] [game counts...]
+"""
+import sys
+import random
+import itertools
+import numpy as np
+
+from game.player_manager import PlayerSubset
+from game.scenarios import ScenarioBank
+from game.worker_pool import _play_game
+
+from typing import Optional
+
+
+def mean_scores(gene_frame: np.ndarray, n_games: int, rng: random.Random,
+                scenarios: Optional[ScenarioBank]) -> np.ndarray:
+    """ Plays :const:`n_games` random games; returns each player's mean score. """
+    n_players = gene_frame.shape[1]
+    totals = np.zeros(n_players)
+    counts = np.zeros(n_players)
+    for game_i in range(n_games):
+        gene_idxs = tuple(rng.sample(range(n_players), 3))
+        subset = PlayerSubset.from_genes(
+            do_debug_printing  = False,
+            do_info_printing   = False,
+            executable_path    = '',
+            gene_frame         = gene_frame,
+            gene_idxs          = gene_idxs,
+            actor_backend      = 'python')
+        scores = _play_game(subset, rng.getrandbits(32), None, 100,
+                            False, False, scenarios)
+        for gene_idx, score in scores.items():
+            totals[gene_idx] += score
+            counts[gene_idx] += 1
+    return totals / np.maximum(counts, 1)
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+if __name__ == '__main__':
+    n_players = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    n_repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    game_counts = [ int(arg) for arg in sys.argv[3:] ] or [ 32, 64, 128, 256 ]
+
+    gene_frame = np.random.default_rng(0).uniform(-10.0, 10.0, (16, n_players))
+    # reference ranking: many games, fresh scenarios
+    n_reference = 8 * max(game_counts)
+    reference = mean_scores(gene_frame, n_reference, random.Random(-1), None)
+
+    # fresh: every game draws its own scenarios. shared bank: all
+    # evaluations play the same bank, so only the matchups vary. new bank:
+    # every evaluation draws its own bank
+    modes = ( 'fresh', 'shared bank', 'new bank' )
+    print(f"{n_players} players, {n_repeats} evaluations per cell")
+    print(f"stability: mean pairwise Spearman correlation between evaluations")
+    print(f"accuracy: mean Spearman correlation with a {n_reference}-game fresh evaluation")
+    print(f"{'games':>6}" + ''.join(f"  {mode + ' stab.':>16}  {mode + ' acc.':>15}" for mode in modes))
+    for n_games in game_counts:
+        row = []
+        for mode in modes:
+            rng = random.Random(n_games)
+            shared = ScenarioBank.generate(rng, 16)
+            evaluations = []
+            for repeat in range(n_repeats):
+                scenarios = { 'fresh':        None,
+                              'shared bank':  shared,
+                              'new bank':     ScenarioBank.generate(rng, 16) }[mode]
+                evaluations.append(mean_scores(gene_frame, n_games, rng, scenarios))
+            row.append(np.mean([ spearman(a, b)
+                                 for a, b in itertools.combinations(evaluations, 2) ]))
+            row.append(np.mean([ spearman(a, reference) for a in evaluations ]))
+        print(f"{n_games:>6}" + ''.join(f"  {value:>16.3f}  {accuracy:>15.3f}"
+                                        for value, accuracy in zip(row[0::2], row[1::2])))
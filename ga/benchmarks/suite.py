@@ -0,0 +1,301 @@
+"""
+Throughput benchmarks for every layer of the simulator, from a single
+minigame up to a whole generation on the worker pool:
+
+- ``minigame.<name>``: each minigame's reset/tick loop, driven the way
+  :class:`GameManager` does, in ticks per second;
+- ``minigame.create_rankings``: :meth:`Minigame._create_rankings`, in calls
+  per second;
+- ``game_manager.tick``: :meth:`GameManager.tick` against an in-process
+  loopback actor that encodes every state but always plays UP, so only the
+  harness' own overhead is measured, in ticks per second;
+- ``replay``: re-simulating the matches of a given trace file (see
+  `tools/replay.py`), a fixed workload for the minigames, in ticks per
+  second;
+- ``match.<backend>``: whole 100-tick matches against the real actor
+  binary, in matches per second;
+- ``generation.workers_<n>``: games per second over a whole generation on a
+  :class:`WorkerPool` of each given size, not counting worker start-up.
+
+Everything is seeded, so runs do the same work. Results are written as
+JSON; given a baseline (a previous run's JSON), every benchmark's throughput
+is compared against it, and the exit status is 1 if any fell by more than
+the tolerance. Only a baseline from the same Python version and CPU count,
+and with the same ``--quick``, gates (see :const:`MATCHED_MACHINE_INFO`);
+otherwise the comparison is shown, but nothing counts as a regression.
+Those fields don't tell machines apart, so record a baseline on the machine
+that will be compared against it. The one in this directory is a sample,
+from a single-CPU machine, so it has no multi-worker entries.
+
+Run from the `ga/` directory:
+    python -m benchmarks.suite [--exe PATH] [--out results.json]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.15] [--quick]
+        [--trace path/to/trace.cgtr]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import numpy as np
+
+from game.minigames import PlayerAction, MINIGAME_TYPES, HurdlesGame
+from game.game_manager import GameManager
+from game.player import Player, ActorPool, TickState
+from game.player_manager import PlayerSubset, PLAYER_BACKENDS
+from game.worker_pool import WorkerPool, _play_game
+from game.trace import read_trace
+from game.replay import replay_match
+
+from typing import List, Dict, Callable, Any, Optional
+
+
+ACTIONS = [ PlayerAction.UP, PlayerAction.DOWN,
+            PlayerAction.LEFT, PlayerAction.RIGHT ]
+
+
+def best_rate(run: Callable[[], int], repeats: int) -> float:
+    """
+    Calls :const:`run`, which returns how many operations it did, a number
+    of times; returns the best rate, in operations per second.
+    """
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        n_ops = run()
+        best = max(best, n_ops / (time.perf_counter() - start))
+    return best
+
+
+def bench_minigame(minigame_type: type, n_ticks: int) -> Callable[[], int]:
+    """ A minigame's reset/tick loop, with random actions drawn up front. """
+    rng = random.Random(0)
+    all_actions = [ [ rng.choice(ACTIONS) for _ in range(3) ] for _ in range(n_ticks) ]
+    def run() -> int:
+        minigame = minigame_type(random.Random(0))
+        minigame.reset()
+        for actions in all_actions:
+            if minigame.should_reset:
+                minigame.reset()
+                minigame.should_reset = False
+            minigame.get_gpu()
+            minigame.fill_registers()
+            minigame.tick(actions)
+            if minigame.is_game_over():
+                minigame.should_reset = True
+                minigame.get_rankings()
+        return n_ticks
+    return run
+
+
+def bench_create_rankings(n_calls: int) -> Callable[[], int]:
+    """ Rankings of random scores, with plenty of ties. """
+    rng = random.Random(0)
+    all_scores = [ { pidx: rng.randrange(4) for pidx in range(3) } for _ in range(n_calls) ]
+    minigame = HurdlesGame(random.Random(0))
+    def run() -> int:
+        for scores in all_scores:
+            minigame._create_rankings(scores)
+        return n_calls
+    return run
+
+
+class LoopbackPlayer(Player):
+    """
+    An in-process stand-in for an actor: encodes every state like a real
+    :class:`Player` would, but never talks to a process, and always plays UP.
+    """
+    def init(self, pool: Optional[ActorPool] = None):
+        self.ticks = 0
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        state.text()
+        self.ticks += 1
+        return PlayerAction.UP
+
+    def close(self, reusable: bool = True):
+        pass
+
+
+def bench_game_manager(n_ticks: int) -> Callable[[], int]:
+    """ :meth:`GameManager.tick` against :class:`LoopbackPlayer`s. """
+    genes = np.zeros(16)
+    def run() -> int:
+        subset = PlayerSubset(
+            do_debug_printing  = False,
+            do_info_printing   = False,
+            players            = [ LoopbackPlayer('', pidx, pidx, genes) for pidx in range(3) ])
+        game_manager = GameManager(False, False, subset, seed=0)
+        for _ in range(n_ticks):
+            game_manager.tick()
+        return n_ticks
+    return run
+
+
+def bench_replay(trace_path: str) -> Callable[[], int]:
+    """ Replays of every match of a trace file. """
+    matches = list(read_trace(trace_path))
+    def run() -> int:
+        for match in matches:
+            replay_match(match)
+        return sum(len(match.actions) for match in matches)
+    return run
+
+
+def bench_match(executable_path: str, actor_backend: str, n_matches: int, repeats: int) -> float:
+    """ Matches per second against the actor binary, on a warm :class:`ActorPool`. """
+    gene_frame = np.random.default_rng(0).uniform(-10.0, 10.0, (16, 3))
+    pool = ActorPool(executable_path, size=3, args=PLAYER_BACKENDS[actor_backend].ACTOR_ARGS)
+    def run() -> int:
+        for match_i in range(n_matches):
+            subset = PlayerSubset.from_genes(
+                do_debug_printing  = False,
+                do_info_printing   = False,
+                executable_path    = executable_path,
+                gene_frame         = gene_frame,
+                gene_idxs          = (0, 1, 2),
+                actor_backend      = actor_backend)
+            _play_game(subset, match_i, pool, 100, False, False)
+        return n_matches
+    try:
+        return best_rate(run, repeats)
+    finally:
+        pool.close()
+
+
+def bench_generation(executable_path: str, actor_backend: str,
+                     n_workers: int, n_games: int, repeats: int) -> float:
+    """ Games per second of whole generations, after a warm-up generation. """
+    n_players = 64
+    gene_frame = np.asfortranarray(np.random.default_rng(0).uniform(-10.0, 10.0, (16, n_players)))
+    rng = random.Random(0)
+    jobs = [ (tuple(rng.sample(range(n_players), 3)), rng.getrandbits(32))
+             for _ in range(n_games) ]
+    worker_pool = WorkerPool(
+        do_debug_printing  = False,
+        do_info_printing   = False,
+        executable_path    = executable_path,
+        n_workers          = n_workers,
+        n_genes            = 16,
+        n_players          = n_players,
+        actor_backend      = actor_backend)
+    try:
+        worker_pool.play_generation(gene_frame, jobs)
+        return best_rate(lambda: len(worker_pool.play_generation(gene_frame, jobs)), repeats)
+    finally:
+        worker_pool.close()
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """ Runs all benchmarks; returns each one's throughput and unit, by name. """
+    scale = 0.1 if args.quick else 1.0
+    repeats = 2 if args.quick else 5
+    results: Dict[str, Dict[str, Any]] = {}
+    def record(name: str, value: float, unit: str) -> None:
+        results[name] = { 'value': value, 'unit': unit }
+        print(f"  {name:<32} {value:>14,.1f} {unit}", flush=True)
+
+    for minigame_type in MINIGAME_TYPES:
+        name = minigame_type.__name__.replace('Game', '').lower()
+        record(f'minigame.{name}',
+               best_rate(bench_minigame(minigame_type, int(100_000 * scale)), repeats),
+               'ticks/s')
+    record('minigame.create_rankings',
+           best_rate(bench_create_rankings(int(100_000 * scale)), repeats), 'calls/s')
+    record('game_manager.tick',
+           best_rate(bench_game_manager(int(20_000 * scale)), repeats), 'ticks/s')
+    if args.trace:
+        record('replay', best_rate(bench_replay(args.trace), repeats), 'ticks/s')
+
+    if not os.access(args.exe, os.X_OK):
+        print(f"  (no actor binary at {args.exe}; skipping match and generation benchmarks)")
+        return results
+    for actor_backend in ( 'process', 'process-binary' ):
+        record(f'match.{actor_backend}',
+               bench_match(args.exe, actor_backend, max(int(50 * scale), 5), repeats),
+               'matches/s')
+    for n_workers in args.workers:
+        record(f'generation.workers_{n_workers}',
+               bench_generation(args.exe, args.backend, n_workers,
+                                max(int(512 * scale), 16 * n_workers), min(repeats, 3)),
+               'games/s')
+    return results
+
+
+MATCHED_MACHINE_INFO = ('python', 'cpu_count')
+""" The :func:`machine_info` fields a baseline must match to gate; the rest
+(kernel, processor name) change with every update or VM, and are only
+recorded for reference. """
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+            tolerance: float, quick: bool) -> List[str]:
+    """
+    Prints every benchmark's change from the baseline; returns the regressed
+    ones. Nothing regresses against a baseline from another Python version or
+    CPU count, or from a run with a different :const:`quick`.
+    """
+    comparable = True
+    machine, base_machine = machine_info(), baseline.get('machine', {})
+    mismatched = [ key for key in MATCHED_MACHINE_INFO if base_machine.get(key) != machine[key] ]
+    if mismatched:
+        print(f"note: baseline was recorded with a different {', '.join(mismatched)}; not gating on it")
+        comparable = False
+    if baseline.get('quick') != quick:
+        print(f"note: baseline was{'' if baseline.get('quick') else ' not'} a --quick run; not gating on it")
+        comparable = False
+    regressions = []
+    print(f"\n  {'benchmark':<32} {'baseline':>14} {'now':>14} {'change':>8}")
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"  {name:<32} {'-':>14} {result['value']:>14,.1f}")
+            continue
+        change = result['value'] / base['value'] - 1
+        regressed = comparable and change < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<32} {base['value']:>14,.1f} {result['value']:>14,.1f} "
+              f"{change:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        'python':     platform.python_version(),
+        'platform':   platform.platform(),
+        'processor':  platform.processor() or platform.machine(),
+        'cpu_count':  os.cpu_count(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulator throughput benchmarks.")
+    parser.add_argument('--exe', default='../actor/build/cg-summer-2024',
+                        help="actor binary, for the match and generation benchmarks")
+    parser.add_argument('--backend', default='process',
+                        help="actor backend of the generation benchmarks")
+    parser.add_argument('--workers', type=int, nargs='+', default=[ 1, 2, 4 ],
+                        help="worker counts of the generation benchmarks")
+    parser.add_argument('--out', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare against this JSON file of a previous run")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="largest drop in throughput that is not a regression")
+    parser.add_argument('--quick', action='store_true', help="do a tenth of the work")
+    parser.add_argument('--trace', help="trace file to replay, for the replay benchmark")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({ 'machine': machine_info(), 'quick': args.quick, 'results': results },
+                      f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.quick)
+        if regressions:
+            print(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
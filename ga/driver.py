@@ -1,41 +1,13 @@
-import random
-import math
+import argparse
+import signal
 #from tqdm import tqdm
 import multiprocessing as mp
-from collections import deque
 
-from typing import List, Tuple
-
-from game.game_manager import GameManager
-from game.player_manager import PlayerManager, PlayerSubset
-
-
-def run_games(rounds: int, thread_idx: int, games_per_pop: int,
-              do_debug_printing: bool, do_info_printing: bool,
-              players_queue: mp.Queue, scores_queue: mp.Queue):
-    # play some games
-    for game_i in range(games_per_pop):
-        # get new set of players and games
-        #players = player_manager.choose_3()
-        players: PlayerSubset = players_queue.get()
-        players.init_player_processes()
-        game_manager = GameManager(
-            do_debug_printing = do_debug_printing,
-            do_info_printing  = do_info_printing,
-            player_subset     = players)
-        # play a game -- 100 steps per game
-        for round_i in range(rounds):
-            game_manager.tick()
-        # finally, accumulate each player's score
-        scores = players.finalize_scores()
-        scores_queue.put(scores)
-
-        #player_manager.update_scores(players.finalize_scores())
-        # if SETTINGS['PRINT_INFO']:
-        #     print(f"Finished game {game_i+1}/{SETTINGS['NUM_GAMES_PER_POP']}".ljust(25),
-        #           f"Players {players.players[0].gene_idx} vs",
-        #                   f"{players.players[1].gene_idx} vs",
-        #                   f"{players.players[2].gene_idx}")
+from game.player_manager import PlayerManager
+from game.checkpoint import Checkpoint
+from game.visualizer import Visualizer
+from game.worker_pool import WorkerPool
+from game.batch_sim import BatchEvaluator
 
 
 if __name__ == '__main__':
@@ -43,17 +15,55 @@ if __name__ == '__main__':
     # tunable settings
     SETTINGS = {
         'EXECUTABLE_PATH':       '/home/kalamari/projects/cg-summer-2024/build/cg-summer-2024',
+        'ACTOR_BACKEND':         'process',  # 'process', 'process-binary', 'process-multiplex', 'process-async' (C++) or 'python'
+        'EVALUATOR':             'pool',     # 'pool' (workers) or 'batch' (numpy, python actor)
         'PRINT_DEBUG':           False,
         'PRINT_INFO':            True,
         'PLAYER_COUNT':          128,
         'NUM_GAMES_PER_POP':     4096,
         'THREAD_COUNT':          32,
+        'BATCH_SIZE':            8,      # games in flight per worker with 'process-async'; try ~128
+        'STRAGGLER_FACTOR':      4.0,    # re-dispatch after 4x median batch time
+        'TICK_TIMEOUT':          0.5,    # seconds; an actor this late is killed
+        'INIT_TIMEOUT':          5.0,
+        'INSTRUMENT':            False,  # time each phase of play; toggle with `kill -USR1 <pid>`
+        'TRACE_DIR':             None,   # record every match played, for replay (see tools/replay.py)
         'VISUALIZE_EVERY':       20,
+        'VISUALIZE_DIR':         'plots',  # PNGs, rendered in the background; None to not plot
         'GENE_COUNT':            16,
         'RARE_MUT_CHANCE':       0.005,  # 0.5%
-        'TOP_PERCENT_BREED':     0.10    # 10%
+        'TOP_PERCENT_BREED':     0.10,   # 10%
+        'SEED':                  None,   # set for a reproducible run
+        'SEEDS_PER_POP':         None,   # share this many match seeds per population
+        'SCENARIO_BANK_SIZE':    None,   # all games of a population play the same 16 (say) rounds per minigame
+        'RACING_STAGES':         None,   # evaluate in 8 (say) stages, dropping hopeless players after each; see PlayerManager.race
+        'RACING_CONFIDENCE':     2.0,    # standard errors a player must trail the parents by to be dropped
+        'HISTORY_PATH':          'history',  # every generation's genes and scores; None to keep none
+        'CHECKPOINT_PATH':       'checkpoint.npz',  # None to not checkpoint
+        'CHECKPOINT_EVERY':      1,      # generations
     }
+    # settings that belong to this machine rather than to the run; a resumed
+    # run takes these from above, and all others from its checkpoint
+    LOCAL_SETTINGS = { 'EXECUTABLE_PATH', 'PRINT_DEBUG', 'PRINT_INFO', 'THREAD_COUNT',
+                       'TICK_TIMEOUT', 'INIT_TIMEOUT', 'VISUALIZE_EVERY', 'VISUALIZE_DIR',
+                       'INSTRUMENT', 'TRACE_DIR' }
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', nargs='?', const=SETTINGS['CHECKPOINT_PATH'], metavar='CHECKPOINT',
+                        help="continue the run saved in the given checkpoint (default: CHECKPOINT_PATH)")
+    args = parser.parse_args()
+    checkpoint = None
+    if args.resume:
+        checkpoint = Checkpoint.load(args.resume)
+        SETTINGS.update({ key: value for key, value in checkpoint.settings.items()
+                          if key not in LOCAL_SETTINGS })
+        if SETTINGS['PRINT_INFO']:
+            print(f"Resuming from {args.resume}, at round {checkpoint.round_num}.")
     
+    visualizer = None
+    if SETTINGS['VISUALIZE_DIR']:
+        visualizer = Visualizer(SETTINGS['VISUALIZE_DIR'])
+
     # initialize player manager
     player_manager = PlayerManager(
         do_debug_printing  = SETTINGS['PRINT_DEBUG'],
@@ -63,45 +73,73 @@ if __name__ == '__main__':
         n_genes            = SETTINGS['GENE_COUNT'],
         visualize_every    = SETTINGS['VISUALIZE_EVERY'],
         rare_mut_chance    = SETTINGS['RARE_MUT_CHANCE'],
-        top_percent_breed  = SETTINGS['TOP_PERCENT_BREED'])
+        top_percent_breed  = SETTINGS['TOP_PERCENT_BREED'],
+        seed               = SETTINGS['SEED'],
+        history_path       = SETTINGS['HISTORY_PATH'],
+        checkpoint         = checkpoint,
+        visualizer         = visualizer)
     
-    ctx = mp.get_context('spawn')
-    games_per_thread = SETTINGS['NUM_GAMES_PER_POP'] / SETTINGS['THREAD_COUNT']
-    games_per_thread = math.ceil(games_per_thread)
+    # initialize worker pool -- lives for the whole run
+    if SETTINGS['EVALUATOR'] == 'batch':
+        worker_pool = BatchEvaluator(
+            do_info_printing   = SETTINGS['PRINT_INFO'],
+            rounds             = 100)
+    else:
+        worker_pool = WorkerPool(
+            do_debug_printing  = SETTINGS['PRINT_DEBUG'],
+            do_info_printing   = SETTINGS['PRINT_INFO'],
+            executable_path    = SETTINGS['EXECUTABLE_PATH'],
+            n_workers          = SETTINGS['THREAD_COUNT'],
+            n_genes            = SETTINGS['GENE_COUNT'],
+            n_players          = SETTINGS['PLAYER_COUNT'],
+            actor_backend      = SETTINGS['ACTOR_BACKEND'],
+            instrument         = SETTINGS['INSTRUMENT'],
+            trace_dir          = SETTINGS['TRACE_DIR'],
+            tick_timeout       = SETTINGS['TICK_TIMEOUT'],
+            init_timeout       = SETTINGS['INIT_TIMEOUT'],
+            rounds             = 100,
+            batch_size         = SETTINGS['BATCH_SIZE'],
+            straggler_factor   = SETTINGS['STRAGGLER_FACTOR'])
+        # toggles instrumentation, from the next generation on
+        def toggle_instrument(signum, frame):
+            worker_pool.instrument = not worker_pool.instrument
+            print(f"Instrumentation {'on' if worker_pool.instrument else 'off'}.")
+        signal.signal(signal.SIGUSR1, toggle_instrument)
     if SETTINGS['PRINT_INFO']:
-        total_games = games_per_thread * SETTINGS['THREAD_COUNT']
-        print(f"Playing {total_games} games per population.\n")
+        print(f"Playing {SETTINGS['NUM_GAMES_PER_POP']} games per population.\n")
     
     should_continue = True
-    num_rounds = 0
-    while should_continue:
-
-        # start processes
-        processes: List[Tuple[mp.Process, mp.Queue, mp.Queue]] = []
-        for thread_idx in range(SETTINGS['THREAD_COUNT']):
+    num_rounds = 0 if checkpoint is None else checkpoint.round_num
+    try:
+        while should_continue:
 
-            players_queue = ctx.Queue()
-            scores_queue = ctx.Queue()
-            
-            proc = ctx.Process(target=run_games, args=(
-                100, thread_idx, games_per_thread,
-                SETTINGS['PRINT_DEBUG'], SETTINGS['PRINT_INFO'],
-                players_queue, scores_queue))
-            
-            for i in range(games_per_thread):
-                players_queue.put(player_manager.choose_3())
-            
-            proc.start()
-            processes.append( (proc, players_queue, scores_queue) )
-        
-        # gather scores
-        for thread_idx in range(SETTINGS['THREAD_COUNT']):
-            proc, players_queue, scores_queue = processes[thread_idx]
-            for i in range(games_per_thread):
-                scores = scores_queue.get()
-                player_manager.update_scores(scores)
-            proc.join()
+            # play games
+            if not SETTINGS['RACING_STAGES']:
+                jobs = player_manager.choose_jobs(SETTINGS['NUM_GAMES_PER_POP'],
+                                                  SETTINGS['SEEDS_PER_POP'])
+            gene_frame = player_manager.gene_history[-1]
+            scenarios = None
+            if SETTINGS['SCENARIO_BANK_SIZE']:
+                scenarios = player_manager.new_scenario_bank(SETTINGS['SCENARIO_BANK_SIZE'])
+            if SETTINGS['RACING_STAGES']:
+                n_played = player_manager.race(
+                    lambda jobs: worker_pool.play_generation(gene_frame, jobs, scenarios),
+                    n_games     = SETTINGS['NUM_GAMES_PER_POP'],
+                    n_stages    = SETTINGS['RACING_STAGES'],
+                    confidence  = SETTINGS['RACING_CONFIDENCE'],
+                    n_seeds     = SETTINGS['SEEDS_PER_POP'])
+                if SETTINGS['PRINT_INFO']:
+                    print(f"Raced {n_played} games; {len(player_manager.racing)} contenders left.")
+            else:
+                for scores in worker_pool.play_generation(gene_frame, jobs, scenarios):
+                    player_manager.update_scores(scores)
 
-        # evolve players
-        should_continue = player_manager.breed(num_rounds)
-        num_rounds += 1
+            # evolve players
+            should_continue = player_manager.breed(num_rounds)
+            num_rounds += 1
+            if SETTINGS['CHECKPOINT_PATH'] and num_rounds % SETTINGS['CHECKPOINT_EVERY'] == 0:
+                player_manager.save_checkpoint(SETTINGS['CHECKPOINT_PATH'], num_rounds, SETTINGS)
+    finally:
+        worker_pool.close()
+        if visualizer is not None:
+            visualizer.close()
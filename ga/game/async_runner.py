@@ -0,0 +1,145 @@
+import time
+import asyncio
+
+from .game_manager import GameManager
+from .player_manager import PlayerSubset
+from .player import AsyncPlayer, AsyncActorPool
+from .minigames import PlayerAction
+from .scenarios import ScenarioBank
+from .instrument import INSTRUMENTS
+from .trace import MatchTrace, TraceWriter
+
+from typing import List, Dict, Optional
+
+
+class AsyncMatchRunner:
+    """
+    Plays many games at once on a single asyncio event loop, all of whose
+    players are :class:`AsyncPlayer`s. Every tick of a game, the state is
+    written to all three actors before any response is awaited, and while a
+    game waits on its actors the other games in flight keep going; so one
+    worker keeps its actors busy instead of idling on pipe latency.
+
+    The event loop and the pool of actor processes live as long as the
+    runner, so actors are re-used across calls to :meth:`play`.
+    """
+    def __init__(self, executable_path: str, concurrency: int):
+        self.executable_path:  str                         = executable_path
+        self.concurrency:      int                         = concurrency
+        self.loop:             asyncio.AbstractEventLoop   = asyncio.new_event_loop()
+        self.pool:             AsyncActorPool              = AsyncActorPool(executable_path, size=3*concurrency)
+
+
+    def play(self,
+             subsets:            List[PlayerSubset],
+             seeds:              List[int],
+             rounds:             int,
+             do_debug_printing:  bool,
+             do_info_printing:   bool,
+             scenarios:          Optional[ScenarioBank] = None,
+             trace:              Optional[TraceWriter] = None) -> List[Dict[int, int]]:
+        """
+        Plays all given games, each with its match seed in :const:`seeds` (or
+        all with the given scenario bank), with up to :attr:`concurrency` of
+        them in flight at once. Returns each game's scores, in order, see
+        :meth:`PlayerSubset.finalize_scores`. If given a
+        :class:`TraceWriter`, every game is recorded to it.
+        """
+        return self.loop.run_until_complete(self._play_all(
+            subsets, seeds, rounds, do_debug_printing, do_info_printing, scenarios, trace))
+
+
+    async def _play_all(self, subsets: List[PlayerSubset], seeds: List[int], rounds: int,
+                        do_debug_printing: bool, do_info_printing: bool,
+                        scenarios: Optional[ScenarioBank],
+                        trace: Optional[TraceWriter]) -> List[Dict[int, int]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async def play_one(subset: PlayerSubset, seed: int) -> Dict[int, int]:
+            async with semaphore:
+                return await self._play_game(subset, seed, rounds,
+                                             do_debug_printing, do_info_printing, scenarios, trace)
+        return await asyncio.gather(*(play_one(subset, seed)
+                                      for subset, seed in zip(subsets, seeds)))
+
+
+    async def _play_game(self, subset: PlayerSubset, seed: int, rounds: int,
+                         do_debug_printing: bool, do_info_printing: bool,
+                         scenarios: Optional[ScenarioBank],
+                         trace: Optional[TraceWriter]) -> Dict[int, int]:
+        """
+        Plays a single game, and returns its scores.
+
+        If instrumented, each phase of a tick is timed as in
+        :meth:`GameManager.tick`; with other games in flight, `tick.actors`
+        is the whole span from sending the state to the last reply, which
+        includes time the loop spent on other games.
+        """
+        instruments = INSTRUMENTS
+        if instruments.enabled:
+            start = time.perf_counter()
+        players: List[AsyncPlayer] = subset.players
+        for player in players:
+            if instruments.enabled:
+                init_start = time.perf_counter()
+            try:
+                await player.ainit(self.pool)
+            except Exception as e:
+                subset.mark_dead(player.player_idx, e)
+            if instruments.enabled:
+                instruments.record('actor.init', time.perf_counter() - init_start)
+        game_manager = GameManager(
+            do_debug_printing = do_debug_printing,
+            do_info_printing  = do_info_printing,
+            player_subset     = subset,
+            seed              = seed,
+            scenarios         = scenarios,
+            record            = trace is not None)
+
+        # play a game -- `rounds` steps per game
+        for round_i in range(rounds):
+            if instruments.enabled:
+                tick_start = time.perf_counter()
+            game_states = game_manager.begin_tick()
+            if instruments.enabled:
+                began = time.perf_counter()
+            state = subset.tick_state(game_states)
+            active = []
+            for player in players:
+                if not subset.is_active(player.player_idx):
+                    continue
+                try:
+                    player.send(state)
+                    active.append(player)
+                except Exception as e:
+                    subset.mark_dead(player.player_idx, e)
+            # all three actors are computing by now, so awaiting them in turn
+            # costs no more than awaiting them together
+            actions = [ PlayerAction.ERROR ] * 3
+            for player in active:
+                try:
+                    actions[player.player_idx] = await player.receive()
+                except Exception as e:
+                    subset.mark_dead(player.player_idx, e)
+            if instruments.enabled:
+                responded = time.perf_counter()
+            game_manager.end_tick(actions)
+            if instruments.enabled:
+                instruments.record('tick.begin', began - tick_start)
+                instruments.record('tick.actors', responded - began)
+                instruments.record('tick.end', time.perf_counter() - responded)
+
+        # finally, accumulate each player's score
+        scores = subset.finalize_scores()
+        for player in players:
+            await player.aclose(reusable=subset.is_active(player.player_idx))
+        if trace is not None:
+            trace.write(MatchTrace.from_game(game_manager))
+        if instruments.enabled:
+            instruments.record('match', time.perf_counter() - start)
+        return scores
+
+
+    def close(self) -> None:
+        """ Kills all idle actor processes, and closes the event loop. """
+        self.loop.run_until_complete(self.pool.close())
+        self.loop.close()
@@ -0,0 +1,405 @@
+import numpy as np
+
+from .minigames.archery import WIND_WEIGHTS
+from .player_manager import Job
+from .scenarios import ScenarioBank
+
+from typing import List, Dict, Tuple, Optional
+
+
+# Vectorized re-implementation of `GameManager`, the four minigames, and the
+# actor in `py_actor.py`. The state of N matches is held in arrays of shape
+# (N, ...), and all matches are advanced one tick at a time. The rules must
+# match the minigame classes exactly; only the random draws differ (numpy
+# instead of the `random` module), with the same distributions. Checked by
+# `tools/batch_parity.py`, which plays scalar games' scenarios through it.
+#
+# Actions are encoded as their :class:`PlayerAction` values:
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+
+N_GAMES = 4
+HURDLES, ARCHERY, SKATING, DIVING = range(N_GAMES)
+
+HURDLES_LENGTH = 30
+ARCHERY_MAX_DIST = 20
+MAX_SEQUENCE_LENGTH = 15  # longest wind/goal sequence, 12 + randrange(4)
+SKATING_LENGTH = 10
+SKATING_TURNS = 15
+
+WIND_PROBABILITIES = np.array(WIND_WEIGHTS) / sum(WIND_WEIGHTS)
+
+# hurdles: distance moved per action
+HURDLES_MOVES = np.array([ 2, 2, 1, 3 ])
+# skating: distance moved per risk order index
+SKATING_MOVES = np.array([ 1, 2, 2, 3 ])
+# archery: (dx, dy) direction per action, multiplied by the wind
+ARCHERY_DIRECTIONS = np.array([ [0, -1], [0, 1], [-1, 0], [1, 0] ])
+
+# actor cost templates, see `py_actor.py`
+HURDLES_COSTS = np.array([
+    [ -1.0,  3.0,  3.0,  3.0 ],  # hurdle next tile
+    [  3.0,  3.0, -1.0,  3.0 ],  # hurdle in 2 tiles
+    [ -2.0, -2.0, -1.0,  3.0 ],  # hurdle in 3 tiles
+    [ -2.0, -2.0, -1.0, -3.0 ],  # no hurdle in range
+])
+ARCHERY_COSTS = np.array([
+    [  0.0,  0.0, -1.0,  1.0 ],  # majorly LEFT
+    [  0.0,  0.0,  1.0, -1.0 ],  # majorly RIGHT
+    [  1.0, -1.0,  0.0,  0.0 ],  # majorly DOWN
+    [ -1.0,  1.0,  0.0,  0.0 ],  # majorly UP
+])
+DIVING_COSTS = 1.0 - 2.0 * np.eye(4)  # -1 on the goal action, 1 elsewhere
+
+
+class BatchSimulator:
+    """
+    Plays N independent matches in lockstep. Each match is played between
+    three in-process actors (see :class:`PyActor`), whose genes are given as
+    an array of shape :const:`(N, 3, n_genes)`.
+    """
+    def __init__(self, genes: np.ndarray, rng: Optional[np.random.Generator] = None):
+        self.rng:        np.random.Generator  = rng if rng is not None else np.random.default_rng()
+        self.n_matches:  int                  = genes.shape[0]
+        n = self.n_matches
+
+        # actor weights: weights[match, player, minigame] = (a, b, c, d)
+        self.weights = np.asarray(genes, dtype=np.float64)[:, :, :16].reshape(n, 3, N_GAMES, 4)
+
+        # manager state
+        self.should_reset  = np.zeros((n, N_GAMES), dtype=bool)
+        self.resetting     = np.zeros((n, N_GAMES), dtype=bool)
+        # medals[match, minigame, player] = [gold, silver, bronze]
+        self.medals        = np.zeros((n, N_GAMES, 3, 3), dtype=np.int64)
+
+        # hurdles
+        self.hurdle_map    = np.zeros((n, HURDLES_LENGTH + 3), dtype=bool)  # padded
+        self.h_positions   = np.zeros((n, 3), dtype=np.int64)
+        self.h_stun        = np.zeros((n, 3), dtype=np.int64)
+        self.h_finished    = np.zeros((n, 3), dtype=bool)
+        # archery
+        self.cursors       = np.zeros((n, 3, 2), dtype=np.int64)
+        self.wind          = np.zeros((n, MAX_SEQUENCE_LENGTH), dtype=np.int64)
+        self.wind_length   = np.zeros(n, dtype=np.int64)
+        self.wind_cursor   = np.zeros(n, dtype=np.int64)
+        # skating: directions[match, risk_idx] = action
+        self.s_positions   = np.zeros((n, 3), dtype=np.int64)
+        self.risk          = np.zeros((n, 3), dtype=np.int64)
+        self.directions    = np.tile(np.arange(4), (n, 1))
+        self.timer         = np.zeros(n, dtype=np.int64)
+        # diving
+        self.goal          = np.zeros((n, MAX_SEQUENCE_LENGTH), dtype=np.int64)
+        self.goal_length   = np.zeros(n, dtype=np.int64)
+        self.goal_cursor   = np.zeros(n, dtype=np.int64)
+        self.points        = np.zeros((n, 3), dtype=np.int64)
+        self.combo         = np.zeros((n, 3), dtype=np.int64)
+
+        # initialize games
+        everything = np.ones(n, dtype=bool)
+        self._reset_hurdles(everything)
+        self._reset_archery(everything)
+        self._reset_skating(everything)
+        self._reset_diving(everything)
+
+
+    # --- resets -------------------------------------------------------------
+
+    def _reset_hurdles(self, mask: np.ndarray) -> None:
+        """ See :meth:`HurdlesGame.generate_scenario`. """
+        n = int(mask.sum())
+        if n == 0:
+            return
+        self.h_positions[mask] = 0
+        self.h_stun[mask] = 0
+        self.h_finished[mask] = False
+        # hurdle k sits at start_stretch + sum of the previous gaps, where each
+        # gap is "#..." plus an optional "."
+        start_stretch = 3 + self.rng.integers(5, size=n)
+        n_hurdles = 3 + self.rng.integers(4, size=n)
+        gaps = 4 + self.rng.integers(2, size=(n, 6))
+        offsets = np.concatenate([ np.zeros((n, 1), dtype=np.int64),
+                                   np.cumsum(gaps, axis=1)[:, :-1] ], axis=1)
+        hurdles = start_stretch[:, None] + offsets
+        # the last tile is always empty
+        valid = (np.arange(6)[None, :] < n_hurdles[:, None]) & (hurdles < HURDLES_LENGTH - 1)
+        rows = np.broadcast_to(np.arange(n)[:, None], hurdles.shape)
+        new_map = np.zeros((n, self.hurdle_map.shape[1]), dtype=bool)
+        new_map[rows[valid], hurdles[valid]] = True
+        self.hurdle_map[mask] = new_map
+
+
+    def _reset_archery(self, mask: np.ndarray) -> None:
+        """ See :meth:`ArcheryGame.generate_scenario`. """
+        n = int(mask.sum())
+        if n == 0:
+            return
+        signs = np.where(self.rng.integers(2, size=(n, 2)) == 1, 1, -1)
+        start = (5 + self.rng.integers(5, size=(n, 2))) * signs
+        self.cursors[mask] = start[:, None, :]
+        self.wind[mask] = self.rng.choice(10, size=(n, MAX_SEQUENCE_LENGTH), p=WIND_PROBABILITIES)
+        self.wind_length[mask] = 12 + self.rng.integers(4, size=n)
+        self.wind_cursor[mask] = 0
+
+
+    def _reset_skating(self, mask: np.ndarray) -> None:
+        """ See :meth:`SkatingGame.generate_scenario`. """
+        n = int(mask.sum())
+        if n == 0:
+            return
+        self.s_positions[mask] = 0
+        self.risk[mask] = 0
+        self.directions[mask] = self.rng.permuted(self.directions[mask], axis=1)
+        self.timer[mask] = SKATING_TURNS
+
+
+    def _reset_diving(self, mask: np.ndarray) -> None:
+        """ See :meth:`DivingGame.generate_scenario`. """
+        n = int(mask.sum())
+        if n == 0:
+            return
+        self.goal[mask] = self.rng.integers(4, size=(n, MAX_SEQUENCE_LENGTH))
+        self.goal_length[mask] = 12 + self.rng.integers(4, size=n)
+        self.goal_cursor[mask] = 0
+        self.points[mask] = 0
+        self.combo[mask] = 0
+
+
+    # --- actors -------------------------------------------------------------
+
+    def _actor_costs(self) -> np.ndarray:
+        """
+        Returns each actor's unweighted costs for the current state, of shape
+        :const:`(N, 3, N_GAMES, 4)`. See the cost functions in `py_actor.py`.
+        """
+        n = self.n_matches
+        rows = np.arange(n)[:, None]
+        costs = np.zeros((n, 3, N_GAMES, 4))
+
+        # hurdles: look at the next three tiles, unless stunned
+        ahead = self.h_positions[:, :, None] + np.arange(1, 4)[None, None, :]
+        hurdle_ahead = self.hurdle_map[rows[:, :, None], ahead]
+        case = np.where(hurdle_ahead[:, :, 0], 0,
+               np.where(hurdle_ahead[:, :, 1], 1,
+               np.where(hurdle_ahead[:, :, 2], 2, 3)))
+        hurdles = HURDLES_COSTS[case]
+        hurdles[self.h_stun > 0] = 0.0
+        costs[:, :, HURDLES] = hurdles
+
+        # archery: registers are x0,y0,x1,y1,x2,y2, but the actor reads its
+        # position from registers[player_idx] and registers[player_idx+1]
+        registers = self.cursors.reshape(n, 6)
+        my_x = registers[:, [0, 1, 2]]
+        my_y = registers[:, [1, 2, 3]]
+        dist = np.sqrt(my_x*my_x + my_y*my_y)
+        best_of_opp = np.minimum(dist[:, [1, 2, 0]], dist[:, [2, 0, 1]])
+        turns_left = (self.wind_length - self.wind_cursor)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scaler = turns_left * (dist / best_of_opp)
+        case = np.where(my_x > np.abs(my_y), 0,
+               np.where(-my_x > np.abs(my_y), 1,
+               np.where(my_y > np.abs(my_x), 2, 3)))
+        template = ARCHERY_COSTS[case]
+        # `-ffast-math` folds 0.0 * scaler to 0.0, even for infinite scalers
+        with np.errstate(invalid='ignore'):
+            archery = np.where(template != 0.0, template * scaler[:, :, None], 0.0)
+        archery[(np.abs(my_x) + np.abs(my_y)) == 0] = 0.0
+        costs[:, :, ARCHERY] = archery
+
+        # skating: the actor does not vote yet
+
+        # diving: vote for the next goal, scaled by the combo
+        next_goal = self.goal[np.arange(n), np.minimum(self.goal_cursor, MAX_SEQUENCE_LENGTH - 1)]
+        costs[:, :, DIVING] = DIVING_COSTS[next_goal][:, None, :] * (self.combo + 1)[:, :, None]
+
+        # games that are resetting show `GAME_OVER`, which costs nothing
+        costs[self.resetting[:, None, :].repeat(3, axis=1)] = 0.0
+        return costs
+
+
+    def _choose_actions(self) -> np.ndarray:
+        """ Returns every actor's action, of shape :const:`(N, 3)`. """
+        k = self._actor_costs()
+        a = self.weights[..., 0:1]
+        b = self.weights[..., 1:2]
+        c = self.weights[..., 2:3]
+        d = self.weights[..., 3:4]
+        with np.errstate(invalid='ignore', over='ignore'):
+            # same evaluation order as `Polynomial::evaluate`
+            weight = a * k*k*k + b * k*k + c * k + d
+            net = (k * weight).sum(axis=2)
+        # prefers UP, then DOWN, then LEFT, then RIGHT, if tie; any NaN makes
+        # every comparison fail, which falls through to RIGHT
+        actions = np.argmin(net, axis=2)
+        actions[np.isnan(net).any(axis=2)] = RIGHT
+        return actions
+
+
+    # --- ticks --------------------------------------------------------------
+
+    def _tick_hurdles(self, actions: np.ndarray) -> None:
+        """ See :meth:`HurdlesGame.tick`. """
+        stunned = self.h_stun > 0
+        self.h_stun[stunned] -= 1
+        moving = ~stunned & ~self.h_finished
+        move_by = HURDLES_MOVES[actions]
+        jump = actions == UP
+        rows = np.broadcast_to(np.arange(self.n_matches)[:, None], moving.shape)
+        for x in range(3):
+            moving &= x < move_by
+            self.h_positions[moving] = np.minimum(HURDLES_LENGTH - 1, self.h_positions[moving] + 1)
+            on_hurdle = self.hurdle_map[rows, self.h_positions]
+            hit = moving & on_hurdle & ~jump
+            self.h_stun[hit] = 2
+            finished = moving & ~hit & (self.h_positions == HURDLES_LENGTH - 1)
+            self.h_finished |= finished
+            moving &= ~hit & ~finished
+            jump = np.zeros_like(jump)
+
+
+    def _tick_archery(self, actions: np.ndarray) -> None:
+        """ See :meth:`ArcheryGame.tick`. """
+        offset = self.wind[np.arange(self.n_matches), self.wind_cursor]
+        self.wind_cursor += 1
+        self.cursors += ARCHERY_DIRECTIONS[actions] * offset[:, None, None]
+        np.clip(self.cursors, -ARCHERY_MAX_DIST, ARCHERY_MAX_DIST, out=self.cursors)
+
+
+    def _tick_skating(self, actions: np.ndarray) -> None:
+        """ See :meth:`SkatingGame.tick`. """
+        # update player positions
+        stunned = self.risk < 0
+        self.risk[stunned] += 1
+        # risk order index of each player's action
+        idx = np.argmax(self.directions[:, None, :] == actions[:, :, None], axis=2)
+        moving = ~stunned
+        self.s_positions[moving] += SKATING_MOVES[idx[moving]]
+        self.risk[moving] = np.maximum(0, self.risk[moving] + idx[moving] - 1)
+
+        # check risks
+        track = self.s_positions % SKATING_LENGTH
+        clash = ((track[:, [1, 2, 0]] == track) | (track[:, [2, 0, 1]] == track))
+        checked = self.risk >= 0
+        self.risk[checked & clash] += 2
+        self.risk[checked & (self.risk >= 5)] = -2  # stun
+
+        self.directions = self.rng.permuted(self.directions, axis=1)
+        self.timer -= 1
+
+
+    def _tick_diving(self, actions: np.ndarray) -> None:
+        """ See :meth:`DivingGame.tick`. """
+        this_goal = self.goal[np.arange(self.n_matches), self.goal_cursor]
+        self.goal_cursor += 1
+        hit = actions == this_goal[:, None]
+        self.combo = np.where(hit, self.combo + 1, 0)
+        self.points += np.where(hit, self.combo, 0)
+
+
+    def _game_overs(self) -> np.ndarray:
+        """ Returns which games are over, of shape :const:`(N, N_GAMES)`. """
+        return np.stack([
+            self.h_finished.any(axis=1),
+            self.wind_cursor >= self.wind_length,
+            self.timer <= 0,
+            self.goal_cursor >= self.goal_length,
+        ], axis=1)
+
+
+    def _update_medals(self, minigame_idx: int, over: np.ndarray, scores: np.ndarray) -> None:
+        """
+        Awards medals for the finished games, ranking by score. Tied players
+        share the better rank, same as :meth:`Minigame._create_rankings`.
+        """
+        scores = scores[over]
+        ranks = (scores[:, None, :] > scores[:, :, None]).sum(axis=2)
+        tiers = np.minimum(ranks, 2)
+        medals = self.medals[over, minigame_idx]
+        np.add.at(medals, (np.arange(len(tiers))[:, None], np.arange(3)[None, :], tiers), 1)
+        self.medals[over, minigame_idx] = medals
+
+
+    def tick(self) -> None:
+        """
+        Perform a single game step, for all players, for all minigames, in all
+        matches. Same order of events as :meth:`GameManager.tick`.
+        """
+        # handle resets, if needed
+        self.resetting = self.should_reset
+        self._reset_hurdles(self.resetting[:, HURDLES])
+        self._reset_archery(self.resetting[:, ARCHERY])
+        self._reset_skating(self.resetting[:, SKATING])
+        self._reset_diving( self.resetting[:, DIVING])
+        self.should_reset = np.zeros_like(self.should_reset)
+
+        # gather player actions, and update all games
+        actions = self._choose_actions()
+        self._tick_hurdles(actions)
+        self._tick_archery(actions)
+        self._tick_skating(actions)
+        self._tick_diving(actions)
+
+        # handle new gameovers, if needed
+        over = self._game_overs()
+        if over[:, HURDLES].any():
+            self._update_medals(HURDLES, over[:, HURDLES], self.h_positions)
+        if over[:, ARCHERY].any():
+            distance = (self.cursors**2).sum(axis=2)
+            self._update_medals(ARCHERY, over[:, ARCHERY], -distance)
+        if over[:, SKATING].any():
+            self._update_medals(SKATING, over[:, SKATING], self.s_positions)
+        if over[:, DIVING].any():
+            self._update_medals(DIVING, over[:, DIVING], self.points)
+        self.should_reset = over
+
+
+    def scores(self) -> np.ndarray:
+        """
+        Returns each player's running score, of shape :const:`(N, 3)`. See
+        :meth:`PlayerSubset._score_for_player`.
+        """
+        per_game = 3 * self.medals[..., 0] + self.medals[..., 1]
+        return per_game.prod(axis=1)
+
+
+class BatchEvaluator:
+    """
+    Drop-in replacement for :class:`WorkerPool`, which plays a whole
+    generation in a single :class:`BatchSimulator` on the current process.
+    Only supports the in-process Python actor.
+
+    All games of a generation are drawn from one vectorized stream, so the
+    jobs' match seeds only seed that stream as a whole: a generation is
+    reproducible from its jobs, but a single match does not replay the same
+    as on a :class:`WorkerPool`.
+    """
+    def __init__(self,
+                 do_info_printing:  bool,
+                 rounds:            int  = 100):
+        self.do_info_printing:  bool  = do_info_printing
+        self.rounds:            int   = rounds
+
+
+    def play_generation(self, gene_frame: np.array, jobs: List[Job],
+                        scenarios: Optional[ScenarioBank] = None) -> List[Dict[int, int]]:
+        """
+        Plays all given games between players of the given gene frame, and
+        returns their scores, in the same format as
+        :meth:`PlayerSubset.finalize_scores`. Scenario banks are not
+        supported.
+        """
+        if scenarios is not None:
+            raise ValueError("BatchEvaluator does not support scenario banks")
+        idxs = np.array([ gene_idxs for gene_idxs, seed in jobs ], dtype=np.int64).reshape(-1, 3)
+        genes = gene_frame.T[idxs]  # (N, 3, n_genes)
+        rng = np.random.default_rng([ seed for gene_idxs, seed in jobs ])
+        simulator = BatchSimulator(genes, rng)
+        for round_i in range(self.rounds):
+            simulator.tick()
+        scores = simulator.scores()
+        return [
+            { int(gene_idx): int(score) for gene_idx, score in zip(job, match_scores) }
+            for job, match_scores in zip(idxs, scores)
+        ]
+
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,83 @@
+import os
+import json
+import numpy as np
+
+from typing import Dict, Any, Optional
+
+
+class Checkpoint:
+    """
+    Everything needed to continue an evolution run exactly where it stopped:
+    the current (and previous) gene frames, players' scores and death state,
+    the state of both of :class:`PlayerManager`'s random streams, the
+    generation and round numbers, and the run's settings.
+
+    Checkpoints are written atomically -- to a temporary file which then
+    replaces the old checkpoint -- so a crash mid-write leaves the previous
+    one intact. They are uncompressed ``.npz`` files; writing one costs about
+    as much as copying two gene frames.
+    """
+    def __init__(self,
+                 genes:         np.ndarray,
+                 prev_genes:    Optional[np.ndarray],
+                 scores:        np.ndarray,
+                 dead:          np.ndarray,
+                 rng_state:     Any,
+                 np_rng_state:  Dict[str, Any],
+                 generation:    int,
+                 round_num:     int,
+                 settings:      Dict[str, Any]):
+        self.genes:         np.ndarray            = genes
+        self.prev_genes:    Optional[np.ndarray]  = prev_genes
+        self.scores:        np.ndarray            = scores
+        self.dead:          np.ndarray            = dead
+        self.rng_state:     Any                   = rng_state
+        """ see :meth:`random.Random.getstate` """
+        self.np_rng_state:  Dict[str, Any]        = np_rng_state
+        """ see :attr:`numpy.random.BitGenerator.state` """
+        self.generation:    int                   = generation
+        self.round_num:     int                   = round_num
+        self.settings:      Dict[str, Any]        = settings
+
+
+    def save(self, path: str) -> None:
+        """ Atomically writes this checkpoint to :const:`path`. """
+        version, internal, gauss_next = self.rng_state
+        meta = {
+            'rng_state':     [ version, list(internal), gauss_next ],
+            'np_rng_state':  self.np_rng_state,
+            'generation':    self.generation,
+            'round_num':     self.round_num,
+            'settings':      self.settings,
+        }
+        arrays = {
+            'genes':   self.genes,
+            'scores':  self.scores,
+            'dead':    self.dead,
+            'meta':    np.array(json.dumps(meta)),
+        }
+        if self.prev_genes is not None:
+            arrays['prev_genes'] = self.prev_genes
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            version, internal, gauss_next = meta['rng_state']
+            return cls(
+                genes         = np.asfortranarray(data['genes']),
+                prev_genes    = np.asfortranarray(data['prev_genes']) if 'prev_genes' in data else None,
+                scores        = data['scores'],
+                dead          = data['dead'],
+                rng_state     = (version, tuple(internal), gauss_next),
+                np_rng_state  = meta['np_rng_state'],
+                generation    = meta['generation'],
+                round_num     = meta['round_num'],
+                settings      = meta['settings'])
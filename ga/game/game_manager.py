@@ -2,35 +2,51 @@
 # Wrapper class for all four minigames
 
 import sys
+import time
 import random
 
-from typing import List, Dict, Any
+from typing import List, Dict, Tuple, Any, Optional
 
 from .player_manager import PlayerManager, PlayerSubset
-from .minigames import \
-    PlayerAction, Minigame, \
-    HurdlesGame, ArcheryGame, SkatingGame, DivingGame
+from .minigames import PlayerAction, Minigame, MINIGAME_TYPES
+from .scenarios import ScenarioBank
+from .instrument import INSTRUMENTS
+from .trace import encode_actions
 
 
 class GameManager:
     def __init__(self,
                  do_debug_printing:  bool,
                  do_info_printing:   bool,
-                 player_subset:      PlayerSubset):
+                 player_subset:      PlayerSubset,
+                 seed:               Optional[int] = None,
+                 scenarios:          Optional[ScenarioBank] = None,
+                 record:             bool = False):
         # save settings
         self.do_debug_printing = do_debug_printing
         self.do_info_printing = do_info_printing
 
-        # initialize data
+        # initialize data. all of the match's randomness comes from its own
+        # stream, so the same seed replays the same match; or, given a
+        # scenario bank, from the bank, so the match plays the same rounds
+        # as every other match given it
         self.player_subset:   PlayerSubset    = player_subset
+        self.seed:            Optional[int]   = seed
+        self.rng:             random.Random   = random.Random(seed)
         self.resets:          List[int]       = [ 0 for _ in range(4) ]
-        self.minigames:       List[Minigame]  = [ HurdlesGame(),
-                                                  ArcheryGame(),
-                                                  SkatingGame(),
-                                                  DivingGame() ]
+        self.minigames:       List[Minigame]  = [ minigame_type(self.rng)
+                                                  for minigame_type in MINIGAME_TYPES ]
         
+        # if recording, every scenario played and every tick's actions are
+        # kept, for a `MatchTrace`
+        self.actions_log:     Optional[bytearray]  = bytearray() if record else None
+
         # initialize games
-        for game in self.minigames:
+        for i, game in enumerate(self.minigames):
+            if scenarios is not None:
+                game.scenarios = scenarios.scenarios[i]
+            if record:
+                game.recorded = []
             game.reset()
 
         # # output game settings
@@ -50,6 +66,33 @@ class GameManager:
         """
         Perform a single game step, for all players, for all minigames.
         """
+        instruments = INSTRUMENTS
+        if not instruments.enabled:
+            game_states = self.begin_tick()
+            # gather player actions for given gamestate
+            actions = self.player_subset.gather_responses(game_states)
+            self.end_tick(actions)
+            return
+        # same, timing each phase
+        start = time.perf_counter()
+        game_states = self.begin_tick()
+        began = time.perf_counter()
+        actions = self.player_subset.gather_responses(game_states)
+        responded = time.perf_counter()
+        self.end_tick(actions)
+        ended = time.perf_counter()
+        instruments.record('tick.begin', began - start)
+        instruments.record('tick.actors', responded - began)
+        instruments.record('tick.end', ended - responded)
+
+
+    def begin_tick(self) -> List[Tuple[str, List[int]]]:
+        """
+        First half of :meth:`tick`: handles resets, and returns each
+        minigame's game state, as :const:`(gpu, registers)`. Split out so that
+        players' actions can be gathered elsewhere, eg. batched over many
+        games.
+        """
         # check gameovers, if needed
         for i,minigame in enumerate(self.minigames):
             # handle reset, if needed
@@ -63,16 +106,22 @@ class GameManager:
         
         # generate game state output
         # note: score information is prepended automatically by
-        # `PlayerSubset.gather_responses`, so this is simply game output
-        output_lines = [
-            ((minigame.get_gpu() if not minigame.resetting else 'GAME_OVER') +
-            ' ' +
-            ' '.join(
-                map(str, minigame.fill_registers())))
+        # `PlayerSubset.gather_responses`, so this is simply game output.
+        # minigames re-use their register lists, so they are copied here
+        game_states = [
+            ((minigame.get_gpu() if not minigame.resetting else 'GAME_OVER'),
+             tuple(minigame.fill_registers()))
             for minigame in self.minigames ]
-        
-        # gather player actions for given gamestate
-        actions = self.player_subset.gather_responses(output_lines)
+        return game_states
+
+
+    def end_tick(self, actions: List[PlayerAction]) -> None:
+        """
+        Second half of :meth:`tick`: updates all minigames with the players'
+        actions, and hands out medals for finished minigames.
+        """
+        if self.actions_log is not None:
+            self.actions_log.append(encode_actions(actions))
         for minigame in self.minigames:
             minigame.tick(actions)
         
@@ -0,0 +1,137 @@
+import os
+import json
+import numpy as np
+
+from collections import deque
+
+from typing import Deque, List, Tuple, Optional
+
+
+GENES_FILE  = 'genes.f64'
+SCORES_FILE = 'scores.i64'
+META_FILE   = 'meta.json'
+
+
+class GeneHistory:
+    """
+    The gene frames of an evolution run, one per generation. Only the current
+    and previous frames are kept in memory (``history[-1]`` and
+    ``history[-2]``), so a long run does not grow without bound.
+
+    If given a directory, every frame is also appended to an archive there
+    once its players' scores are known (see :meth:`archive`): the frames,
+    back to back, in ``genes.f64``, and their scores in ``scores.i64``. Both
+    are raw little-endian arrays, so any generation of a run (even one still
+    going, or one that crashed) can be read lazily with :func:`read_archive`.
+
+    :meth:`clear` starts a new archive; :meth:`restore` picks an existing one
+    back up, eg. when resuming from a :class:`Checkpoint`.
+    """
+    def __init__(self, n_genes: int, n_players: int, path: Optional[str] = None):
+        self.n_genes:    int                     = n_genes
+        self.n_players:  int                     = n_players
+        self.path:       Optional[str]           = path
+        self.frames:     Deque[np.ndarray]       = deque(maxlen=2)
+        self.generation: int                     = -1
+        """ generation number of :const:`self[-1]`; -1 before the first frame """
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+
+    def __len__(self) -> int:
+        """ The number of generations so far, including those no longer in memory. """
+        return self.generation + 1
+
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        """ ``history[-1]`` is the current frame, ``history[-2]`` the previous one. """
+        if not -len(self.frames) <= idx < 0:
+            raise IndexError(f"only the last {len(self.frames)} gene frames are "
+                             f"in memory; use read_archive() for older ones")
+        return self.frames[idx]
+
+
+    def append(self, frame: np.ndarray) -> None:
+        """ Adds the next generation's frame, dropping the oldest in memory. """
+        if frame.shape != (self.n_genes, self.n_players):
+            raise ValueError(f"expected a gene frame of shape "
+                             f"{(self.n_genes, self.n_players)}, got {frame.shape}")
+        self.frames.append(frame)
+        self.generation += 1
+
+
+    def clear(self) -> None:
+        """ Drops all frames, for a new evolution run; empties the archive, if any. """
+        self.frames.clear()
+        self.generation = -1
+        if self.path is None:
+            return
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump({ 'n_genes': self.n_genes, 'n_players': self.n_players }, f)
+        for name in (GENES_FILE, SCORES_FILE):
+            open(os.path.join(self.path, name), 'wb').close()
+
+
+    def restore(self, frames: List[np.ndarray], generation: int) -> None:
+        """
+        Continues a run at the given generation, whose frame is the last of
+        :const:`frames`. The archive, if any, is cut back to the generations
+        before it, dropping any archived after the checkpoint was taken.
+        """
+        self.frames.clear()
+        for frame in frames:
+            self.frames.append(frame)
+        self.generation = generation
+        if self.path is None:
+            return
+        with open(os.path.join(self.path, META_FILE)) as f:
+            meta = json.load(f)
+        if (meta['n_genes'], meta['n_players']) != (self.n_genes, self.n_players):
+            raise ValueError(f"archive at {self.path} holds frames of shape "
+                             f"{(meta['n_genes'], meta['n_players'])}, not "
+                             f"{(self.n_genes, self.n_players)}")
+        for name, size in ((GENES_FILE, 8 * self.n_genes * self.n_players),
+                           (SCORES_FILE, 8 * self.n_players)):
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                f.truncate(generation * size)
+
+
+    def archive(self, scores: np.ndarray) -> None:
+        """
+        Appends the current frame and its players' final scores to the
+        archive, if any. Called once per generation, before the next frame
+        is appended.
+        """
+        if self.path is None:
+            return
+        with open(os.path.join(self.path, GENES_FILE), 'ab') as f:
+            # gene frames are Fortran-ordered; each player's genes are contiguous
+            f.write(np.asarray(self.frames[-1], dtype='<f8').tobytes(order='F'))
+        with open(os.path.join(self.path, SCORES_FILE), 'ab') as f:
+            f.write(np.asarray(scores, dtype='<i8').tobytes())
+
+
+def read_archive(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Opens the archive of a :class:`GeneHistory` read-only, without loading it.
+    Returns ``(genes, scores)``, memory-mapped arrays of shape
+    :const:`(n_generations, n_genes, n_players)` and
+    :const:`(n_generations, n_players)`. A generation that was only partly
+    written (eg. the run crashed mid-write) is left out.
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    n_genes, n_players = meta['n_genes'], meta['n_players']
+    genes_path = os.path.join(path, GENES_FILE)
+    scores_path = os.path.join(path, SCORES_FILE)
+    n_generations = min(os.path.getsize(genes_path) // (8 * n_genes * n_players),
+                        os.path.getsize(scores_path) // (8 * n_players))
+    if n_generations == 0:
+        return (np.empty((0, n_genes, n_players)), np.empty((0, n_players), dtype=np.int64))
+    genes = np.memmap(genes_path, dtype='<f8', mode='r',
+                      shape=(n_generations, n_players, n_genes))
+    scores = np.memmap(scores_path, dtype='<i8', mode='r',
+                       shape=(n_generations, n_players))
+    # (generation, player, gene) on disk -> (generation, gene, player) views
+    return (genes.transpose(0, 2, 1), scores)
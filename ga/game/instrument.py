@@ -0,0 +1,132 @@
+import math
+
+from typing import List, Dict, Any, Optional
+
+
+class Histogram:
+    """
+    A log-scale histogram of durations, in seconds: 4 linear buckets per
+    power of two, from about 1 ns to 2**23 s, so percentiles are accurate to
+    within about 12%. Recording is a few arithmetic operations, and
+    histograms of any number of samples merge by adding their counts.
+    """
+    SUBBUCKETS = 4
+    MIN_EXP    = -30
+    MAX_EXP    = 24
+    N_BUCKETS  = (MAX_EXP - MIN_EXP) * SUBBUCKETS
+
+    def __init__(self):
+        self.counts:  List[int]  = [ 0 ] * self.N_BUCKETS
+        self.n:       int        = 0
+        self.total:   float      = 0.0
+        self.max:     float      = 0.0
+
+
+    def record(self, seconds: float) -> None:
+        self.n += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        # seconds = mantissa * 2**exp, with mantissa in [0.5, 1)
+        mantissa, exp = math.frexp(seconds)
+        idx = (exp - self.MIN_EXP) * self.SUBBUCKETS + int((mantissa - 0.5) * 2 * self.SUBBUCKETS)
+        self.counts[min(max(idx, 0), self.N_BUCKETS - 1)] += 1
+
+
+    def merge(self, other: 'Histogram') -> None:
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+        self.n += other.n
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+    def percentile(self, p: float) -> float:
+        """ Returns the approximate :const:`p`-th percentile, in seconds. """
+        if self.n == 0:
+            return 0.0
+        target = math.ceil(self.n * p / 100)
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                exp, sub = divmod(idx, self.SUBBUCKETS)
+                # the middle of the bucket
+                mantissa = 0.5 + (sub + 0.5) / (2 * self.SUBBUCKETS)
+                return min(math.ldexp(mantissa, exp + self.MIN_EXP), self.max)
+        return self.max
+
+
+class Instruments:
+    """
+    Phase timers and event counters for the hot paths of playing games.
+    Disabled by default; when disabled, instrumented code only pays for a
+    check of :attr:`enabled`, ie::
+
+        instruments = INSTRUMENTS
+        if instruments.enabled:
+            start = time.perf_counter()
+        ...
+        if instruments.enabled:
+            instruments.record('phase', time.perf_counter() - start)
+
+    Every worker process has its own :const:`INSTRUMENTS`, which it drains
+    after every batch and sends back with the batch's results; the
+    :class:`WorkerPool` merges them into a per-generation breakdown.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled:   bool                  = enabled
+        self.phases:    Dict[str, Histogram]  = {}
+        self.counters:  Dict[str, int]        = {}
+
+
+    def record(self, phase: str, seconds: float) -> None:
+        """ Records one :const:`seconds`-long occurrence of :const:`phase`. """
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.record(seconds)
+
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+
+    def merge(self, other: 'Instruments') -> None:
+        for phase, histogram in other.phases.items():
+            self.phases.setdefault(phase, Histogram()).merge(histogram)
+        for counter, n in other.counters.items():
+            self.count(counter, n)
+
+
+    def drain(self) -> Optional['Instruments']:
+        """
+        Returns everything recorded so far (or :const:`None` if nothing was),
+        and starts over.
+        """
+        if not self.phases and not self.counters:
+            return None
+        drained = Instruments()
+        drained.phases, self.phases = self.phases, {}
+        drained.counters, self.counters = self.counters, {}
+        return drained
+
+
+    def report(self) -> List[str]:
+        """ Returns a line per phase (count, p50, p99, max, total) and per counter. """
+        lines = []
+        if self.phases:
+            lines.append(f"  {'phase':<16} {'count':>9} {'p50 us':>10} {'p99 us':>10} "
+                         f"{'max us':>10} {'total s':>9}")
+        for phase, histogram in sorted(self.phases.items()):
+            lines.append(f"  {phase:<16} {histogram.n:>9} "
+                         f"{histogram.percentile(50)*1e6:>10.1f} "
+                         f"{histogram.percentile(99)*1e6:>10.1f} "
+                         f"{histogram.max*1e6:>10.1f} {histogram.total:>9.3f}")
+        for counter, n in sorted(self.counters.items()):
+            lines.append(f"  {counter:<16} {n:>9}")
+        return lines
+
+
+# this process' instruments
+INSTRUMENTS = Instruments()
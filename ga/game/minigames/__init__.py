@@ -4,3 +4,7 @@ from .hurdles import HurdlesGame
 from .archery import ArcheryGame
 from .skating import SkatingGame
 from .diving import DivingGame
+
+
+# the four minigames, in the order they are played and sent to players
+MINIGAME_TYPES = ( HurdlesGame, ArcheryGame, SkatingGame, DivingGame )
@@ -1,19 +1,36 @@
 import random
+import itertools
 
 from .minigame import Minigame, PlayerAction
 
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 
 
 # magic numbers extracted from java code
 WIND_WEIGHTS = [ 0, 2, 2, 2, 0.5, 0.5, 0.25, 0.25, 0.25, 0.2 ]
+# cumulative form of the above, for `Random.choices`
+WIND_CUM_WEIGHTS = list(itertools.accumulate(WIND_WEIGHTS))
+WIND_DIRECTIONS = range(len(WIND_WEIGHTS))
+
+
+def random_winds(rng: random.Random, k: int) -> List[int]:
+    """
+    Draws :const:`k` random wind strengths, 0-9, distributed as
+    :const:`WIND_WEIGHTS`, with one uniform draw each.
+    """
+    return rng.choices(WIND_DIRECTIONS, cum_weights=WIND_CUM_WEIGHTS, k=k)
+
 
 # translated from https://github.com/CodinGame/SummerChallenge2024Olymbits/blob/main/src/main/java/com/codingame/game/mini/Archery.java
 class ArcheryGame(Minigame):
-    def __init__(self):
-        super().__init__("archery")
+    __slots__ = ('cursors', 'wind', 'wind_gpu', 'turn', 'arrows', 'dead')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        super().__init__("archery", rng)
         self.cursors:  List[List[int]]  = []  # list of x,y pairs. init below
-        self.wind:     List[int]        = []  # list of directions. no init
+        self.wind:     Tuple[int, ...]  = ()  # directions, set at reset
+        self.wind_gpu: str              = ""  # `wind` as digits
+        self.turn:     int              = 0   # index of the current wind
         self.arrows:   bool             = False
         self.dead:     List[bool]       = self._filled_array(False)
 
@@ -23,53 +40,44 @@ class ArcheryGame(Minigame):
 
 
     @staticmethod
-    def _random_direction():
-        """ Helper method to choose a random wind direction, 0-9. """
-        rand = random.random()
-        # normalize weights to sum to 1
-        total = sum(WIND_WEIGHTS)
-        b = 1 / total
-        weights = list(map(lambda v: v*b, WIND_WEIGHTS))
-        # choose index
-        cur = 0
-        for i in range(len(weights)):
-            cur += weights[i]
-            if (cur >= rand):
-                return i
-        return 0
+    def generate_scenario(rng):
+        """ An archery scenario is the cursors' start, and the wind digits. """
+        random_sign = lambda: 1 if rng.randint(0,1) else -1
+        x = (5 + rng.randrange(5)) * random_sign()
+        y = (5 + rng.randrange(5)) * random_sign()
+        rounds = 12 + rng.randrange(4)
+        return (x, y, ''.join(map(str, random_winds(rng, rounds))))
 
-    
-    def _reset(self):
-        random_sign = lambda: 1 if random.randint(0,1) else -1
-        x = (5 + random.randrange(5)) * random_sign()
-        y = (5 + random.randrange(5)) * random_sign()
+
+    def load_scenario(self, scenario):
+        x, y, wind = scenario
         for cursor in self.cursors:
             cursor[0] = x
             cursor[1] = y
         
-        self.wind.clear()
-        rounds = 12 + random.randrange(4)
-        for i in range(rounds):
-            self.wind.append(self._random_direction())
+        self.wind = tuple(map(int, wind))
+        self.wind_gpu = wind
+        self.turn = 0
         
         self.arrows = False
 
 
-    def _get_gpu(self):
-        return ''.join(map(str, self.wind))
+    def get_gpu(self):
+        return self.wind_gpu[self.turn:]
 
 
-    def _fill_registers(self):
-        return [
-            self.cursors[0][0], self.cursors[0][1],
-            self.cursors[1][0], self.cursors[1][1],
-            self.cursors[2][0], self.cursors[2][1]
-        ]
+    def fill_registers(self):
+        regs = self.registers
+        regs[0], regs[1] = self.cursors[0]
+        regs[2], regs[3] = self.cursors[1]
+        regs[4], regs[5] = self.cursors[2]
+        return regs
 
 
-    def _tick(self, player_actions):
+    def tick(self, player_actions):
         maxDist = 20
-        offset = self.wind.pop(0)
+        offset = self.wind[self.turn]
+        self.turn += 1
 
         for i in range(3):
             
@@ -106,11 +114,11 @@ class ArcheryGame(Minigame):
         self.arrows = self.is_game_over()
 
 
-    def _is_game_over(self):
-        return len(self.wind) == 0
+    def is_game_over(self):
+        return self.turn >= len(self.wind)
 
     
-    def _get_rankings(self):
+    def get_rankings(self):
         score_by_player: Dict[int, float] = {}
         for i in range(3):
             if self.dead[i]:
@@ -1,15 +1,19 @@
 import random
 
-from .minigame import Minigame, PlayerAction
+from .minigame import Minigame, PlayerAction, LETTER_ACTIONS
 
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 
 
 # translated from https://github.com/CodinGame/SummerChallenge2024Olymbits/blob/main/src/main/java/com/codingame/game/mini/Diving.java
 class DivingGame(Minigame):
-    def __init__(self):
-        super().__init__("diving")
-        self.goal:           List[PlayerAction]        = []  # no init
+    __slots__ = ('goal', 'goal_gpu', 'turn', 'player_inputs', 'turns_left', 'points', 'combo', 'dead')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        super().__init__("diving", rng)
+        self.goal:           Tuple[PlayerAction, ...]  = ()  # set at reset
+        self.goal_gpu:       str                       = ""  # `goal` as letters
+        self.turn:           int                       = 0   # index of the current goal
         self.player_inputs:  List[List[PlayerAction]]  = []  # no init
         self.turns_left:     int                       = 0
         self.points:         List[int]                 = self._filled_array(0)
@@ -17,36 +21,47 @@ class DivingGame(Minigame):
         self.dead:           List[bool]                = self._filled_array(False)
 
 
-    def _reset(self):
-        self.goal.clear()
+    @staticmethod
+    def generate_scenario(rng):
+        """ A diving scenario is its goal, as letters. """
+        length = 12 + rng.randrange(4)
+        return ''.join(
+            rng.choice([PlayerAction.UP,
+                        PlayerAction.DOWN,
+                        PlayerAction.LEFT,
+                        PlayerAction.RIGHT]).name[0]
+            for i in range(length))
+
+
+    def load_scenario(self, scenario):
         self.player_inputs.clear()
 
-        length = 12 + random.randrange(4)
-        for i in range(length):
-            random_action = random.choice([PlayerAction.UP,
-                                           PlayerAction.DOWN,
-                                           PlayerAction.LEFT,
-                                           PlayerAction.RIGHT])
-            self.goal.append(random_action)
+        self.goal = tuple(LETTER_ACTIONS[letter] for letter in scenario)
+        self.goal_gpu = scenario
+        self.turn = 0
 
         for i in range(3):
             self.points[i] = 0
             self.combo[i] = 0
             self.player_inputs.append([])
         
-        self.turns_left = length + 1
+        self.turns_left = len(self.goal) + 1
 
 
-    def _get_gpu(self):
-        return ''.join(map(lambda a: a.name[0], self.goal))
+    def get_gpu(self):
+        return self.goal_gpu[self.turn:]
 
 
-    def _fill_registers(self):
-        return self.points + self.combo
+    def fill_registers(self):
+        regs = self.registers
+        regs[0:3] = self.points
+        regs[3:6] = self.combo
+        return regs
 
 
-    def _tick(self, player_actions):
-        this_goal = self.goal.pop(0)
+    def tick(self, player_actions):
+        this_goal = self.goal[self.turn]
+        self.turn += 1
 
         for i in range(3):
             
@@ -63,14 +78,14 @@ class DivingGame(Minigame):
             
             self.player_inputs[0].append(action)
         
-        self.turns_left = len(self.goal) + 1
+        self.turns_left = len(self.goal) - self.turn + 1
 
 
-    def _is_game_over(self):
-        return len(self.goal) == 0
+    def is_game_over(self):
+        return self.turn >= len(self.goal)
     
 
-    def _get_rankings(self):
+    def get_rankings(self):
         score_by_player: Dict[int, float] = {}
         for i in range(3):
             if self.dead[i]:
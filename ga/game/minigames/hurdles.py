@@ -2,13 +2,15 @@ import random
 
 from .minigame import Minigame, PlayerAction
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 # translated from https://github.com/CodinGame/SummerChallenge2024Olymbits/blob/main/src/main/java/com/codingame/game/mini/HurdleRace.java
 class HurdlesGame(Minigame):
-    def __init__(self):
-        super().__init__("hurdles")
+    __slots__ = ('map', 'positions', 'stun_timers', 'dead', 'jumped', 'finished', 'rank')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        super().__init__("hurdles", rng)
         self.map:          str         = ""
         self.positions:    List[int]   = self._filled_array(0)
         self.stun_timers:  List[int]   = self._filled_array(0)
@@ -18,18 +20,12 @@ class HurdlesGame(Minigame):
         self.rank:         int         = 0
     
 
-    def _reset(self):
-        # reset states
-        for i in range(3):
-            self.positions[i] = 0
-            self.stun_timers[i] = 0
-            self.finished[i] = -1
-            self.rank = 0
-            self.jumped[i] = False
-        
+    @staticmethod
+    def generate_scenario(rng):
+        """ A hurdles scenario is its map. """
         # generate new map information
-        start_stretch = 3 + random.randrange(5)
-        hurdles = 3 + random.randrange(4)
+        start_stretch = 3 + rng.randrange(5)
+        hurdles = 3 + rng.randrange(4)
         length = 30  # const: length of map
         sb = ""  # python equivalent of StringBuilder
 
@@ -37,22 +33,36 @@ class HurdlesGame(Minigame):
         sb += '.' * start_stretch
         for i in range(hurdles):
             sb += "#..."
-            if (random.randint(0,1)):
+            if (rng.randint(0,1)):
                 sb += "."
         while (len(sb) < length):
             sb += "."
-        self.map = sb[0:length-1] + "."
+        return sb[0:length-1] + "."
+
+
+    def load_scenario(self, scenario):
+        # reset states
+        for i in range(3):
+            self.positions[i] = 0
+            self.stun_timers[i] = 0
+            self.finished[i] = -1
+            self.rank = 0
+            self.jumped[i] = False
+        self.map = scenario
     
 
-    def _get_gpu(self):
+    def get_gpu(self):
         return self.map
     
 
-    def _fill_registers(self):
-        return self.positions + self.stun_timers
+    def fill_registers(self):
+        regs = self.registers
+        regs[0:3] = self.positions
+        regs[3:6] = self.stun_timers
+        return regs
     
 
-    def _tick(self, player_actions):
+    def tick(self, player_actions):
         maxX = len(self.map) - 1
         countFinishes = 0
 
@@ -102,7 +112,7 @@ class HurdlesGame(Minigame):
         self.rank += countFinishes
     
 
-    def _is_game_over(self):
+    def is_game_over(self):
         count = 0
         for i in range(3):
            #if self.finished[i] > -1 and self.get_const('EARLY_RACE_END'):
@@ -113,7 +123,7 @@ class HurdlesGame(Minigame):
         return count >= 2
     
 
-    def _get_rankings(self):
+    def get_rankings(self):
        #if (self.get_const('EARLY_RACE_END')):
         if True:
             score_by_player: Dict[int, float] = {}
@@ -1,8 +1,8 @@
-import sys
+import abc
 import enum
-from matplotlib import pyplot as plt
+import random
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 
 
 class PlayerAction(enum.Enum):
@@ -17,65 +17,109 @@ class PlayerAction(enum.Enum):
     def list_values(cls) -> List[int]:
         return list(map(lambda a: a.value, cls))
 
-class Minigame:
-    def __init__(self, name: str):
+
+# actions by the letter they are shown as in GPUs
+LETTER_ACTIONS: Dict[str, PlayerAction] = {
+    action.name[0]: action for action in (PlayerAction.UP, PlayerAction.DOWN,
+                                          PlayerAction.LEFT, PlayerAction.RIGHT)
+}
+
+class Minigame(abc.ABC):
+    """
+    Base class of the four minigames. Subclasses implement every abstract
+    method, and declare their state in :const:`__slots__`.
+
+    All randomness of a round is drawn up front, at reset, as a "scenario"
+    (see :meth:`generate_scenario`). Scenarios are drawn from :attr:`rng`,
+    usually the stream of the whole match (see :class:`GameManager`), so a
+    match can be replayed from its seed; or, if :attr:`scenarios` is set,
+    taken from it in order, so that many matches play the same rounds.
+    If :attr:`recorded` is set, every scenario played is appended to it.
+    """
+    __slots__ = ('_name', 'rng', 'scenarios', 'n_scenarios', 'recorded',
+                 'should_reset', 'resetting', 'registers')
+
+    # number of registers sent to players, per minigame
+    N_REGISTERS = 7
+
+    def __init__(self, name: str, rng: Optional[random.Random] = None):
         # save metadata
-        self.__name = name
+        self._name = name
+        self.rng:           random.Random            = rng if rng is not None else random.Random()
+        # fixed scenarios to play in order, if any; see `ScenarioBank`
+        self.scenarios:     Optional[Sequence[Any]]  = None
+        self.n_scenarios:   int                      = 0
+        # scenarios played so far, if recording; see `MatchTrace`
+        self.recorded:      Optional[List[Any]]      = None
         # init other data (used for resetting (duh))
-        self.should_reset:  bool  = False
-        self.resetting:     bool  = False
-        # check for all funcs
-        for attr in ['_reset', '_get_gpu', '_fill_registers', '_tick', '_is_game_over', '_get_rankings']:
-            if not hasattr(self, attr):
-                print(f"!! Warning: Minigame {name} does not implement {attr}", file=sys.stderr)
+        self.should_reset:  bool                     = False
+        self.resetting:     bool                     = False
+        # registers are filled in-place by `fill_registers`; unused ones stay 0
+        self.registers:     List[int]                = [ 0 ] * self.N_REGISTERS
     
     @property
     def name(self) -> str:
-        return self.__name
+        return self._name
     
 
     def reset(self) -> None:
-        """ Generate the GPU for this game step. """
-        if not hasattr(self, '_reset'):
-            raise NotImplementedError("Games must override _reset()")
-        return getattr(self, '_reset')()
+        """
+        Starts a new round of this game, with the next scenario of
+        :attr:`scenarios` if set, or else a new random one. The scenarios
+        are cycled through if a match plays more rounds than there are.
+        """
+        if self.scenarios is None:
+            scenario = self.generate_scenario(self.rng)
+        else:
+            scenario = self.scenarios[self.n_scenarios % len(self.scenarios)]
+        self.n_scenarios += 1
+        if self.recorded is not None:
+            self.recorded.append(scenario)
+        self.load_scenario(scenario)
+
+
+    @staticmethod
+    @abc.abstractmethod
+    def generate_scenario(rng: random.Random) -> Any:
+        """
+        Draws the random part of a round of this game: everything that would
+        otherwise be drawn at its reset and during its ticks. Scenarios are
+        made of strings and ints only, so they can be serialized.
+        """
+
+
+    @abc.abstractmethod
+    def load_scenario(self, scenario: Any) -> None:
+        """ Starts a new round of this game, with the given scenario. """
     
 
+    @abc.abstractmethod
     def get_gpu(self) -> str:
         """ Generate the GPU for this game step. """
-        if not hasattr(self, '_get_gpu'):
-            raise NotImplementedError("Games must override _get_gpu()")
-        return getattr(self, '_get_gpu')()
     
 
+    @abc.abstractmethod
     def fill_registers(self) -> List[int]:
-        """ Generate the registers for this game step. """
-        if not hasattr(self, '_fill_registers'):
-            raise NotImplementedError("Games must override _fill_registers()")
-        regs = getattr(self, '_fill_registers')()
-        while len(regs) < 7: regs.append(0)
-        return regs
+        """
+        Generate the registers for this game step, into :attr:`registers`,
+        and return it. The same list is re-used every step; copy it to keep
+        it.
+        """
     
 
+    @abc.abstractmethod
     def tick(self, player_actions: List[PlayerAction]) -> None:
         """ Updates this game state with the actions taken by players. """
-        if not hasattr(self, '_tick'):
-            raise NotImplementedError("Games must override _tick()")
-        return getattr(self, '_tick')(player_actions)
     
 
+    @abc.abstractmethod
     def is_game_over(self) -> bool:
         """ Determines if the game is over in its current state. """
-        if not hasattr(self, '_is_game_over'):
-            raise NotImplementedError("Games must override _is_game_over()")
-        return getattr(self, '_is_game_over')()
     
 
+    @abc.abstractmethod
     def get_rankings(self) -> List[int]:
-        """ Determines if the game is over in its current state. """
-        if not hasattr(self, '_get_rankings'):
-            raise NotImplementedError("Games must override _get_rankings()")
-        return getattr(self, '_get_rankings')()
+        """ Ranks the players in the current game state. """
     
 
     def _filled_array(self, value: Any, length: Optional[int] = ...) -> List:
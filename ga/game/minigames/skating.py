@@ -1,43 +1,75 @@
 import random
+import itertools
 
-from .minigame import Minigame, PlayerAction
+from .minigame import Minigame, PlayerAction, LETTER_ACTIONS
 
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
+
+
+# turns per round
+TURNS = 15
+# every order of the four directions, by its letters
+ORDER_ACTIONS: Dict[str, Tuple[PlayerAction, ...]] = {
+    ''.join(letters): tuple(LETTER_ACTIONS[letter] for letter in letters)
+    for letters in itertools.permutations('UDLR')
+}
 
 
 # translated from https://github.com/CodinGame/SummerChallenge2024Olymbits/blob/main/src/main/java/com/codingame/game/mini/RollerSpeedSkating.java
 class SkatingGame(Minigame):
-    def __init__(self):
-        super().__init__("skating")
-        self.positions:   List[int]           = self._filled_array(0)
-        self.risk:        List[int]           = self._filled_array(0)
-        self.dead:        List[bool]          = self._filled_array(False)
-        self.directions:  List[PlayerAction]  = [PlayerAction.UP,
-                                                 PlayerAction.DOWN,
-                                                 PlayerAction.LEFT,
-                                                 PlayerAction.RIGHT]
-        self.timer:       int                 = 0
+    __slots__ = ('positions', 'risk', 'dead', 'orders', 'turn', 'directions', 'timer')
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        super().__init__("skating", rng)
+        self.positions:   List[int]                 = self._filled_array(0)
+        self.risk:        List[int]                 = self._filled_array(0)
+        self.dead:        List[bool]                = self._filled_array(False)
+        self.orders:      Tuple[str, ...]           = ()  # each turn's order, as letters
+        self.turn:        int                       = 0
+        self.directions:  Tuple[PlayerAction, ...]  = ()  # this turn's order
+        self.timer:       int                       = 0
     
 
-    def _reset(self):
+    @staticmethod
+    def generate_scenario(rng):
+        """
+        A skating scenario is the order of the directions on every turn, as
+        letters. The directions are re-shuffled after each turn.
+        """
+        directions = [PlayerAction.UP,
+                      PlayerAction.DOWN,
+                      PlayerAction.LEFT,
+                      PlayerAction.RIGHT]
+        orders = []
+        for turn in range(TURNS):
+            rng.shuffle(directions)
+            orders.append(''.join(map(lambda a: a.name[0], directions)))
+        return tuple(orders)
+
+
+    def load_scenario(self, scenario):
         for i in range(3):
             self.positions[i] = 0
             self.risk[i] = 0
-        random.shuffle(self.directions)
-        self.timer = 15
+        self.orders = scenario
+        self.turn = 0
+        self.directions = ORDER_ACTIONS[scenario[0]]
+        self.timer = len(scenario)
 
 
-    def _get_gpu(self):
-        return ''.join(map(lambda a: a.name[0], self.directions))
+    def get_gpu(self):
+        return self.orders[self.turn]
 
 
-    def _fill_registers(self):
-        return self.positions + \
-               self.risk      + \
-               [ self.timer ]
+    def fill_registers(self):
+        regs = self.registers
+        regs[0:3] = self.positions
+        regs[3:6] = self.risk
+        regs[6] = self.timer
+        return regs
 
 
-    def _tick(self, player_actions):
+    def tick(self, player_actions):
         # update player positions
         for i in range(3):
             
@@ -77,15 +109,17 @@ class SkatingGame(Minigame):
             if self.risk[i] >= 5:
                 self.risk[i] = -2  # stun
         
-        random.shuffle(self.directions)
         self.timer -= 1
+        if self.timer > 0:
+            self.turn += 1
+            self.directions = ORDER_ACTIONS[self.orders[self.turn]]
 
 
-    def _is_game_over(self):
+    def is_game_over(self):
         return self.timer <= 0
 
 
-    def _get_rankings(self):
+    def get_rankings(self):
         score_by_player: Dict[int, float] = {}
         for i in range(3):
             if self.dead[i]:
@@ -0,0 +1,100 @@
+import time
+
+from .game_manager import GameManager
+from .player_manager import PlayerSubset
+from .player import MultiplexedActor, MultiplexedPlayer
+from .minigames import PlayerAction
+from .scenarios import ScenarioBank
+from .instrument import INSTRUMENTS
+from .trace import MatchTrace, TraceWriter
+
+from typing import List, Dict, Optional
+
+
+def play_multiplexed(actor:              MultiplexedActor,
+                     subsets:            List[PlayerSubset],
+                     seeds:              List[int],
+                     rounds:             int,
+                     do_debug_printing:  bool,
+                     do_info_printing:   bool,
+                     scenarios:          Optional[ScenarioBank] = None,
+                     trace:              Optional[TraceWriter] = None) -> List[Dict[int, int]]:
+    """
+    Plays several games in lockstep, all of whose players are
+    :class:`MultiplexedPlayer`s hosted by the same :const:`actor`, each with
+    its match seed in :const:`seeds` (or all with the given scenario bank).
+    Every tick,
+    the requests of all players of all games are sent as a single batch.
+    Returns each game's scores, see :meth:`PlayerSubset.finalize_scores`.
+    If given a :class:`TraceWriter`, every game is recorded to it.
+
+    If the actor misses a batch's deadline, it is killed, and every player
+    of that batch is marked dead; the caller respawns it for its next games.
+
+    If instrumented, each phase of a tick is timed over the whole batch.
+    """
+    instruments = INSTRUMENTS
+    # assign slots and initialize players
+    for game_i, subset in enumerate(subsets):
+        for player in subset.players:
+            player: MultiplexedPlayer
+            player.attach(actor, 3*game_i + player.player_idx)
+        subset.init_player_processes()
+    game_managers = [
+        GameManager(do_debug_printing = do_debug_printing,
+                    do_info_printing  = do_info_printing,
+                    player_subset     = subset,
+                    seed              = seed,
+                    scenarios         = scenarios,
+                    record            = trace is not None)
+        for subset, seed in zip(subsets, seeds) ]
+
+    # play all games -- `rounds` steps per game
+    for round_i in range(rounds):
+        if instruments.enabled:
+            start = time.perf_counter()
+        requests = []
+        owners = []
+        for game_i, game_manager in enumerate(game_managers):
+            subset = game_manager.player_subset
+            state = subset.tick_state(game_manager.begin_tick()).binary()
+            for player in subset.players:
+                if subset.is_active(player.player_idx):
+                    requests.append( (player.slot, state) )
+                    owners.append( (game_i, player) )
+
+        if instruments.enabled:
+            began = time.perf_counter()
+        all_actions = [ [ PlayerAction.ERROR ] * 3 for _ in subsets ]
+        if requests:
+            try:
+                responses = actor.query(requests)
+            except Exception as e:
+                # the whole batch is lost; every player still in it is dead
+                responses = None
+                for game_i, player in owners:
+                    subsets[game_i].mark_dead(player.player_idx, e)
+            if responses is not None:
+                for (game_i, player), response in zip(owners, responses):
+                    player.ticks += 1
+                    all_actions[game_i][player.player_idx] = response
+
+        if instruments.enabled:
+            responded = time.perf_counter()
+        for game_manager, actions in zip(game_managers, all_actions):
+            game_manager.end_tick(actions)
+        if instruments.enabled:
+            ended = time.perf_counter()
+            instruments.record('tick.begin', began - start)
+            instruments.record('tick.actors', responded - began)
+            instruments.record('tick.end', ended - responded)
+
+    # finally, accumulate each player's score
+    results = []
+    for subset in subsets:
+        results.append(subset.finalize_scores())
+        subset.close_player_processes()
+    if trace is not None:
+        for game_manager in game_managers:
+            trace.write(MatchTrace.from_game(game_manager))
+    return results
@@ -1,37 +1,312 @@
+import os
+import time
+import struct
 import subprocess
 import select
+import asyncio
 import numpy as np
 
 from .minigames import PlayerAction
+from .instrument import INSTRUMENTS
 
-from typing import List
+from typing import List, Tuple, Sequence, Optional
 
-# TODO
+
+# number of ticks the actor plays per game, before it expects a new header.
+# mirrors `N_TICKS` in `actor/Answer.cpp`.
+ACTOR_TICKS = 100
+
+# binary tick protocol, see `actor/protocol.hpp`: scores, medals, then each
+# minigame's fixed-width GPU and registers. little-endian, no padding.
+BINARY_GPU_LENGTH = 32
+BINARY_HEADER = struct.Struct('<3i36B')
+BINARY_GAME = struct.Struct(f'<{BINARY_GPU_LENGTH}s7h')
+BINARY_TICK = struct.Struct('<3i36B' + f'{BINARY_GPU_LENGTH}s7h' * 4)
+# one-byte replies of the binary protocol, by value
+BINARY_ACTIONS = ( PlayerAction.UP, PlayerAction.DOWN,
+                   PlayerAction.LEFT, PlayerAction.RIGHT )
+
+# header flag asking the actor to follow each action with the tick's timings,
+# in ns (see `TelemetryRecord` in `actor/protocol.hpp`): parsing, each
+# minigame's `getCosts`, and the whole tick. sent while instrumenting
+ACTOR_FLAG_TELEMETRY = 1
+BINARY_TELEMETRY = struct.Struct('<6I')
+TELEMETRY_PHASES = ( 'actor.parse', 'actor.hurdles', 'actor.archery',
+                     'actor.skating', 'actor.diving', 'actor.total' )
+
+
+class ScoreHeader:
+    """
+    The first part of every tick's state: each player's running score and
+    medals. These only change when a minigame ends, so a header is built
+    once and shared by all ticks until then; its encodings are built at most
+    once.
+    """
+    __slots__ = ('scores', 'medals', '_lines', '_text', '_binary')
+
+    def __init__(self, scores: List[int], medals: List[List[int]]):
+        self.scores:  List[int]        = scores
+        """ self.scores[player_idx] = score """
+        self.medals:  List[List[int]]  = medals
+        """ self.medals[player_idx] = [gold, silver, bronze] * 4 minigames """
+        self._lines:  Optional[List[str]]  = None
+        self._text:   Optional[bytes]      = None
+        self._binary: Optional[bytes]      = None
+
+
+    def lines(self) -> List[str]:
+        """ Returns the header in the text protocol, one line per player. """
+        if self._lines is None:
+            self._lines = [
+                ' '.join(map(str, [ self.scores[pidx] ] + self.medals[pidx]))
+                for pidx in range(3)
+            ]
+        return self._lines
+
+
+    def text(self) -> bytes:
+        """ Returns the encoded lines of :meth:`lines`, newline-terminated. """
+        if self._text is None:
+            self._text = ''.join(line + '\n' for line in self.lines()).encode('ascii')
+        return self._text
+
+
+    def binary(self) -> bytes:
+        """ Returns the header in the binary protocol, see :const:`BINARY_HEADER`. """
+        if self._binary is None:
+            values = list(self.scores)
+            for player_medals in self.medals:
+                values += player_medals
+            self._binary = BINARY_HEADER.pack(*values)
+        return self._binary
+
+
+class TickState:
+    """
+    Everything the players are told in a single tick: the score header, and
+    each minigame's GPU and registers. The same state is sent to all three
+    players, so its encodings are built at most once.
+    """
+    __slots__ = ('header', 'games', '_text_lines', '_text', '_binary')
+
+    def __init__(self,
+                 header:  ScoreHeader,
+                 games:   List[Tuple[str, List[int]]]):
+        self.header:  ScoreHeader                  = header
+        self.games:   List[Tuple[str, List[int]]]  = games
+        """ self.games[minigame_idx] = (gpu, registers) """
+        self._text_lines: Optional[List[str]] = None
+        self._text:       Optional[bytes]     = None
+        self._binary:     Optional[bytes]     = None
+
+
+    @property
+    def scores(self) -> List[int]:
+        return self.header.scores
+
+
+    @property
+    def medals(self) -> List[List[int]]:
+        return self.header.medals
+
+
+    def text_lines(self) -> List[str]:
+        """ Returns the state in the text protocol read by `Answer.cpp`. """
+        if self._text_lines is None:
+            self._text_lines = self.header.lines() + [
+                gpu + ' ' + ' '.join(map(str, registers))
+                for gpu, registers in self.games
+            ]
+        return self._text_lines
+
+
+    def text(self) -> bytes:
+        """ Returns the encoded lines of :meth:`text_lines`, newline-terminated. """
+        if self._text is None:
+            self._text = self.header.text() + ''.join(
+                gpu + ' ' + ' '.join(map(str, registers)) + '\n'
+                for gpu, registers in self.games
+            ).encode('ascii')
+        return self._text
+
+
+    def binary(self) -> bytes:
+        """ Returns the state in the binary protocol, see :const:`BINARY_TICK`. """
+        if self._binary is None:
+            self._binary = self.header.binary() + b''.join(
+                BINARY_GAME.pack(gpu.encode('ascii'), *registers)
+                for gpu, registers in self.games)
+        return self._binary
+
+
+# weights an actor takes: a polynomial's 4 coefficients per minigame, see
+# `N_GAMES` and `Polynomial` in the actor
+ACTOR_WEIGHTS = 4 * 4
+
+# multiplexed protocol, see `SlotInit` and `SlotTick` in `actor/protocol.hpp`
+MULTIPLEX_INIT = struct.Struct(f'<cHB{ACTOR_WEIGHTS}d')
+MULTIPLEX_TICK = struct.Struct('<cH')
+MULTIPLEX_SLOT = struct.Struct('<H')
+MULTIPLEX_BAD_SLOT = 0xFF
+
+
+class ActorTimeout(TimeoutError):
+    """
+    Raised when an actor misses its deadline. The actor process has already
+    been killed; :attr:`waited` is the time lost waiting on it, in seconds.
+    """
+    def __init__(self, message: str, waited: float):
+        super().__init__(message)
+        self.waited: float = waited
+
+
+def spawn_actor_process(executable_path: str, args: List[str] = []) -> subprocess.Popen:
+    """ Starts a new actor process, without an intermediate shell. """
+    return subprocess.Popen(
+        [ executable_path ] + args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL)  # TODO pipe this?
+
+
+class ActorPool:
+    """
+    A bounded pool of long-lived actor processes. An actor process that has
+    played a full game of :const:`ACTOR_TICKS` ticks is waiting for a new
+    header, so it can be handed back here and re-seeded with new genes and a
+    new player index instead of spawning a fresh process for every game.
+    """
+    def __init__(self, executable_path: str, size: int = 3, args: List[str] = []):
+        self.executable_path:  str                     = executable_path
+        self.size:             int                     = size
+        self.args:             List[str]               = args
+        self.idle:             List[subprocess.Popen]  = []
+        self.n_spawned:        int                     = 0
+
+
+    def acquire(self) -> subprocess.Popen:
+        """ Returns an idle actor process, spawning one if none are idle. """
+        while self.idle:
+            process = self.idle.pop()
+            if process.poll() is None:
+                return process
+            process.wait()  # reap
+        self.n_spawned += 1
+        return spawn_actor_process(self.executable_path, self.args)
+
+
+    def release(self, process: subprocess.Popen, reusable: bool) -> None:
+        """
+        Returns a process to the pool. Processes that are not in a known state
+        (ie. did not finish their game), or that would grow the pool past its
+        size, are killed and reaped instead.
+        """
+        if reusable and process.poll() is None and len(self.idle) < self.size:
+            self.idle.append(process)
+            return
+        _kill_process(process)
+
+
+    def close(self) -> None:
+        """ Kills and reaps all idle processes. """
+        for process in self.idle:
+            _kill_process(process)
+        self.idle.clear()
+
+
+def _kill_process(process: subprocess.Popen) -> None:
+    """ Kills and reaps the given process, so no zombie is left behind. """
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+def _read_reply(process: subprocess.Popen, pending: bytearray, size: Optional[int],
+                timeout: Optional[float], name: str) -> bytes:
+    """
+    Reads :const:`size` bytes, or a line if :const:`None`, from an actor
+    process; fewer only at end of file. Bytes read past the reply are kept in
+    :const:`pending`, for the next read. If the actor does not reply within
+    :const:`timeout` seconds, it is killed and :class:`ActorTimeout` is
+    raised.
+    """
+    # read the pipe directly, so that `select` sees everything unread
+    fd = process.stdout.fileno()
+    start = time.monotonic()
+    while True:
+        if size is None:
+            end = pending.find(b'\n') + 1
+        else:
+            end = size if len(pending) >= size else 0
+        if end:
+            reply = bytes(pending[:end])
+            del pending[:end]
+            return reply
+        if timeout is not None:
+            remaining = start + timeout - time.monotonic()
+            if remaining <= 0 or not select.select([ fd ], [], [], remaining)[0]:
+                waited = time.monotonic() - start
+                _kill_process(process)
+                raise ActorTimeout(f"{name}, no reply after {waited:.3f}s", waited)
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            reply = bytes(pending)
+            pending.clear()
+            return reply
+        pending += chunk
 
 
 class Player:
+    # command line arguments of this player's actor processes
+    ACTOR_ARGS: List[str] = []
+    # deadlines, in seconds, for the actor's reply to a tick and to the
+    # header; `None` waits forever. see :meth:`set_deadlines`
+    TICK_TIMEOUT: Optional[float] = 0.5
+    INIT_TIMEOUT: Optional[float] = 5.0
+
     def __init__(self, executable_path: str, gene_idx: int, player_idx: int, genes: np.array):
         self.executable_path = executable_path
         self.gene_idx = gene_idx
         self.player_idx = player_idx
         self.genes = genes
         self.process: subprocess.Popen = None
+        self.pool: Optional[ActorPool] = None
+        self.ticks: int = 0
+        self.telemetry: bool = False
+        self._pending: bytearray = bytearray()
+
+
+    @staticmethod
+    def set_deadlines(tick_timeout: Optional[float], init_timeout: Optional[float]) -> None:
+        """ Sets the reply deadlines of all players, in seconds. """
+        Player.TICK_TIMEOUT = tick_timeout
+        Player.INIT_TIMEOUT = init_timeout
+
     
-    def init(self):
-        ...
+    def init(self, pool: Optional[ActorPool] = None):
+        """
+        Prepares an actor process for a new game. If a :class:`ActorPool` is
+        given, the process is taken from (and later returned to) the pool; it
+        must have been created with this class' :const:`ACTOR_ARGS`.
 
+        While instrumenting, the actor is asked for per-tick telemetry, which
+        is recorded along with the harness' own timings.
+        """
         # open process
-        self.process = subprocess.Popen(
-            [ self.executable_path ],
-            shell=True,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL)  # TODO pipe this?
+        self.pool = pool
+        self.ticks = 0
+        self.telemetry = INSTRUMENTS.enabled
+        self._pending = bytearray()
+        if pool is not None:
+            self.process = pool.acquire()
+        else:
+            self.process = spawn_actor_process(self.executable_path, self.ACTOR_ARGS)
         
         # communicate initial information to process:
         #   line 0:  int player_idx
-        #   line 1:  int nGames
-        self.process.stdin.write(f'{self.player_idx}\n4\n'.encode('utf-8'))
+        #   line 1:  int nGames [int flags]
+        flags = f' {ACTOR_FLAG_TELEMETRY}' if self.telemetry else ''
+        self.process.stdin.write(f'{self.player_idx}\n4{flags}\n'.encode('utf-8'))
         self.process.stdin.flush()
         
         # communicate genes
@@ -40,23 +315,40 @@ class Player:
         self.process.stdin.flush()
 
         # ensure state good
-        # this will hang if not enough genes have been input
-        stdout = self.process.stdout.readline().decode('utf-8').strip()
+        # this times out if not enough genes have been input
+        stdout = self._read(None, self.INIT_TIMEOUT).decode('utf-8').strip()
         if stdout != "INITIALIZED":
             raise Exception("Not good state!")
+
+
+    def _read(self, size: Optional[int], timeout: Optional[float]) -> bytes:
+        """
+        Reads :const:`size` bytes, or a line if :const:`None`, from the actor
+        process; see :func:`_read_reply`.
+        """
+        return _read_reply(self.process, self._pending, size, timeout,
+                           f"Actor {self.player_idx}, gene index {self.gene_idx}")
+
+
+    def _record_telemetry(self, record: Sequence[int]) -> None:
+        """ Records an actor's telemetry for a tick, see :const:`TELEMETRY_PHASES`. """
+        instruments = INSTRUMENTS
+        for phase, ns in zip(TELEMETRY_PHASES, record):
+            instruments.record(phase, int(ns) / 1e9)
     
 
-    def get_response(self, input_lines: List[str]) -> PlayerAction:
+    def get_response(self, state: TickState) -> PlayerAction:
         """
         Queries the child process for its response to the current game state.
         """
         # send in game state
-        for line in input_lines:
-            line += '\n'
-            self.process.stdin.write(line.encode('utf-8'))
+        self.process.stdin.write(state.text())
         self.process.stdin.flush()
         # consume and process stdout
-        stdout = self.process.stdout.readline().decode('utf-8').strip()
+        stdout = self._read(None, self.TICK_TIMEOUT).decode('utf-8').strip()
+        self.ticks += 1
+        if self.telemetry:
+            self._record_telemetry(self._read(None, self.TICK_TIMEOUT).split())
         if stdout == "UP":
             return PlayerAction.UP
         elif stdout == "DOWN":
@@ -68,6 +360,264 @@ class Player:
         raise KeyError(f"Actor {self.player_idx}, gene index {self.gene_idx}, unknown response '{stdout}'")
     
 
-    def close(self):
-        """ Closes the child process. """
-        self.process.kill()
+    def close(self, reusable: bool = True):
+        """
+        Closes the child process, or hands it back to its pool if it finished
+        its game in a good state.
+        """
+        if self.process is None:
+            return
+        reusable = reusable and self.ticks == ACTOR_TICKS
+        if self.pool is not None:
+            self.pool.release(self.process, reusable)
+        else:
+            _kill_process(self.process)
+        self.process = None
+        self.pool = None
+
+
+class BinaryPlayer(Player):
+    """
+    A :class:`Player` whose actor process speaks the packed binary tick
+    protocol (`--binary`), instead of the text protocol of the game servers.
+    """
+    ACTOR_ARGS: List[str] = [ '--binary' ]
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        """
+        Queries the child process for its response to the current game state.
+        """
+        self.process.stdin.write(state.binary())
+        self.process.stdin.flush()
+        reply = self._read(1, self.TICK_TIMEOUT)
+        self.ticks += 1
+        if self.telemetry:
+            self._record_telemetry(BINARY_TELEMETRY.unpack(
+                self._read(BINARY_TELEMETRY.size, self.TICK_TIMEOUT)))
+        if len(reply) == 1 and reply[0] < len(BINARY_ACTIONS):
+            return BINARY_ACTIONS[reply[0]]
+        raise KeyError(f"Actor {self.player_idx}, gene index {self.gene_idx}, unknown response {reply!r}")
+
+
+class MultiplexedActor:
+    """
+    A single actor process started with `--multiplex`, which hosts many
+    independent actor instances ("slots"). A whole batch of ticks, for any
+    number of slots, is answered with one write and one read.
+    """
+    ACTOR_ARGS: List[str] = [ '--multiplex' ]
+
+    def __init__(self, executable_path: str):
+        self.executable_path:  str               = executable_path
+        self.process:          subprocess.Popen  = spawn_actor_process(executable_path, self.ACTOR_ARGS)
+        # whether slot inits are waiting to go with the next batch, which
+        # then gets the (longer) init deadline
+        self.initializing:     bool              = False
+        self._pending:         bytearray         = bytearray()
+
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+
+    def init_slot(self, slot: int, player_idx: int, genes: np.array) -> None:
+        """
+        (Re-)initializes a slot as the given player, with the given genes.
+        Only buffered; it is sent along with the next :meth:`query`.
+        Raises :class:`ValueError` unless there are exactly
+        :const:`ACTOR_WEIGHTS` genes.
+        """
+        if len(genes) != ACTOR_WEIGHTS:
+            raise ValueError(f"Multiplexed actor takes {ACTOR_WEIGHTS} genes per slot, "
+                             f"not {len(genes)}")
+        self.process.stdin.write(MULTIPLEX_INIT.pack(
+            b'I', slot, player_idx, *map(float, genes)))
+        self.initializing = True
+
+
+    def query(self, requests: List[Tuple[int, bytes]]) -> List[PlayerAction]:
+        """
+        Sends a batch of :const:`(slot, binary tick state)` requests, and
+        returns the action for each of them, in order. The whole batch must
+        be answered within :attr:`Player.TICK_TIMEOUT`, or
+        :attr:`Player.INIT_TIMEOUT` if it carries slot inits; otherwise the
+        actor is killed and :class:`ActorTimeout` is raised.
+        """
+        parts = [ MULTIPLEX_TICK.pack(b'T', len(requests)) ]
+        for slot, payload in requests:
+            parts.append(MULTIPLEX_SLOT.pack(slot))
+            parts.append(payload)
+        self.process.stdin.write(b''.join(parts))
+        self.process.stdin.flush()
+        timeout = Player.INIT_TIMEOUT if self.initializing else Player.TICK_TIMEOUT
+        self.initializing = False
+        replies = _read_reply(self.process, self._pending, len(requests), timeout,
+                              f"Multiplexed actor, batch of {len(requests)} ticks")
+        if len(replies) != len(requests):
+            raise EOFError(f"Multiplexed actor replied to {len(replies)} of {len(requests)} ticks")
+        if MULTIPLEX_BAD_SLOT in replies:
+            raise KeyError(f"Multiplexed actor has no slot {requests[replies.index(MULTIPLEX_BAD_SLOT)][0]}")
+        return [ BINARY_ACTIONS[reply] for reply in replies ]
+
+
+    def close(self) -> None:
+        """ Kills and reaps the actor process. """
+        _kill_process(self.process)
+
+
+class MultiplexedPlayer(Player):
+    """
+    A :class:`Player` hosted in a slot of a shared :class:`MultiplexedActor`.
+    Must be given its actor and slot with :meth:`attach` before :meth:`init`.
+    Usually driven in batches by :func:`play_multiplexed`, rather than through
+    :meth:`get_response`.
+    """
+    ACTOR_ARGS: List[str] = MultiplexedActor.ACTOR_ARGS
+
+    def attach(self, actor: MultiplexedActor, slot: int) -> None:
+        self.actor = actor
+        self.slot = slot
+
+
+    def init(self, pool: Optional[ActorPool] = None):
+        """ Re-initializes this player's slot for a new game. """
+        self.ticks = 0
+        self.actor.init_slot(self.slot, self.player_idx, self.genes)
+
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        """ Queries this player's slot alone. """
+        self.ticks += 1
+        return self.actor.query([ (self.slot, state.binary()) ])[0]
+
+
+    def close(self, reusable: bool = True):
+        """ The shared actor is closed by its owner. """
+        pass
+
+
+class AsyncActorPool:
+    """
+    Asyncio counterpart of :class:`ActorPool`: a bounded pool of long-lived
+    actor processes speaking the binary protocol, re-seeded between games
+    through the header handshake.
+    """
+    def __init__(self, executable_path: str, size: int):
+        self.executable_path:  str                               = executable_path
+        self.size:             int                               = size
+        self.idle:             List[asyncio.subprocess.Process]  = []
+        self.n_spawned:        int                               = 0
+
+
+    async def acquire(self) -> asyncio.subprocess.Process:
+        """ Returns an idle actor process, spawning one if none are idle. """
+        while self.idle:
+            process = self.idle.pop()
+            if process.returncode is None:
+                return process
+            await process.wait()  # reap
+        self.n_spawned += 1
+        return await asyncio.create_subprocess_exec(
+            self.executable_path, *AsyncPlayer.ACTOR_ARGS,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL)
+
+
+    async def release(self, process: asyncio.subprocess.Process, reusable: bool) -> None:
+        """
+        Returns a process to the pool, or kills and reaps it if it is not in a
+        known state or the pool is full.
+        """
+        if reusable and process.returncode is None and len(self.idle) < self.size:
+            self.idle.append(process)
+            return
+        await _kill_process_async(process)
+
+
+    async def close(self) -> None:
+        """ Kills and reaps all idle processes. """
+        for process in self.idle:
+            await _kill_process_async(process)
+        self.idle.clear()
+
+
+async def _kill_process_async(process: asyncio.subprocess.Process) -> None:
+    """ Kills and reaps the given process, so no zombie is left behind. """
+    if process.returncode is None:
+        process.kill()
+    await process.wait()
+
+
+class AsyncPlayer(Player):
+    """
+    A :class:`Player` whose actor process speaks the binary protocol over
+    asyncio pipes, so that many games can wait on their actors at once. Only
+    usable through :class:`AsyncMatchRunner`, which writes a tick to all
+    players with :meth:`send` before awaiting any :meth:`receive`.
+    """
+    ACTOR_ARGS: List[str] = [ '--binary' ]
+
+    def init(self, pool: Optional[ActorPool] = None):
+        raise TypeError("AsyncPlayer must be driven by an AsyncMatchRunner")
+
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        raise TypeError("AsyncPlayer must be driven by an AsyncMatchRunner")
+
+
+    async def ainit(self, pool: AsyncActorPool) -> None:
+        """ Prepares an actor process from the pool for a new game. """
+        self.pool = pool
+        self.ticks = 0
+        self.process = await pool.acquire()
+        # communicate initial information and genes to process
+        header = f'{self.player_idx}\n4\n' + ' '.join(map(str, self.genes)) + '\n'
+        self.process.stdin.write(header.encode('utf-8'))
+        stdout = (await self._await_reply(self.process.stdout.readline(),
+                                          self.INIT_TIMEOUT)).decode('utf-8').strip()
+        if stdout != "INITIALIZED":
+            raise Exception("Not good state!")
+
+
+    def send(self, state: TickState) -> None:
+        """ Writes the game state; the response is read by :meth:`receive`. """
+        self.process.stdin.write(state.binary())
+
+
+    async def receive(self) -> PlayerAction:
+        """ Awaits the response to the last state sent. """
+        reply = await self._await_reply(self.process.stdout.readexactly(1),
+                                        self.TICK_TIMEOUT)
+        self.ticks += 1
+        if reply[0] < len(BINARY_ACTIONS):
+            return BINARY_ACTIONS[reply[0]]
+        raise KeyError(f"Actor {self.player_idx}, gene index {self.gene_idx}, unknown response {reply!r}")
+
+
+    async def _await_reply(self, read, timeout: Optional[float]) -> bytes:
+        """
+        Awaits a read from the actor process. If the actor does not reply
+        within :const:`timeout` seconds, it is killed and
+        :class:`ActorTimeout` is raised.
+        """
+        start = time.monotonic()
+        try:
+            return await asyncio.wait_for(read, timeout)
+        except asyncio.TimeoutError:
+            waited = time.monotonic() - start
+            await _kill_process_async(self.process)
+            raise ActorTimeout(f"Actor {self.player_idx}, gene index {self.gene_idx}, "
+                               f"no reply after {waited:.3f}s", waited)
+
+
+    async def aclose(self, reusable: bool = True) -> None:
+        """
+        Hands the process back to its pool if it finished its game in a good
+        state, or kills it.
+        """
+        if self.process is None:
+            return
+        await self.pool.release(self.process, reusable and self.ticks == ACTOR_TICKS)
+        self.process = None
+        self.pool = None
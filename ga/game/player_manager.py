@@ -1,12 +1,18 @@
+import time
 import random
 import math
 import numpy as np
-from matplotlib import pyplot as plt
 
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterable
 
 from .minigames import PlayerAction
-from .player import Player
+from .player import Player, BinaryPlayer, MultiplexedPlayer, AsyncPlayer, ActorPool, ActorTimeout, ScoreHeader, TickState
+from .py_actor import PythonPlayer
+from .scenarios import ScenarioBank
+from .gene_history import GeneHistory
+from .checkpoint import Checkpoint
+from .visualizer import Visualizer
+from .instrument import INSTRUMENTS
 
 
 def get_medal_name(rank: int) -> str:
@@ -20,99 +26,37 @@ def get_medal_name(rank: int) -> str:
     return "pat on the back"
 
 
-def visualize_gene_frame(frame: np.array, scores: List[int], round_num: int) -> None:
-    """
-    Opens a new window containing a matplotlib visualization of the given
-    genetic frame.
-    """
-    # create first figure -- gene distribution
-    # (will create new window)
-    plt.figure()
-    # labels + etc
-    plt.title(f"Gene distribution -- Round {round_num+1}")
-    plt.xlabel('Gene number')
-    plt.ylabel('Values')
-    
-    # color points based on performance -- skip zeros
-    best_score = max(scores)
-    worst_score = best_score
-    for score in scores:
-        if score == 0: continue
-        worst_score = min(worst_score, score)
-    if worst_score == 0:
-        print("Nothing to visualize, all scores 0")
-        return True
-    if best_score == worst_score:  # ZeroDivisionError protection
-        best_score = worst_score+1
-    dscore = best_score-worst_score
-    sorted_players = list(sorted(
-        enumerate(scores), key=lambda e: e[1],  # sort by score
-        reverse=True  # sort descending
-    ))
-    top_5_players_idxs = [e[0] for e in sorted_players[:5]]  # get top 5 idxs
-    def color_for_score(s):
-        # zero-scores are black
-        if s[1] < 1:
-            return (0.0, 0.0, 0.0)
-        # top 5 are blue
-        if s[0] in top_5_players_idxs:
-            return (0.0, 0.0, 1.0)
-        # normalize score
-        placing = ((s[1]-worst_score) / dscore)
-        # lerp red->green
-        return ((1-placing), placing, 0.0)
-    colors = list(map(color_for_score, enumerate(scores)))
-    
-    # generate markers
-    for gene_idx,genes in enumerate(frame):
-        # all points of this gene will share the same x
-        x = [gene_idx]*len(genes)
-        plt.scatter(x, genes, c=colors, marker='o')
-    
-    # show the plot and details
-    print("Showing genes graph window.")
-    plt.show(block=False)
+def print_top_players(frame: np.ndarray, scores: List[float]) -> None:
+    """ Prints the genes of the best player, and the top 5 scores. """
+    sorted_players = np.argsort(-np.asarray(scores), kind='stable')
     print("\nTop genes:")
-    top_idx = sorted_players[0][0]
-    for gene in frame[:, top_idx]:
+    for gene in frame[:, sorted_players[0]]:
         if gene < 0:
             print(f" {gene}")
         else:
             print(f"  {gene}")
-
-    # create second figure -- score distribution
-    plt.figure()
-    # labels + etc
-    plt.title(f"Score distribution -- Round {round_num+1}")
-    plt.xlabel('Placement')
-    plt.ylabel('Score')
-    
-    # generate markers
-    placement_idx = 0
-    for player_idx,score in sorted_players:
-        x = [gene_idx]*len(genes)
-        plt.bar(placement_idx, score,
-                color=color_for_score((player_idx, score)))
-        placement_idx += 1
-    
-    # show the plot and details
-    print("Showing score graph window.")
-    plt.show(block=False)
     print("\nTop 5 scores:\n  pid  score")
-    for idx in top_5_players_idxs:
-        print(f"  {str(idx).ljust(4)} {scores[idx]}")
+    for idx in sorted_players[:5]:
+        print(f"  {str(idx).ljust(4)} {scores[idx]:.10g}")
+
 
-    # wait for input
-    try:
-        input("\nPausing for inspection... press Enter to continue.")
-    except KeyboardInterrupt:
-        print("\nExiting.")
-        return False
-    return True
 
+# a game to play: the gene indices of its 3 players, and its match seed
+Job = Tuple[Tuple[int, int, int], int]
 
 
-# TODO dynamically updating pyplot of genetic history
+# available actor backends, by name. `process` runs the C++ actor over the
+# text protocol, `process-binary` over the binary protocol,
+# `process-multiplex` many of them in one process, `process-async` many
+# games' actors at once over asyncio pipes, and `python` runs its in-process
+# translation
+PLAYER_BACKENDS = {
+    'process':            Player,
+    'process-binary':     BinaryPlayer,
+    'process-multiplex':  MultiplexedPlayer,
+    'process-async':      AsyncPlayer,
+    'python':             PythonPlayer,
+}
 
 
 
@@ -127,6 +71,9 @@ class PlayerSubset:
         self.players:            List[Player]    = players
         # initialize player data arrays
         self.dead:               List[bool]      = [ 0, 0, 0 ]
+        # actors that missed a deadline, and the time lost waiting on them
+        self.timeouts:           int             = 0
+        self.hang_time:          float           = 0.0
 
         # special array for holding medal information, with annotation
         self.medals:  List[List[List[int]]]  = [ [
@@ -134,11 +81,61 @@ class PlayerSubset:
             ] for midx in range(4)
         ]
         """ self.medals[minigame_idx][player_idx] = [gold, silver, bronze] """
+        # scores and medals as sent to players; rebuilt after medals change
+        self._header:  Optional[ScoreHeader]  = None
     
 
-    def init_player_processes(self) -> None:
+    @classmethod
+    def from_genes(cls,
+                   do_debug_printing:  bool,
+                   do_info_printing:   bool,
+                   executable_path:    str,
+                   gene_frame:         np.array,
+                   gene_idxs:          Tuple[int, int, int],
+                   actor_backend:      str = 'process') -> 'PlayerSubset':
+        """
+        Builds the :class:`PlayerSubset` for a game between the players with
+        the given gene indices, taking their genes from :const:`gene_frame`.
+        See :const:`PLAYER_BACKENDS` for the available actor backends.
+        """
+        player_class = PLAYER_BACKENDS[actor_backend]
+        players = [
+            player_class(
+                executable_path  = executable_path,
+                gene_idx         = gene_idx,
+                player_idx       = internal_idx,
+                genes            = gene_frame[:, gene_idx])
+            for internal_idx, gene_idx in enumerate(gene_idxs)
+        ]
+        return cls(do_debug_printing = do_debug_printing,
+                   do_info_printing  = do_info_printing,
+                   players           = players)
+
+
+    def init_player_processes(self, pool: Optional[ActorPool] = None) -> None:
+        """
+        Prepares all players for a new game. Players that fail to initialize
+        are marked as dead.
+        """
+        instruments = INSTRUMENTS
+        for player in self.players:
+            if instruments.enabled:
+                start = time.perf_counter()
+            try:
+                player.init(pool)
+            except Exception as e:
+                self.mark_dead(player.player_idx, e)
+            if instruments.enabled:
+                instruments.record('actor.init', time.perf_counter() - start)
+
+
+    def close_player_processes(self) -> None:
+        """
+        Closes all players' processes. Processes of players that are still
+        alive are handed back to their pool, if any.
+        """
         for player in self.players:
-            player.init()
+            player.close(reusable=not self.dead[player.player_idx])
     
 
     def _score_for_player(self, player_idx: int) -> int:
@@ -159,26 +156,31 @@ class PlayerSubset:
         return not self.dead[player_idx]
 
 
-    def gather_responses(self, input_lines: List[str]) -> List[PlayerAction]:
+    def tick_state(self, game_states: List[Tuple[str, List[int]]]) -> TickState:
+        """
+        Returns the :class:`TickState` sent to every player this tick: the
+        given game states, with score information prepended.
+        """
+        if self._header is None:
+            self._header = ScoreHeader(
+                scores  = [ self._score_for_player(pidx) for pidx in range(3) ],
+                medals  = [ (self.medals[0][pidx] +
+                             self.medals[1][pidx] +
+                             self.medals[2][pidx] +
+                             self.medals[3][pidx])
+                            for pidx in range(3) ])
+        return TickState(header=self._header, games=game_states)
+
+
+    def gather_responses(self, game_states: List[Tuple[str, List[int]]]) -> List[PlayerAction]:
         """
         Gather responses from all active :class:`Player`s, for the current
         minigame.
         """
-        # prepend score information
-        score_information = [
-            (' '.join(
-                map(str, [ self._score_for_player(pidx) ] +
-                         self.medals[0][pidx] +
-                         self.medals[1][pidx] +
-                         self.medals[2][pidx] +
-                         self.medals[3][pidx] )))
-            for pidx in range(3)
-        ]
-        input_lines = score_information + input_lines
-
+        state = self.tick_state(game_states)
         if self.do_debug_printing:
             print("Round state:")
-            for line in input_lines:
+            for line in state.text_lines():
                 print(' ', line)
 
         # gather player responses
@@ -188,20 +190,31 @@ class PlayerSubset:
                 responses.append(PlayerAction.ERROR)
                 continue
             try:
-                response = self.players[i].get_response(input_lines)
+                response = self.players[i].get_response(state)
                 responses.append(response)
             except Exception as e:
-                print(f"PlayerManager: Failed to get player {i} action, error:", repr(e))
-                print(f"PlayerManager: ... Marking player as DEAD")
-                self.dead[i] = True
+                self.mark_dead(i, e)
                 responses.append(PlayerAction.ERROR)
         return responses
 
 
+    def mark_dead(self, player_idx: int, error: Exception) -> None:
+        """ Marks a player as dead, after failing to get its action. """
+        print(f"PlayerManager: Failed to get player {player_idx} action, error:", repr(error))
+        print(f"PlayerManager: ... Marking player as DEAD")
+        self.dead[player_idx] = True
+        if INSTRUMENTS.enabled:
+            INSTRUMENTS.count('actors.dead')
+        if isinstance(error, ActorTimeout):
+            self.timeouts += 1
+            self.hang_time += error.waited
+
+
     def update_medals(self, minigame_idx: int, rankings: List[int]) -> None:
         """
         Updates the medals earned by each player, based on their ranking.
         """
+        self._header = None
         minigame_medals = self.medals[minigame_idx]
         for i in range(3):
             medal_tier = min(rankings[i], 2)
@@ -224,7 +237,11 @@ class PlayerManager:
                  n_genes:            int,
                  visualize_every:    int,
                  rare_mut_chance:    int,
-                 top_percent_breed:  float):
+                 top_percent_breed:  float,
+                 seed:               Optional[int] = None,
+                 history_path:       Optional[str] = None,
+                 checkpoint:         Optional[Checkpoint] = None,
+                 visualizer:         Optional[Visualizer] = None):
         # save settings
         self.do_debug_printing:  bool            = do_debug_printing
         self.do_info_printing:   bool            = do_info_printing
@@ -234,56 +251,179 @@ class PlayerManager:
         self.visualize_every:    int             = visualize_every
         self.rare_mut_chance:    int             = rare_mut_chance
         self.top_percent_breed:  float           = top_percent_breed
+        self.visualizer:   Optional[Visualizer]  = visualizer
+        # drive matchups and match seeds, and genes and breeding; the whole
+        # run is reproducible from this seed
+        self.rng:                random.Random        = random.Random(seed)
+        self.np_rng:             np.random.Generator  = np.random.default_rng(seed)
         
         # initialize player data arrays
         self.scores:             List[int]       = []
         self.dead:               List[bool]      = []
-
-        # special array for holding gene information, with annotation
-        self.gene_history:       List[np.array]  = []
-        """ self.gene_history[iteration][gene_idx] = [p0_gene, p1_gene, ...] """
+        # per-game sums of squared scores, and games played, for confidence
+        # bounds; and whether this generation was raced, and the players not
+        # yet dropped from the race
+        self.squares:            List[int]       = []
+        self.games:              List[int]       = []
+        self.raced:              bool            = False
+        self.racing:             List[int]       = []
+
+        # current and previous gene frames; older ones are archived to
+        # `history_path`, if given
+        self.gene_history:       GeneHistory     = GeneHistory(n_genes, n_players, history_path)
+        """ self.gene_history[-1][gene_idx] = [p0_gene, p1_gene, ...] """
         
-        # initialize first set of players
-        self.reset()
+        # initialize first set of players, or pick up where a checkpoint left off
+        if checkpoint is None:
+            self.reset()
+        else:
+            self.restore_checkpoint(checkpoint)
         if self.do_info_printing:
             print(f"PlayerManager: Initialized with {n_players} players, each with {n_genes} genes.")
     
     
-    def _generate_random_gene(self) -> float:
-        gene = random.random()  # [0, 1)
-        gene = 2 * gene - 1     # [-1, 1)
-        gene *= 10.0            # [-10, 10)
-        return gene
+    def _generate_random_genes(self) -> np.ndarray:
+        """ Returns a new gene matrix, uniform in [-10, 10). """
+        genes = self.np_rng.random((self.n_genes, self.n_players))  # [0, 1)
+        genes = 2 * genes - 1                                       # [-1, 1)
+        genes *= 10.0                                               # [-10, 10)
+        return np.asfortranarray(genes)
     
     
-    def _generate_random_mutation(self) -> float:
+    def _generate_random_mutations(self) -> np.ndarray:
+        """ Returns a matrix of mutations, one per gene of every player. """
+        shape = (self.n_genes, self.n_players)
         # normal mutation
-        if random.random() > self.rare_mut_chance:
-            mul = random.randrange(3)-1  # 33% each -1, 0, 1
-            mut = random.random()        # [0, 1)
-            mut *= mul                   # 67% chance (-1, 1), 33% chance 0
-            return mut
+        mul = self.np_rng.integers(-1, 2, shape)  # 33% each -1, 0, 1
+        normal = self.np_rng.random(shape)         # [0, 1)
+        normal *= mul                              # 67% chance (-1, 1), 33% chance 0
         # rare mutation
-        mut = random.random()  # [0, 1)
-        mut = 2 * mut - 1      # [-1, 1)
-        mut *= 8               # [-8, 8)
-        return mut
+        rare = self.np_rng.random(shape)  # [0, 1)
+        rare = 2 * rare - 1               # [-1, 1)
+        rare *= 8                         # [-8, 8)
+        is_rare = self.np_rng.random(shape) <= self.rare_mut_chance
+        return np.where(is_rare, rare, normal)
     
 
+    def choose_3_idxs(self) -> Tuple[int, int, int]:
+        """
+        Returns the gene indices of a random set of 3 players to play a set of
+        games. This compact form is what gets sent to worker processes.
+        """
+        return tuple(self.rng.sample(range(self.n_players), 3))
+
+
+    def choose_jobs(self, n_games: int, n_seeds: Optional[int] = None) -> List[Job]:
+        """
+        Returns :const:`n_games` games to play, each with random players (see
+        :meth:`choose_3_idxs`) and its own match seed. If :const:`n_seeds` is
+        given, the games instead share that many seeds, evenly, so that
+        players are compared on the same scenarios (common random numbers).
+        """
+        if n_seeds is None:
+            return [ (self.choose_3_idxs(), self.rng.getrandbits(32))
+                     for _ in range(n_games) ]
+        seeds = [ self.rng.getrandbits(32) for _ in range(n_seeds) ]
+        return [ (self.choose_3_idxs(), seeds[game_i % n_seeds])
+                 for game_i in range(n_games) ]
+
+
+    def deal_jobs(self, n_games: int, players: List[int],
+                  n_seeds: Optional[int] = None) -> List[Job]:
+        """
+        Like :meth:`choose_jobs`, but for :const:`players` only, dealt so that
+        each plays as many games as any other, give or take one: players are
+        drawn from a shuffled deck, which is reshuffled once it runs out.
+        """
+        idxs = []
+        deck = []
+        while len(idxs) < n_games:
+            if len(deck) < 3:
+                # the leftovers go first, so no one is dealt twice a pass
+                rest = [ pix for pix in players if pix not in deck ]
+                self.rng.shuffle(rest)
+                deck += rest
+            idxs.append(tuple(deck[:3]))
+            del deck[:3]
+        if n_seeds is None:
+            return [ (gene_idxs, self.rng.getrandbits(32)) for gene_idxs in idxs ]
+        seeds = [ self.rng.getrandbits(32) for _ in range(n_seeds) ]
+        return [ (gene_idxs, seeds[game_i % n_seeds])
+                 for game_i, gene_idxs in enumerate(idxs) ]
+
+
+    def race(self, play: Callable[[List[Job]], Iterable[Dict[int, int]]],
+             n_games: int, n_stages: int, confidence: float = 2.0,
+             n_seeds: Optional[int] = None) -> int:
+        """
+        Evaluates the population by racing, calling :const:`play` with each
+        stage's jobs, for up to :const:`n_stages` stages. Every stage, each
+        player still racing plays as many games as it would in one
+        :const:`n_stages`-th of a uniform evaluation of :const:`n_games`
+        games (see :meth:`deal_jobs`); then players that clearly cannot make
+        the top :attr:`top_percent_breed` are dropped (see
+        :meth:`contenders`). So the contenders end up as well evaluated as by
+        :const:`n_games` uniform games, and hopeless players cost no more
+        games once dropped. Stops early once only the parents are left.
+        Returns the number of games played.
+
+        Only the remaining contenders may breed; see :meth:`breed`.
+        """
+        top_n = self._n_parents()
+        self.raced = True
+        n_played = 0
+        for stage in range(n_stages):
+            if len(self.racing) <= max(top_n, 3):
+                break
+            stage_games = math.ceil(n_games * len(self.racing) / (self.n_players * n_stages))
+            jobs = self.deal_jobs(stage_games, self.racing, n_seeds)
+            for scores in play(jobs):
+                self.update_scores(scores)
+            n_played += len(jobs)
+            self.racing = self.contenders(self.racing, top_n, confidence)
+            if self.do_debug_printing:
+                print(f"  racing stage {stage+1}: {len(jobs)} games, "
+                      f"{len(self.racing)} contenders left")
+        return n_played
+
+
+    def contenders(self, players: List[int], top_n: int, confidence: float) -> List[int]:
+        """
+        Returns those of :const:`players` that may still be among the best
+        :const:`top_n` of them: each player's mean score is bounded by
+        :const:`confidence` standard errors either way, and a player is
+        dropped if its upper bound is below the :const:`top_n`-th best lower
+        bound. Players with fewer than 2 games are always kept.
+        """
+        if len(players) <= top_n:
+            return players
+        games = np.asarray(self.games)[players]
+        totals = np.asarray(self.scores, dtype=float)[players]
+        squares = np.asarray(self.squares)[players]
+        means = totals / np.maximum(games, 1)
+        variances = (squares - games * means**2) / np.maximum(games - 1, 1)
+        errors = confidence * np.sqrt(np.maximum(variances, 0) / np.maximum(games, 1))
+        errors[games < 2] = np.inf
+        threshold = np.partition(means - errors, -top_n)[-top_n]
+        return [ pix for pix, upper in zip(players, means + errors) if upper >= threshold ]
+
+
+    def new_scenario_bank(self, n_scenarios: int) -> ScenarioBank:
+        """
+        Draws a new :class:`ScenarioBank`, for all games of a generation to
+        share; see :meth:`WorkerPool.play_generation`.
+        """
+        return ScenarioBank.generate(self.rng, n_scenarios)
+
+
     def choose_3(self) -> PlayerSubset:
         """ Returns a random set of 3 players to play a set of games. """
-        random_3_player_idxs = random.sample(range(self.n_players), 3)
-        players = [
-            Player(
-                executable_path  = self.executable_path,
-                gene_idx         = player_idx,
-                player_idx       = internal_idx,
-                genes            = self.gene_history[-1][:, player_idx])
-            for internal_idx, player_idx in enumerate(random_3_player_idxs)
-        ]
-        return PlayerSubset(do_debug_printing = self.do_debug_printing,
-                            do_info_printing  = self.do_info_printing,
-                            players           = players)
+        return PlayerSubset.from_genes(
+            do_debug_printing  = self.do_debug_printing,
+            do_info_printing   = self.do_info_printing,
+            executable_path    = self.executable_path,
+            gene_frame         = self.gene_history[-1],
+            gene_idxs          = self.choose_3_idxs())
     
 
     def update_scores(self, scores: Dict[int, int]) -> None:
@@ -292,11 +432,9 @@ class PlayerManager:
         :meth:`PlayerSubset.finalize_scores`.
         """
         for pix,score in scores.items():
-            self.scores[pix] += score
-    
-
-    def _append_clean_gene_palette(self) -> None:
-        self.gene_history.append(np.zeros((self.n_genes, self.n_players), order='F'))
+            self.scores[pix]   += score
+            self.squares[pix]  += score * score
+            self.games[pix]    += 1
     
 
     def reset(self) -> None:
@@ -306,14 +444,11 @@ class PlayerManager:
         """
         # initialize player data arrays
         self.players = [ None for _ in range(self.n_players) ]
-        self.gene_history = []
+        self.gene_history.clear()
         self._clear_player_metadata()
 
         # initialize new random genes
-        self._append_clean_gene_palette()
-        for pidx in range(self.n_players):
-            for gidx in range(self.n_genes):
-                self.gene_history[-1][gidx][pidx] = self._generate_random_gene()
+        self.gene_history.append(self._generate_random_genes())
         
         # # assign genes
         # for player_idx in range(self.n_players):
@@ -323,6 +458,44 @@ class PlayerManager:
         #         player_idx, genes)
 
 
+    def save_checkpoint(self, path: str, round_num: int, settings: Dict[str, Any]) -> None:
+        """
+        Atomically writes a :class:`Checkpoint` of this run to :const:`path`.
+        :const:`round_num` is the next round to play, and :const:`settings`
+        are the run's settings, saved along so it can be resumed as it was.
+        """
+        Checkpoint(
+            genes         = self.gene_history[-1],
+            prev_genes    = self.gene_history[-2] if len(self.gene_history.frames) > 1 else None,
+            scores        = np.asarray(self.scores),
+            dead          = np.asarray(self.dead),
+            rng_state     = self.rng.getstate(),
+            np_rng_state  = self.np_rng.bit_generator.state,
+            generation    = self.gene_history.generation,
+            round_num     = round_num,
+            settings      = settings).save(path)
+
+
+    def restore_checkpoint(self, checkpoint: Checkpoint) -> None:
+        """
+        Restores the state saved in :const:`checkpoint`, so the run continues
+        exactly as if it had never stopped.
+        """
+        if checkpoint.genes.shape != (self.n_genes, self.n_players):
+            raise ValueError(f"checkpoint holds genes of shape {checkpoint.genes.shape}, "
+                             f"not {(self.n_genes, self.n_players)}")
+        self.players = [ None for _ in range(self.n_players) ]
+        self._clear_player_metadata()
+        frames = [ checkpoint.genes ]
+        if checkpoint.prev_genes is not None:
+            frames.insert(0, checkpoint.prev_genes)
+        self.gene_history.restore(frames, checkpoint.generation)
+        self.scores = checkpoint.scores.tolist()
+        self.dead   = checkpoint.dead.tolist()
+        self.rng.setstate(checkpoint.rng_state)
+        self.np_rng.bit_generator.state = checkpoint.np_rng_state
+
+
     def is_active(self, player_idx: int) -> bool:
         """
         Returns :const:`True` if the player with index :const:`player_idx` is
@@ -354,25 +527,56 @@ class PlayerManager:
     def _clear_player_metadata(self) -> None:
         """
         Resets the metadata for each player, for the next round of evolution.
-        The metadata cleared is: medals, death state.
+        The metadata cleared is: death state, scores and games played, and
+        which players are still racing (see :meth:`race`).
         """
         # reset players' metadata arrays
-        self.dead    = [ False  for _ in range(self.n_players) ]
-        self.scores  = [ 0      for _ in range(self.n_players) ]
+        self.dead     = [ False  for _ in range(self.n_players) ]
+        self.scores   = [ 0      for _ in range(self.n_players) ]
+        self.squares  = [ 0      for _ in range(self.n_players) ]
+        self.games    = [ 0      for _ in range(self.n_players) ]
+        self.raced    = False
+        self.racing   = list(range(self.n_players))
+
+
+    def _n_parents(self) -> int:
+        """ The number of players bred from: the top :attr:`top_percent_breed`, rounded up. """
+        return math.ceil(self.n_players * self.top_percent_breed)
+
+
+    def mean_scores(self) -> np.ndarray:
+        """ Returns each player's mean score per game played. """
+        return np.asarray(self.scores) / np.maximum(self.games, 1)
+
+
+    def fitness(self) -> np.ndarray:
+        """
+        Returns what players are ranked by for breeding: their total score;
+        or, if this generation was raced (see :meth:`race`), their mean
+        score per game, as they played different numbers of games. Players
+        dropped from the race get -inf, whatever their mean: they played
+        fewer games, against a weaker field.
+        """
+        if not self.raced:
+            return np.asarray(self.scores)
+        fitness = np.full(self.n_players, -np.inf)
+        fitness[self.racing] = self.mean_scores()[self.racing]
+        return fitness
+
+
+    def parent_pool(self) -> np.ndarray:
+        """ Returns the players to breed from, best first (ties by index); see :meth:`fitness`. """
+        return np.argsort(-self.fitness(), kind='stable')[:self._n_parents()]
 
 
     def breed(self, round_num: int) -> bool:
         """
-        Breeds the next generation of players.
-        **NOTE:** Not currently implemented.
+        Breeds the next generation of players. Always returns :const:`True`;
+        plotting happens in the background, and no longer pauses the run.
         """
-        # sort players by final score
-        scores_per_player = dict(enumerate(self.scores))
-        sorted_players = list(sorted(
-            scores_per_player.items(),
-            key=lambda entry: entry[1],
-            reverse=True))
-        sorted_players = list(map(lambda e: e[0], sorted_players))
+        # archive the finished generation
+        scores = np.asarray(self.scores)
+        self.gene_history.archive(scores)
         
         # print information from the last iteration
         if self.do_info_printing:
@@ -382,33 +586,27 @@ class PlayerManager:
                 print(" Genes peek, first 5:")
                 print(self.gene_history[-1][:5, :])
         
-        # visualize gene distribution
-        if round_num == 0 or (round_num+1) % self.visualize_every == 0:
-            cont = visualize_gene_frame(
-                self.gene_history[-1],
-                self.scores,
-                round_num)
-            if not cont:
-                print("Not continuing")
-                return False
+        # visualize gene distribution, in the background
+        show_genes = round_num == 0 or (round_num+1) % self.visualize_every == 0
+        if show_genes and self.do_info_printing:
+            print_top_players(self.gene_history[-1], self.fitness())
+        if self.visualizer is not None:
+            dropped = self.visualizer.dropped
+            self.visualizer.submit(round_num, self.mean_scores() if self.raced else scores,
+                                   self.gene_history[-1] if show_genes else None)
+            if self.visualizer.dropped > dropped and self.do_info_printing:
+                print(f"Visualizer behind; generation {round_num+1} not plotted "
+                      f"({self.visualizer.dropped} so far)")
         
         # evolve genes:
         #   1. select top n percent players (ceil)
-        top_n = math.ceil(len(sorted_players) * self.top_percent_breed)
-        gene_pool_idxs = sorted_players[:top_n]
-        #   2. clean palette
-        self._append_clean_gene_palette()
-        #   3. breed new players:
-        for pidx in range(self.n_players):
-            #   3a. pick a parent
-            parent_idx = gene_pool_idxs[random.randrange(top_n)]
-            #   3b. fetch their genes
-            parent_genes = self.gene_history[-2][:, parent_idx]
-            #   3c. mutate and save each one
-            for gidx in range(self.n_genes):
-                parent_gene = parent_genes[gidx]
-                parent_gene += self._generate_random_mutation()
-                self.gene_history[-1][gidx][pidx] = parent_gene
+        gene_pool_idxs = self.parent_pool()
+        #   2. pick a parent for every new player
+        parent_idxs = gene_pool_idxs[self.np_rng.integers(len(gene_pool_idxs), size=self.n_players)]
+        #   3. copy their genes, and mutate each one
+        parent_genes = self.gene_history[-1][:, parent_idxs]
+        self.gene_history.append(np.asfortranarray(
+            parent_genes + self._generate_random_mutations()))
         
         # clear players' metadata, for next round of gameplay and evolution
         self._clear_player_metadata()
@@ -0,0 +1,180 @@
+import math
+import numpy as np
+
+from .minigames import PlayerAction
+from .player import Player, ActorPool, TickState
+
+from typing import List, Tuple, Optional
+
+
+# translated from `actor/`. this must be kept in sync with the C++ actor;
+# see `tools/actor_parity.py` to check that both choose the same moves.
+
+# costs of actions UP, DOWN, LEFT, RIGHT -- see `actor/costs.hpp`
+Costs = Tuple[float, float, float, float]
+ZERO_COSTS: Costs = (0.0, 0.0, 0.0, 0.0)
+
+GPU_BOARD_LENGTH = 30
+BOARD_HURDLE = '#'
+
+
+def _scaled(costs: Costs, k: float) -> Costs:
+    """
+    `Costs * double` from `actor/costs.hpp`. The actor is built with
+    `-ffast-math`, which folds `0.0 * k` to `0.0` even for infinite `k`.
+    """
+    return tuple((c * k if c else 0.0) for c in costs)
+
+
+def hurdles_costs(player_idx: int, gpu: str, registers: List[int]) -> Costs:
+    """ See `HurdlesActor::getCosts` in `actor/actors/hurdles.cpp`. """
+    my_pos = registers[player_idx]
+    my_stun = registers[player_idx + 3]
+    # short-circuit if we're stunned
+    if my_stun:
+        return ZERO_COSTS
+
+    # board[0] is current tile; tiles past the end of the track are empty
+    def tile(i: int) -> str:
+        shifted = i + my_pos
+        return gpu[shifted] if shifted < GPU_BOARD_LENGTH else '.'
+
+    if tile(1) == BOARD_HURDLE:
+        return (-1.0, 3.0, 3.0, 3.0)
+    elif tile(2) == BOARD_HURDLE:
+        return (3.0, 3.0, -1.0, 3.0)
+    elif tile(3) == BOARD_HURDLE:
+        return (-2.0, -2.0, -1.0, 3.0)
+    return (-2.0, -2.0, -1.0, -3.0)
+
+
+def archery_costs(player_idx: int, gpu: str, registers: List[int]) -> Costs:
+    """ See `ArcheryActor::getCosts` in `actor/actors/archery.cpp`. """
+    p2_idx = (player_idx + 1) % 3
+    p3_idx = (player_idx + 2) % 3
+    # note: the C++ actor indexes registers by player index, not by 2x player
+    # index; kept as-is so that both actors agree
+    my_x, my_y = registers[player_idx], registers[player_idx + 1]
+    p2_x, p2_y = registers[p2_idx], registers[p2_idx + 1]
+    p3_x, p3_y = registers[p3_idx], registers[p3_idx + 1]
+
+    # short-circuit -- on 0,0
+    if abs(my_x) + abs(my_y) == 0:
+        return ZERO_COSTS
+
+    turns_left = len(gpu)
+    if turns_left == 0:
+        return ZERO_COSTS
+
+    my_dist = math.sqrt(my_x*my_x + my_y*my_y)
+    p2_dist = math.sqrt(p2_x*p2_x + p2_y*p2_y)
+    p3_dist = math.sqrt(p3_x*p3_x + p3_y*p3_y)
+    best_of_opp_dist = p2_dist if p2_dist < p3_dist else p3_dist
+    # python raises on division by zero, C++ yields inf
+    if best_of_opp_dist == 0:
+        scaler = math.inf
+    else:
+        scaler = turns_left * (my_dist / best_of_opp_dist)
+
+    if my_x > abs(my_y):
+        return _scaled((0.0, 0.0, -1.0, 1.0), scaler)
+    elif -my_x > abs(my_y):
+        return _scaled((0.0, 0.0, 1.0, -1.0), scaler)
+    elif my_y > abs(my_x):
+        return _scaled((1.0, -1.0, 0.0, 0.0), scaler)
+    return _scaled((-1.0, 1.0, 0.0, 0.0), scaler)
+
+
+def skating_costs(player_idx: int, gpu: str, registers: List[int]) -> Costs:
+    """ See `SkatingActor::getCosts` in `actor/actors/skating.cpp`. """
+    # the C++ actor does not vote on skating yet; every path returns 0
+    return ZERO_COSTS
+
+
+DIVING_COSTS = {
+    'U': (-1.0,  1.0,  1.0,  1.0),
+    'D': ( 1.0, -1.0,  1.0,  1.0),
+    'L': ( 1.0,  1.0, -1.0,  1.0),
+    'R': ( 1.0,  1.0,  1.0, -1.0),
+}
+
+def diving_costs(player_idx: int, gpu: str, registers: List[int]) -> Costs:
+    """ See `DivingActor::getCosts` in `actor/actors/diving.cpp`. """
+    my_combo = registers[player_idx + 3]
+    if len(gpu) == 0:
+        return ZERO_COSTS
+    costs = DIVING_COSTS.get(gpu[0])
+    if costs is None:
+        return ZERO_COSTS
+    return _scaled(costs, my_combo + 1)
+
+
+ACTOR_COSTS = [ hurdles_costs, archery_costs, skating_costs, diving_costs ]
+
+
+class PyActor:
+    """
+    In-process equivalent of the C++ actor (`actor/Answer.cpp`): sums each
+    minigame's costs, weighted by a cubic polynomial per minigame, and picks
+    the cheapest action.
+    """
+    __slots__ = ('player_idx', 'weights')
+
+    def __init__(self, player_idx: int, genes: np.array):
+        self.player_idx:  int                                       = player_idx
+        # weights[minigame_idx] = (a, b, c, d) for ax^3 + bx^2 + cx + d
+        self.weights:     List[Tuple[float, float, float, float]]  = [
+            tuple(float(g) for g in genes[4*i : 4*i+4]) for i in range(4) ]
+
+
+    def net_costs(self, games: List[Tuple[str, List[int]]]) -> List[float]:
+        """ Returns the weighted costs summed over all minigames. """
+        net = [ 0.0, 0.0, 0.0, 0.0 ]
+        for i, (gpu, registers) in enumerate(games):
+            if gpu == 'GAME_OVER':
+                costs = ZERO_COSTS
+            else:
+                costs = ACTOR_COSTS[i](self.player_idx, gpu, registers)
+            # same evaluation order as `Polynomial::evaluate`
+            a, b, c, d = self.weights[i]
+            for j in range(4):
+                k = costs[j]
+                weight = a * k*k*k + b * k*k + c * k + d
+                net[j] += k * weight
+        return net
+
+
+    def choose_action(self, games: List[Tuple[str, List[int]]]) -> PlayerAction:
+        """ Returns the action the C++ actor would take for the given games. """
+        up, down, left, right = self.net_costs(games)
+        # pick the option with the lowest cost.
+        # prefers UP, then DOWN, then LEFT, then RIGHT, if tie.
+        if up <= down and up <= left and up <= right:
+            return PlayerAction.UP
+        elif down <= up and down <= left and down <= right:
+            return PlayerAction.DOWN
+        elif left <= up and left <= down and left <= right:
+            return PlayerAction.LEFT
+        return PlayerAction.RIGHT
+
+
+class PythonPlayer(Player):
+    """
+    A :class:`Player` backed by an in-process :class:`PyActor`, instead of an
+    actor process. Plays the same moves without any pipe I/O.
+    """
+    def init(self, pool: Optional[ActorPool] = None):
+        """ Prepares the actor for a new game. """
+        self.ticks = 0
+        self.actor = PyActor(self.player_idx, self.genes)
+
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        """ Asks the in-process actor for its response. """
+        self.ticks += 1
+        return self.actor.choose_action(state.games)
+
+
+    def close(self, reusable: bool = True):
+        """ Releases the in-process actor. """
+        self.actor = None
@@ -0,0 +1,37 @@
+from .game_manager import GameManager
+from .player_manager import PlayerSubset
+from .minigames import PlayerAction
+from .scenarios import ScenarioBank
+from .trace import MatchTrace, decode_actions
+
+from typing import List
+
+
+def replay_match(match: MatchTrace) -> List[List[List[int]]]:
+    """
+    Re-simulates a traced match with the current minigame rules, from its
+    scenarios and actions alone; no actor is involved. Returns the final
+    medals, to compare with :attr:`MatchTrace.medals`.
+
+    A player counts as dead from the first tick it played
+    :const:`PlayerAction.ERROR`, as in the live match.
+    """
+    subset = PlayerSubset(
+        do_debug_printing  = False,
+        do_info_printing   = False,
+        players            = [])
+    game_manager = GameManager(
+        do_debug_printing  = False,
+        do_info_printing   = False,
+        player_subset      = subset,
+        seed               = match.seed,
+        scenarios          = ScenarioBank(match.scenarios))
+    dead = subset.dead
+    for code in match.actions:
+        actions = decode_actions(code)
+        game_manager.begin_tick()
+        for pidx in range(3):
+            if actions[pidx] is PlayerAction.ERROR:
+                dead[pidx] = True
+        game_manager.end_tick(actions)
+    return subset.medals
@@ -0,0 +1,48 @@
+import json
+import random
+
+from .minigames import MINIGAME_TYPES
+
+from typing import List, Any
+
+
+class ScenarioBank:
+    """
+    A fixed list of scenarios per minigame (see
+    :meth:`Minigame.generate_scenario`). Every match given the same bank
+    plays the same rounds, in the same order, so differences in score come
+    from the players rather than the luck of the draw (common random
+    numbers). So far this has not shown a clear gain in ranking stability
+    or accuracy (see `benchmarks/rank_stability.py`): with few players,
+    ranking noise comes mostly from the matchups.
+
+    Scenarios are plain strings and ints, so banks are cheap to send to
+    workers, and can be saved and loaded as JSON.
+    """
+    def __init__(self, scenarios: List[List[Any]]):
+        self.scenarios:  List[List[Any]]  = scenarios
+        """ self.scenarios[minigame_idx] = [scenario, ...] """
+
+
+    @classmethod
+    def generate(cls, rng: random.Random, n_scenarios: int) -> 'ScenarioBank':
+        """
+        Draws :const:`n_scenarios` scenarios per minigame. A match cycles
+        through them if it plays more rounds than that; 16 is more than any
+        minigame plays in 100 ticks.
+        """
+        return cls([
+            [ minigame_type.generate_scenario(rng) for _ in range(n_scenarios) ]
+            for minigame_type in MINIGAME_TYPES
+        ])
+
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.scenarios, f)
+
+
+    @classmethod
+    def load(cls, path: str) -> 'ScenarioBank':
+        with open(path) as f:
+            return cls(json.load(f))
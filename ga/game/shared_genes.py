@@ -0,0 +1,59 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+from typing import Tuple
+
+
+class SharedGeneMatrix:
+    """
+    A gene matrix of shape :const:`(n_genes, n_players)` backed by shared
+    memory, so that worker processes can read a generation's genes without
+    them being pickled into every job.
+
+    The parent creates the matrix once with :meth:`create`, and copies each
+    generation's genes in with :meth:`write`; workers :meth:`attach` to it by
+    name and index into :attr:`array` directly.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, int], owner: bool):
+        self.shm:    shared_memory.SharedMemory  = shm
+        self.shape:  Tuple[int, int]             = shape
+        self.owner:  bool                        = owner
+        self.array:  np.ndarray                  = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+
+    @classmethod
+    def create(cls, n_genes: int, n_players: int) -> 'SharedGeneMatrix':
+        """ Allocates a new, zeroed shared gene matrix. """
+        shape = (n_genes, n_players)
+        size = n_genes * n_players * np.dtype(np.float64).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        matrix = cls(shm, shape, owner=True)
+        matrix.array[:] = 0.0
+        return matrix
+
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, int]) -> 'SharedGeneMatrix':
+        """ Attaches to a shared gene matrix created by another process. """
+        # note: workers share the parent's resource tracker, so attaching
+        # does not register the segment a second time
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, shape, owner=False)
+
+
+    def write(self, frame: np.ndarray) -> None:
+        """ Copies a generation's genes into the shared matrix. """
+        self.array[:] = frame
+
+
+    def close(self) -> None:
+        """ Detaches from the matrix, and frees it if this process created it. """
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,115 @@
+import json
+import struct
+
+from .minigames import PlayerAction
+
+from typing import List, Any, Iterator, Optional
+
+
+# a trace file is TRACE_MAGIC, then one record per match, appended as each
+# match finishes. a record is MATCH_HEADER (match seed or -1, number of
+# ticks, length of the scenarios, and final medals as
+# [minigame][player][gold, silver, bronze]), the scenarios each minigame
+# played as compact JSON, and then a byte per tick with its three actions
+TRACE_MAGIC = b'CGTR\x01'
+MATCH_HEADER = struct.Struct('<qHI36s')
+
+# actions are coded 0 (ERROR) to 4 (RIGHT); a tick's three in base 5
+_ACTION_CODES = { action: action.value + 1 for action in PlayerAction }
+_CODE_ACTIONS = { code: action for action, code in _ACTION_CODES.items() }
+
+
+def encode_actions(actions: List[PlayerAction]) -> int:
+    """ Packs a tick's three actions into a byte. """
+    return (_ACTION_CODES[actions[0]] * 25 +
+            _ACTION_CODES[actions[1]] * 5 +
+            _ACTION_CODES[actions[2]])
+
+
+def decode_actions(code: int) -> List[PlayerAction]:
+    return [ _CODE_ACTIONS[code // 25], _CODE_ACTIONS[code // 5 % 5], _CODE_ACTIONS[code % 5] ]
+
+
+class MatchTrace:
+    """
+    Everything needed to re-simulate a match without its actors: the
+    scenarios each minigame played, in order, and the players' actions every
+    tick; along with its seed, and its final medals to check a replay
+    against. See :func:`replay_match`.
+    """
+    def __init__(self, seed: Optional[int], scenarios: List[List[Any]],
+                 actions: bytes, medals: List[List[List[int]]]):
+        self.seed:       Optional[int]           = seed
+        self.scenarios:  List[List[Any]]         = scenarios
+        """ self.scenarios[minigame_idx] = [scenario, ...] """
+        self.actions:    bytes                   = actions
+        """ one byte per tick, see :func:`encode_actions` """
+        self.medals:     List[List[List[int]]]   = medals
+        """ self.medals[minigame_idx][player_idx] = [gold, silver, bronze] """
+
+
+    @classmethod
+    def from_game(cls, game_manager) -> 'MatchTrace':
+        """ The trace of a finished match, played by a recording :class:`GameManager`. """
+        return cls(
+            seed       = game_manager.seed,
+            scenarios  = [ minigame.recorded for minigame in game_manager.minigames ],
+            actions    = bytes(game_manager.actions_log),
+            medals     = game_manager.player_subset.medals)
+
+
+    def pack(self) -> bytes:
+        scenarios = json.dumps(self.scenarios, separators=(',', ':')).encode('utf-8')
+        medals = bytes(medal for minigame_medals in self.medals
+                             for player_medals in minigame_medals
+                             for medal in player_medals)
+        header = MATCH_HEADER.pack(-1 if self.seed is None else self.seed,
+                                   len(self.actions), len(scenarios), medals)
+        return header + scenarios + self.actions
+
+
+class TraceWriter:
+    """
+    Appends :class:`MatchTrace`s to a trace file as matches finish. A record
+    is about 100 bytes of actions plus the scenarios, so writing one costs
+    next to nothing beside playing the match.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(TRACE_MAGIC)
+
+
+    def write(self, match: MatchTrace) -> None:
+        self.file.write(match.pack())
+
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read_trace(path: str) -> Iterator[MatchTrace]:
+    """
+    Yields the matches of a trace file, in order. A record cut short (eg. the
+    run was killed mid-write) ends the trace.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        while True:
+            header = f.read(MATCH_HEADER.size)
+            if len(header) < MATCH_HEADER.size:
+                return
+            seed, n_ticks, scenarios_len, medals = MATCH_HEADER.unpack(header)
+            scenarios = f.read(scenarios_len)
+            actions = f.read(n_ticks)
+            if len(scenarios) < scenarios_len or len(actions) < n_ticks:
+                return
+            yield MatchTrace(
+                seed       = None if seed == -1 else seed,
+                scenarios  = json.loads(scenarios),
+                actions    = actions,
+                medals     = [ [ list(medals[9*midx + 3*pidx:9*midx + 3*pidx + 3])
+                                 for pidx in range(3) ]
+                               for midx in range(4) ])
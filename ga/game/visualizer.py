@@ -0,0 +1,156 @@
+import os
+import queue
+import multiprocessing as mp
+import numpy as np
+
+from typing import List, Tuple, Optional
+
+# note: matplotlib is only ever imported in the visualizer process, so that
+# neither the driver nor the workers pay for it (or need a display)
+
+
+# one generation's (round number, scores, gene frame or None)
+Generation = Tuple[int, np.ndarray, Optional[np.ndarray]]
+
+
+def _score_colors(scores: np.ndarray) -> np.ndarray:
+    """
+    Colors for each player's points: black for zero-scores, blue for the top
+    5, and red to green (worst to best) for the rest.
+    """
+    colors = np.zeros((len(scores), 3))
+    nonzero = scores > 0
+    if nonzero.any():
+        best_score = scores.max()
+        worst_score = scores[nonzero].min()
+        dscore = max(best_score - worst_score, 1)  # ZeroDivisionError protection
+        placing = (scores - worst_score) / dscore
+        colors[nonzero, 0] = 1 - placing[nonzero]
+        colors[nonzero, 1] = placing[nonzero]
+    colors[np.argsort(-scores, kind='stable')[:5]] = (0.0, 0.0, 1.0)
+    return colors
+
+
+def _render_frame(plt, out_dir: str, round_num: int,
+                  scores: np.ndarray, frame: np.ndarray) -> None:
+    """ Writes a generation's gene and score distributions as PNGs. """
+    colors = _score_colors(scores)
+
+    # first figure -- gene distribution
+    fig, ax = plt.subplots()
+    ax.set_title(f"Gene distribution -- Round {round_num+1}")
+    ax.set_xlabel('Gene number')
+    ax.set_ylabel('Values')
+    for gene_idx, genes in enumerate(frame):
+        # all points of this gene share the same x
+        ax.scatter(np.full(len(genes), gene_idx), genes, c=colors, marker='o')
+    fig.savefig(os.path.join(out_dir, f'genes_{round_num+1:05d}.png'))
+    plt.close(fig)
+
+    # second figure -- score distribution, best first
+    sorted_players = np.argsort(-scores, kind='stable')
+    fig, ax = plt.subplots()
+    ax.set_title(f"Score distribution -- Round {round_num+1}")
+    ax.set_xlabel('Placement')
+    ax.set_ylabel('Score')
+    ax.bar(np.arange(len(scores)), scores[sorted_players],
+           color=colors[sorted_players], width=1.0)
+    fig.savefig(os.path.join(out_dir, f'scores_{round_num+1:05d}.png'))
+    plt.close(fig)
+
+
+def _render_history(plt, out_dir: str, history: List[Tuple[int, float, float, float]]) -> None:
+    """ Rewrites the plot of best, median and mean score per generation. """
+    rounds, best, median, mean = zip(*history)
+    fig, ax = plt.subplots()
+    ax.set_title("Score history")
+    ax.set_xlabel('Round')
+    ax.set_ylabel('Score')
+    ax.plot(rounds, best, label='best')
+    ax.plot(rounds, median, label='median')
+    ax.plot(rounds, mean, label='mean')
+    ax.legend()
+    # written aside and renamed, so a viewer never sees a partial image
+    tmp_path = os.path.join(out_dir, 'history.tmp.png')
+    fig.savefig(tmp_path)
+    plt.close(fig)
+    os.replace(tmp_path, os.path.join(out_dir, 'history.png'))
+
+
+def _visualizer_main(out_dir: str, generations: mp.Queue) -> None:
+    """
+    Entry point of the visualizer process. Renders generations taken from
+    :const:`generations` until a :const:`None` sentinel is received.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+
+    os.makedirs(out_dir, exist_ok=True)
+    history = []
+    while True:
+        generation: Optional[Generation] = generations.get()
+        if generation is None:
+            break
+        round_num, scores, frame = generation
+        history.append( (round_num+1, scores.max(), np.median(scores), scores.mean()) )
+        if frame is not None:
+            _render_frame(plt, out_dir, round_num, scores, frame)
+        _render_history(plt, out_dir, history)
+
+
+class Visualizer:
+    """
+    Renders plots of an evolution run in a background process, as PNGs in
+    :attr:`out_dir`: the gene and score distributions of every generation
+    given its gene frame, and a continuously updated ``history.png`` of
+    scores over all generations.
+
+    Submitting never blocks: if the renderer falls behind by more than
+    :attr:`max_pending` generations, further ones are dropped (and counted
+    in :attr:`dropped`) rather than holding up evaluation.
+    """
+    def __init__(self, out_dir: str, max_pending: int = 8):
+        self.out_dir:      str            = out_dir
+        self.max_pending:  int            = max_pending
+        self.dropped:      int            = 0
+        self.ctx                          = mp.get_context('spawn')
+        self.generations:  mp.Queue       = self.ctx.Queue(maxsize=max_pending)
+        self.process:      mp.Process     = self.ctx.Process(
+            target=_visualizer_main, args=(out_dir, self.generations), daemon=True)
+        self.process.start()
+
+
+    def submit(self, round_num: int, scores: List[int], frame: Optional[np.ndarray] = None) -> None:
+        """
+        Queues a finished generation for rendering; its gene distribution is
+        only plotted if its :const:`frame` is given.
+        """
+        generation = (round_num, np.asarray(scores),
+                      None if frame is None else np.array(frame))
+        try:
+            self.generations.put_nowait(generation)
+        except queue.Full:
+            self.dropped += 1
+
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Waits for queued generations to be rendered, and stops the process;
+        reports how many generations were dropped, if any. If the process has
+        died, or does not take the stop sentinel within :const:`timeout`
+        seconds, what is still queued is abandoned.
+        """
+        if self.dropped:
+            print(f"Visualizer: {self.dropped} generations were not plotted; "
+                  f"the renderer fell behind")
+        if self.process.is_alive():
+            try:
+                self.generations.put(None, timeout=timeout)
+            except queue.Full:
+                self.process.terminate()
+        else:
+            print("Visualizer: the renderer process died; later plots are missing")
+        self.process.join()
+        # the queue's feeder thread would otherwise wait on a dead reader
+        self.generations.cancel_join_thread()
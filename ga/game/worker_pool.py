@@ -0,0 +1,508 @@
+import os
+import time
+import queue
+import statistics
+import multiprocessing as mp
+import numpy as np
+
+from typing import List, Dict, Tuple, Optional
+
+from .game_manager import GameManager
+from .player_manager import PlayerSubset, Job, PLAYER_BACKENDS
+from .player import Player, ActorPool, MultiplexedActor
+from .multiplex import play_multiplexed
+from .async_runner import AsyncMatchRunner
+from .shared_genes import SharedGeneMatrix
+from .scenarios import ScenarioBank
+from .instrument import Instruments, INSTRUMENTS
+from .trace import MatchTrace, TraceWriter
+
+
+# (generation number, batch index) -- identifies a batch of games
+BatchKey = Tuple[int, int]
+
+
+def _worker_main(worker_idx: int, rounds: int, batch_size: int,
+                 executable_path: str, actor_backend: str,
+                 tick_timeout: Optional[float], init_timeout: Optional[float],
+                 genes_name: str, genes_shape: Tuple[int, int],
+                 trace_path: Optional[str],
+                 do_debug_printing: bool, do_info_printing: bool,
+                 jobs_queue: mp.Queue, results_queue: mp.Queue,
+                 current_generation: 'mp.sharedctypes.Synchronized') -> None:
+    """
+    Entry point of a long-lived worker process. Plays batches of games taken
+    from the shared :const:`jobs_queue` until a :const:`None` sentinel is
+    received.
+
+    Every batch is announced on :const:`results_queue` twice, along with
+    this worker's index: once with :const:`None` scores when it is picked
+    up, and once with its scores, play time, the number of actor timeouts
+    and time lost to them, and, if the batch was instrumented, this worker's
+    :class:`Instruments` for it when it is finished. A batch of a generation
+    before :const:`current_generation` (ie. a left-over copy of a
+    re-dispatched one) is not played, and is answered at once with no
+    scores.
+
+    Jobs only carry gene indices and a match seed; the genes themselves are
+    read from the shared gene matrix, which the parent fills in before each
+    generation.
+
+    If given a :const:`trace_path`, every game this worker plays is
+    recorded there.
+    """
+    Player.set_deadlines(tick_timeout, init_timeout)
+    # actor processes are re-used across this worker's games
+    pool = ActorPool(executable_path, size=3,
+                     args=PLAYER_BACKENDS[actor_backend].ACTOR_ARGS)
+    multiplexed: Optional[MultiplexedActor] = None
+    async_runner: Optional[AsyncMatchRunner] = None
+    genes = SharedGeneMatrix.attach(genes_name, genes_shape)
+    trace = TraceWriter(trace_path) if trace_path is not None else None
+    try:
+        while True:
+            batch: Optional[Tuple[BatchKey, List[Job], Optional[ScenarioBank], bool]] = jobs_queue.get()
+            if batch is None:
+                break
+            key, jobs, scenarios, instrument = batch
+            if key[0] < current_generation.value:
+                results_queue.put( (worker_idx, key, [], 0.0, 0, 0.0, None) )
+                continue
+            INSTRUMENTS.enabled = instrument
+            results_queue.put( (worker_idx, key, None, 0.0, 0, 0.0, None) )
+            batch_start = time.monotonic()
+            subsets = [
+                PlayerSubset.from_genes(
+                    do_debug_printing  = do_debug_printing,
+                    do_info_printing   = do_info_printing,
+                    executable_path    = executable_path,
+                    gene_frame         = genes.array,
+                    gene_idxs          = gene_idxs,
+                    actor_backend      = actor_backend)
+                for gene_idxs, seed in jobs ]
+            seeds = [ seed for gene_idxs, seed in jobs ]
+            if actor_backend == 'process-multiplex':
+                # the whole batch is played in lockstep by a single actor,
+                # respawned if it died or was killed for missing a deadline
+                if multiplexed is None or not multiplexed.is_alive():
+                    multiplexed = MultiplexedActor(executable_path)
+                batch_scores = play_multiplexed(
+                    multiplexed, subsets, seeds, rounds,
+                    do_debug_printing, do_info_printing, scenarios, trace)
+            elif actor_backend == 'process-async':
+                # all games of the batch are in flight at once; sized for a
+                # full batch, as the first one may be a short one
+                if async_runner is None:
+                    async_runner = AsyncMatchRunner(executable_path, concurrency=batch_size)
+                batch_scores = async_runner.play(
+                    subsets, seeds, rounds, do_debug_printing, do_info_printing, scenarios, trace)
+            else:
+                batch_scores = [
+                    _play_game(players, seed, pool, rounds,
+                               do_debug_printing, do_info_printing, scenarios, trace)
+                    for players, seed in zip(subsets, seeds) ]
+            batch_time = time.monotonic() - batch_start
+            if instrument:
+                INSTRUMENTS.record('batch', batch_time)
+                INSTRUMENTS.count('games', len(jobs))
+            results_queue.put( (worker_idx, key, batch_scores, batch_time,
+                                sum(subset.timeouts for subset in subsets),
+                                sum(subset.hang_time for subset in subsets),
+                                INSTRUMENTS.drain()) )
+    finally:
+        genes.close()
+        pool.close()
+        if trace is not None:
+            trace.close()
+        if multiplexed is not None:
+            multiplexed.close()
+        if async_runner is not None:
+            async_runner.close()
+
+
+def _play_game(players: PlayerSubset, seed: int, pool: ActorPool, rounds: int,
+               do_debug_printing: bool, do_info_printing: bool,
+               scenarios: Optional[ScenarioBank] = None,
+               trace: Optional[TraceWriter] = None) -> Dict[int, int]:
+    """
+    Plays a single game with the given match seed, or scenario bank if any,
+    and returns its scores. If given a :class:`TraceWriter`, the game is
+    recorded to it.
+    """
+    instruments = INSTRUMENTS
+    if instruments.enabled:
+        start = time.perf_counter()
+    players.init_player_processes(pool)
+    game_manager = GameManager(
+        do_debug_printing = do_debug_printing,
+        do_info_printing  = do_info_printing,
+        player_subset     = players,
+        seed              = seed,
+        scenarios         = scenarios,
+        record            = trace is not None)
+    # play a game -- 100 steps per game
+    for round_i in range(rounds):
+        game_manager.tick()
+    # finally, accumulate each player's score
+    scores = players.finalize_scores()
+    players.close_player_processes()
+    if trace is not None:
+        trace.write(MatchTrace.from_game(game_manager))
+    if instruments.enabled:
+        instruments.record('match', time.perf_counter() - start)
+    return scores
+
+
+class WorkerPool:
+    """
+    A pool of worker processes that lives for a whole evolution run. Workers
+    are started once, and then take games from a single shared job queue, so
+    the cost of spawning processes (and of re-importing this package in each
+    of them) is only paid once.
+
+    Games are handed out in small batches, and results are consumed in
+    completion order. Once every batch has been picked up, batches that have
+    been running for much longer than usual (eg. because of a hanging actor)
+    are put back on the queue for an idle worker; whichever copy finishes
+    first is used. A batch is re-dispatched at most
+    :const:`MAX_REDISPATCHES` times before the generation fails. Workers
+    that die are respawned, and the batch they held is put back on the
+    queue. Left-over copies are skipped, or waited for, before the next
+    generation's genes are written. Straggler deadlines are relative to
+    finished batches, so with actor deadlines disabled, a generation in
+    which every worker hangs before any batch finishes still waits.
+
+    Genes are shared with the workers through a :class:`SharedGeneMatrix`,
+    so a job is just the three gene indices of its players, and the seed of
+    its match. Each match draws from its own seeded stream, so results do
+    not depend on which worker played it.
+
+    Actors that miss their per-tick or per-init deadline are killed and
+    their player marked dead; the time lost to them is reported per
+    generation.
+
+    While :attr:`instrument` is set (it can be toggled between generations),
+    workers time each phase of their games, and the parent how long it
+    waits on results; the merged breakdown of the last generation is kept
+    in :attr:`last_instruments`.
+
+    If given a :const:`trace_dir`, every game played is recorded there, in a
+    trace file per worker (see :class:`MatchTrace`); a re-dispatched batch
+    may be recorded twice.
+    """
+    # re-dispatches of a single batch, before giving up on the generation
+    MAX_REDISPATCHES: int = 3
+
+    def __init__(self,
+                 do_debug_printing:  bool,
+                 do_info_printing:   bool,
+                 executable_path:    str,
+                 n_workers:          int,
+                 n_genes:            int,
+                 n_players:          int,
+                 actor_backend:      str    = 'process',
+                 instrument:         bool   = False,
+                 trace_dir:          Optional[str] = None,
+                 tick_timeout:       Optional[float] = 0.5,
+                 init_timeout:       Optional[float] = 5.0,
+                 rounds:             int    = 100,
+                 batch_size:         int    = 8,
+                 straggler_factor:   float  = 4.0):
+        # save settings
+        self.do_debug_printing:  bool            = do_debug_printing
+        self.do_info_printing:   bool            = do_info_printing
+        self.executable_path:    str             = executable_path
+        self.n_workers:          int             = n_workers
+        self.n_genes:            int             = n_genes
+        self.n_players:          int             = n_players
+        self.actor_backend:      str             = actor_backend
+        self.instrument:         bool            = instrument
+        self.trace_dir:          Optional[str]   = trace_dir
+        self.tick_timeout:       Optional[float] = tick_timeout
+        self.init_timeout:       Optional[float] = init_timeout
+        self.rounds:             int             = rounds
+        self.batch_size:         int             = batch_size
+        self.straggler_factor:   float           = straggler_factor
+        self.generation:         int             = 0
+
+        # initialize process data
+        self.ctx                                 = mp.get_context('spawn')
+        self.jobs_queue:         mp.Queue        = self.ctx.Queue()
+        self.results_queue:      mp.Queue        = self.ctx.Queue()
+        self.processes:          List[mp.Process] = []
+        self.genes:    Optional[SharedGeneMatrix] = None
+        # workers skip batches of generations before this one
+        self.current_generation                  = self.ctx.Value('q', 0)
+        # copies of each batch dispatched and not yet finished, of this
+        # generation or earlier ones; and the batch each worker is playing
+        self.in_flight:          Dict[BatchKey, int]  = {}
+        self.running:            Dict[int, BatchKey]  = {}
+        # median batch time of the last generation, in seconds
+        self.last_batch_time:    float           = 0.0
+
+        # timings of the last generation, in seconds
+        self.last_startup_time:      float  = 0.0
+        self.last_first_result_time: float  = 0.0
+        self.last_redispatches:      int    = 0
+        self.last_respawns:          int    = 0
+        self.last_timeouts:          int    = 0
+        self.last_hang_time:         float  = 0.0
+        self.last_instruments:  Instruments = Instruments()
+
+
+    def start(self) -> None:
+        """ Starts the worker processes, if not already started. """
+        if self.processes:
+            return
+        self.genes = SharedGeneMatrix.create(self.n_genes, self.n_players)
+        if self.trace_dir is not None:
+            os.makedirs(self.trace_dir, exist_ok=True)
+        for worker_idx in range(self.n_workers):
+            self.processes.append(self._spawn_worker(worker_idx))
+
+
+    def _spawn_worker(self, worker_idx: int) -> mp.Process:
+        trace_path = None
+        if self.trace_dir is not None:
+            trace_path = os.path.join(self.trace_dir, f'worker_{worker_idx}.cgtr')
+        proc = self.ctx.Process(target=_worker_main, args=(
+            worker_idx, self.rounds, self.batch_size,
+            self.executable_path, self.actor_backend,
+            self.tick_timeout, self.init_timeout,
+            self.genes.name, self.genes.shape, trace_path,
+            self.do_debug_printing, self.do_info_printing,
+            self.jobs_queue, self.results_queue, self.current_generation))
+        proc.start()
+        return proc
+
+
+    def play_generation(self, gene_frame: np.array, jobs: List[Job],
+                        scenarios: Optional[ScenarioBank] = None) -> List[Dict[int, int]]:
+        """
+        Plays all given games between players of the given gene frame (see
+        :meth:`PlayerManager.choose_jobs`) on the pool, and returns their
+        scores (see
+        :meth:`PlayerSubset.finalize_scores`), in completion order. Also
+        records this generation's spin-up overhead: the time spent starting
+        workers, and the time until the first game result came back.
+
+        If a :class:`ScenarioBank` is given, every game plays its rounds
+        instead of drawing its own; it is sent along with every batch.
+
+        Raises :class:`RuntimeError` if a batch is still unfinished after
+        :const:`MAX_REDISPATCHES` re-dispatches.
+        """
+        gen_start = time.monotonic()
+        self.start()
+        self.last_startup_time = time.monotonic() - gen_start
+        self.last_first_result_time = 0.0
+        self.last_redispatches = 0
+        self.last_respawns = 0
+        self.last_timeouts = 0
+        self.last_hang_time = 0.0
+        instrument = self.instrument
+        instruments = self.last_instruments = Instruments()
+
+        # share genes, once no copy of an earlier generation's batch can
+        # still be reading them: queued ones are skipped from now on, and
+        # running ones are waited for
+        generation = self.generation
+        self.generation += 1
+        self.current_generation.value = generation
+        self._drain_stale()
+        self.genes.write(gene_frame)
+
+        # dispatch all batches
+        batches: Dict[BatchKey, List[Job]] = {}
+        for batch_idx, first in enumerate(range(0, len(jobs), self.batch_size)):
+            key = (generation, batch_idx)
+            batches[key] = jobs[first:first+self.batch_size]
+            self._dispatch(key, batches[key], scenarios, instrument)
+
+        # gather results as they complete
+        started:      Dict[BatchKey, float]  = {}
+        redispatched: Dict[BatchKey, int]    = {}
+        durations:    List[float]            = []
+        results:      List[Dict[int, int]]   = []
+        # time spent waiting for the next result, over however many polls
+        waited = 0.0
+        while len(batches) > 0:
+            self._check_workers(batches, started, scenarios, instrument)
+            self._redispatch_stragglers(batches, started, redispatched, durations,
+                                        scenarios, instrument)
+            if instrument:
+                wait_start = time.perf_counter()
+            try:
+                key, batch_scores, duration, timeouts, hang_time, batch_instruments = \
+                    self._receive()
+            except queue.Empty:
+                continue
+            finally:
+                if instrument:
+                    waited += time.perf_counter() - wait_start
+            # results of an earlier generation, or of an already finished
+            # batch (ie. the slower copy of a re-dispatched batch)
+            if key not in batches:
+                continue
+            if batch_scores is None:
+                started.setdefault(key, time.monotonic())
+                continue
+            if instrument:
+                instruments.record('queue.wait', waited)
+                waited = 0.0
+            if not results:
+                self.last_first_result_time = time.monotonic() - gen_start
+            results.extend(batch_scores)
+            durations.append(duration)
+            self.last_timeouts += timeouts
+            self.last_hang_time += hang_time
+            if batch_instruments is not None:
+                instruments.merge(batch_instruments)
+            del batches[key]
+        self.last_batch_time = statistics.median(durations) if durations else 0.0
+
+        if self.do_info_printing:
+            print(f"WorkerPool: spin-up overhead "
+                  f"{self.last_startup_time*1000:.1f} ms starting workers, "
+                  f"{self.last_first_result_time*1000:.1f} ms to first result; "
+                  f"{self.last_redispatches} batches re-dispatched, "
+                  f"{self.last_respawns} workers respawned; "
+                  f"{self.last_timeouts} actors timed out, "
+                  f"{self.last_hang_time*1000:.1f} ms lost waiting on them")
+        if instrument:
+            instruments.record('generation', time.monotonic() - gen_start)
+            if self.do_info_printing:
+                print("WorkerPool: time per phase, all workers:")
+                for line in instruments.report():
+                    print(line)
+        return results
+
+
+    def _dispatch(self, key: BatchKey, jobs: List[Job],
+                  scenarios: Optional[ScenarioBank], instrument: bool) -> None:
+        """ Puts a copy of a batch on the job queue. """
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        self.jobs_queue.put( (key, jobs, scenarios, instrument) )
+
+
+    def _receive(self) -> Tuple[BatchKey, Optional[List[Dict[int, int]]], float, int, float,
+                                Optional[Instruments]]:
+        """
+        Takes the next message off the results queue, and keeps track of
+        which worker plays what; raises :class:`queue.Empty` after 0.1s.
+        """
+        worker_idx, key, *result = self.results_queue.get(timeout=0.1)
+        if result[0] is None:
+            self.running[worker_idx] = key
+        else:
+            self.running.pop(worker_idx, None)
+            self._finish_copy(key)
+        return (key, *result)
+
+
+    def _finish_copy(self, key: BatchKey) -> None:
+        self.in_flight[key] -= 1
+        if self.in_flight[key] == 0:
+            del self.in_flight[key]
+
+
+    def _check_workers(self,
+                       batches:     Dict[BatchKey, List[Job]],
+                       started:     Dict[BatchKey, float],
+                       scenarios:   Optional[ScenarioBank],
+                       instrument:  bool) -> None:
+        """
+        Respawns workers that died, and puts the batch each one was playing
+        back on the queue. A worker that died before announcing its batch
+        may have taken one off the queue, so then every batch not yet
+        picked up is put back as well; extra copies are harmless.
+        """
+        for worker_idx, proc in enumerate(self.processes):
+            if proc.is_alive():
+                continue
+            print(f"WorkerPool: worker {worker_idx} died (exit code {proc.exitcode}); respawning")
+            proc.join()
+            self.processes[worker_idx] = self._spawn_worker(worker_idx)
+            self.last_respawns += 1
+            lost = self.running.pop(worker_idx, None)
+            if lost is not None:
+                self._finish_copy(lost)
+                requeue = [ lost ] if lost in batches else []
+            else:
+                requeue = [ key for key in batches if key not in started ]
+            for key in requeue:
+                self._dispatch(key, batches[key], scenarios, instrument)
+
+
+    def _drain_stale(self) -> None:
+        """
+        Waits until no copy of an earlier generation's batch is still being
+        played. Queued copies are skipped by the workers (see
+        :func:`_worker_main`) and answered at once. Copies lost with a dead
+        worker never answer, so this stops waiting once no worker is playing
+        a stale batch and the queue is empty. Workers still playing one after
+        :attr:`straggler_factor` times the last median batch time are
+        terminated, and respawned.
+        """
+        deadline = time.monotonic() + self.straggler_factor * self.last_batch_time
+        while self.in_flight:
+            if time.monotonic() > deadline:
+                for worker_idx in self.running:
+                    self.processes[worker_idx].terminate()
+                    self.processes[worker_idx].join()
+            self._check_workers({}, {}, None, False)
+            if not self.running and self.jobs_queue.empty():
+                # give workers a moment to answer the last skipped copies
+                try:
+                    self._receive()
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                self._receive()
+            except queue.Empty:
+                pass
+        self.in_flight.clear()
+
+
+    def _redispatch_stragglers(self,
+                               batches:       Dict[BatchKey, List[Job]],
+                               started:       Dict[BatchKey, float],
+                               redispatched:  Dict[BatchKey, int],
+                               durations:     List[float],
+                               scenarios:     Optional[ScenarioBank],
+                               instrument:    bool) -> None:
+        """
+        Puts unfinished batches back onto the job queue, once all batches have
+        been picked up and a batch has been running for more than
+        :attr:`straggler_factor` times the median batch duration since it (or
+        its last copy) was dispatched. Raises :class:`RuntimeError` once a
+        batch overruns again after :const:`MAX_REDISPATCHES` re-dispatches.
+        """
+        if not durations or any(key not in started for key in batches):
+            return
+        deadline = self.straggler_factor * statistics.median(durations)
+        now = time.monotonic()
+        for key, jobs in batches.items():
+            if now - started[key] < deadline:
+                continue
+            if redispatched.get(key, 0) >= self.MAX_REDISPATCHES:
+                raise RuntimeError(f"WorkerPool: batch {key} still unfinished after "
+                                   f"{self.MAX_REDISPATCHES} re-dispatches")
+            redispatched[key] = redispatched.get(key, 0) + 1
+            # time the new copy from now
+            started[key] = now
+            self.last_redispatches += 1
+            self._dispatch(key, jobs, scenarios, instrument)
+
+
+    def close(self) -> None:
+        """ Stops all worker processes, and waits for them to exit. """
+        for proc in self.processes:
+            self.jobs_queue.put(None)
+        for proc in self.processes:
+            proc.join()
+        self.processes.clear()
+        if self.genes is not None:
+            self.genes.close()
+            self.genes = None
@@ -0,0 +1,92 @@
+"""
+Checks that the in-process Python actor (`game/py_actor.py`) chooses the same
+moves as the C++ actor binary, by shadowing every C++ player of a number of
+random games with a :class:`PyActor` fed the exact same state.
+
+Moves whose costs are not finite (eg. archery with an opponent on the
+bullseye divides by zero) depend on how `-ffast-math` compiled the actor, and
+are reported separately rather than counted as mismatches.
+
+Run from the `ga/` directory:
+    python -m tools.actor_parity path/to/cg-summer-2024 [n_games]
+"""
+import sys
+import math
+import numpy as np
+
+from game.game_manager import GameManager
+from game.player_manager import PlayerSubset
+from game.player import Player, ActorPool, TickState
+from game.py_actor import PyActor
+from game.minigames import PlayerAction
+
+
+class ShadowedPlayer(Player):
+    """ A C++ :class:`Player` that also asks a :class:`PyActor` each tick. """
+    def init(self, pool=None):
+        super().init(pool)
+        self.shadow = PyActor(self.player_idx, self.genes)
+        self.n_checked = 0
+        self.mismatches = []
+        self.n_non_finite = 0
+
+    def get_response(self, state: TickState) -> PlayerAction:
+        action = super().get_response(state)
+        expected = self.shadow.choose_action(state.games)
+        self.n_checked += 1
+        if action == expected:
+            return action
+        if not all(map(math.isfinite, self.shadow.net_costs(state.games))):
+            self.n_non_finite += 1
+        else:
+            self.mismatches.append( (state.text_lines(), action, expected) )
+        return action
+
+
+def check_parity(executable_path: str, n_games: int, seed: int = 0) -> int:
+    """
+    Plays :const:`n_games` random games, and returns the number of moves with
+    finite costs on which both actors disagreed.
+    """
+    rng = np.random.default_rng(seed)
+    pool = ActorPool(executable_path)
+    n_checked = 0
+    n_non_finite = 0
+    mismatches = []
+    for game_i in range(n_games):
+        gene_frame = rng.uniform(-10.0, 10.0, (16, 3))
+        players = [ ShadowedPlayer(executable_path, gidx, gidx, gene_frame[:, gidx])
+                    for gidx in range(3) ]
+        subset = PlayerSubset(do_debug_printing = False,
+                              do_info_printing  = False,
+                              players           = players)
+        subset.init_player_processes(pool)
+        game_manager = GameManager(do_debug_printing = False,
+                                   do_info_printing  = False,
+                                   player_subset     = subset,
+                                   seed              = int(rng.integers(2**32)))
+        for round_i in range(100):
+            game_manager.tick()
+        subset.close_player_processes()
+        for player in players:
+            n_checked += player.n_checked
+            n_non_finite += player.n_non_finite
+            mismatches += player.mismatches
+    pool.close()
+
+    print(f"Checked {n_checked} moves over {n_games} games, "
+          f"{len(mismatches)} mismatches "
+          f"({n_non_finite} more disagreements with non-finite costs).")
+    for lines, action, expected in mismatches[:5]:
+        print(f"\nC++ chose {action.name}, Python chose {expected.name}, for state:")
+        for line in lines:
+            print(' ', line)
+    return len(mismatches)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    n_games = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sys.exit(1 if check_parity(sys.argv[1], n_games) else 0)
@@ -0,0 +1,146 @@
+"""
+Checks that the vectorized batch simulator (`game/batch_sim.py`) plays
+exactly like the scalar one (`GameManager`, the minigame classes, and the
+in-process Python actor). Random games are played by the scalar engine,
+recording every scenario each minigame played; the same matches are then
+played by a :class:`BatchSimulator` that loads those scenarios instead of
+drawing its own, and every action of every tick, and the final medals, are
+compared.
+
+Run from the `ga/` directory:
+    python -m tools.batch_parity [n_games]
+"""
+import sys
+import numpy as np
+
+from game.game_manager import GameManager
+from game.player_manager import PlayerSubset
+from game.minigames.minigame import LETTER_ACTIONS
+from game.batch_sim import BatchSimulator, HURDLES_LENGTH, HURDLES, ARCHERY, SKATING, DIVING
+from game.trace import MatchTrace, decode_actions
+
+from typing import List, Any
+
+
+class ScriptedBatchSimulator(BatchSimulator):
+    """
+    A :class:`BatchSimulator` that plays given scenarios, in order, instead
+    of drawing its own; and keeps the actions chosen every tick.
+    """
+    def __init__(self, genes: np.ndarray, scenarios: List[List[List[Any]]]):
+        # scenarios[match][minigame] = [scenario, ...], as recorded
+        self.scripted = scenarios
+        self.next_scenario = np.zeros((genes.shape[0], 4), dtype=np.int64)
+        self.turns = np.zeros(genes.shape[0], dtype=np.int64)
+        self.orders = [ None ] * genes.shape[0]
+        self.actions_log: List[np.ndarray] = []
+        super().__init__(genes, np.random.default_rng(0))
+
+
+    def _next(self, match: int, minigame_idx: int) -> Any:
+        scenario = self.scripted[match][minigame_idx][self.next_scenario[match, minigame_idx]]
+        self.next_scenario[match, minigame_idx] += 1
+        return scenario
+
+
+    def _reset_hurdles(self, mask: np.ndarray) -> None:
+        super()._reset_hurdles(mask)
+        for match in np.flatnonzero(mask):
+            tiles = self._next(match, HURDLES)
+            self.hurdle_map[match] = False
+            self.hurdle_map[match, :HURDLES_LENGTH] = [ tile == '#' for tile in tiles ]
+
+
+    def _reset_archery(self, mask: np.ndarray) -> None:
+        super()._reset_archery(mask)
+        for match in np.flatnonzero(mask):
+            x, y, wind = self._next(match, ARCHERY)
+            self.cursors[match] = (x, y)
+            self.wind[match, :len(wind)] = list(map(int, wind))
+            self.wind_length[match] = len(wind)
+
+
+    def _reset_skating(self, mask: np.ndarray) -> None:
+        super()._reset_skating(mask)
+        for match in np.flatnonzero(mask):
+            self.orders[match] = self._next(match, SKATING)
+            self.turns[match] = 0
+            self._load_order(match)
+
+
+    def _load_order(self, match: int) -> None:
+        order = self.orders[match][min(self.turns[match], len(self.orders[match]) - 1)]
+        self.directions[match] = [ LETTER_ACTIONS[letter].value for letter in order ]
+
+
+    def _tick_skating(self, actions: np.ndarray) -> None:
+        super()._tick_skating(actions)
+        self.turns += 1
+        for match in range(self.n_matches):
+            self._load_order(match)
+
+
+    def _reset_diving(self, mask: np.ndarray) -> None:
+        super()._reset_diving(mask)
+        for match in np.flatnonzero(mask):
+            goal = self._next(match, DIVING)
+            self.goal[match, :len(goal)] = [ LETTER_ACTIONS[letter].value for letter in goal ]
+            self.goal_length[match] = len(goal)
+
+
+    def _choose_actions(self) -> np.ndarray:
+        actions = super()._choose_actions()
+        self.actions_log.append(actions.copy())
+        return actions
+
+
+def check_parity(n_games: int, rounds: int = 100, seed: int = 0) -> int:
+    """
+    Plays :const:`n_games` random games on both engines, and returns the
+    number of games that differ in any action or medal.
+    """
+    rng = np.random.default_rng(seed)
+    gene_frames = rng.uniform(-10.0, 10.0, (n_games, 16, 3))
+    traces = []
+    for game_i in range(n_games):
+        subset = PlayerSubset.from_genes(
+            do_debug_printing  = False,
+            do_info_printing   = False,
+            executable_path    = '',
+            gene_frame         = gene_frames[game_i],
+            gene_idxs          = (0, 1, 2),
+            actor_backend      = 'python')
+        subset.init_player_processes()
+        game_manager = GameManager(False, False, subset,
+                                   seed=int(rng.integers(2**32)), record=True)
+        for round_i in range(rounds):
+            game_manager.tick()
+        subset.close_player_processes()
+        traces.append(MatchTrace.from_game(game_manager))
+
+    simulator = ScriptedBatchSimulator(gene_frames.transpose(0, 2, 1),
+                                       [ trace.scenarios for trace in traces ])
+    for round_i in range(rounds):
+        simulator.tick()
+
+    mismatches = []
+    for game_i, trace in enumerate(traces):
+        actions = [ [ action.value for action in decode_actions(code) ] for code in trace.actions ]
+        batch_actions = [ tick_actions[game_i].tolist() for tick_actions in simulator.actions_log ]
+        medals = simulator.medals[game_i].tolist()
+        if actions != batch_actions:
+            tick = next(t for t, (a, b) in enumerate(zip(actions, batch_actions)) if a != b)
+            mismatches.append(f"game {game_i}: actions differ from tick {tick}: "
+                              f"{actions[tick]} vs {batch_actions[tick]}")
+        elif medals != trace.medals:
+            mismatches.append(f"game {game_i}: medals differ: {trace.medals} vs {medals}")
+
+    print(f"Compared {n_games} games of {rounds} ticks, {len(mismatches)} mismatches.")
+    for mismatch in mismatches[:5]:
+        print(' ', mismatch)
+    return len(mismatches)
+
+
+if __name__ == '__main__':
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sys.exit(1 if check_parity(n_games) else 0)
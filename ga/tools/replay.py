@@ -0,0 +1,45 @@
+"""
+Replays recorded matches (see `TRACE_DIR` in `driver.py`, and
+`game/trace.py`) with the current minigame rules, without any actor, and
+checks that every match still ends with the medals it was recorded with.
+A mismatch means the Python rules changed behaviour since the trace was
+recorded.
+
+Also reports replay throughput, which makes a trace a fixed workload for
+benchmarking the minigames.
+
+Run from the `ga/` directory:
+    python -m tools.replay path/to/trace.cgtr [more traces...]
+"""
+import sys
+import time
+
+from game.trace import read_trace
+from game.replay import replay_match
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    n_matches = 0
+    n_ticks = 0
+    mismatches = []
+    replay_time = 0.0
+    for path in sys.argv[1:]:
+        for match_i, match in enumerate(read_trace(path)):
+            start = time.perf_counter()
+            medals = replay_match(match)
+            replay_time += time.perf_counter() - start
+            n_matches += 1
+            n_ticks += len(match.actions)
+            if medals != match.medals:
+                mismatches.append( (path, match_i, match.seed) )
+
+    for path, match_i, seed in mismatches[:20]:
+        print(f"  mismatch: {path} match {match_i} (seed {seed})")
+    print(f"{n_matches} matches replayed, {len(mismatches)} mismatches")
+    if replay_time > 0:
+        print(f"{n_ticks / replay_time:,.0f} ticks/s, {n_matches / replay_time:,.1f} matches/s")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,70 @@
+"""
+Checks that archery's wind sampler (`random_winds` in
+`game/minigames/archery.py`) draws from the distribution of
+:const:`WIND_WEIGHTS`, and that it agrees draw-for-draw with the original
+linear-scan sampler it replaced, given the same seed.
+
+The fit is a chi-squared test over the strengths of non-zero weight; the
+critical value is that of 8 degrees of freedom at p = 0.001. A strength of
+zero weight must never be drawn.
+
+Run from the `ga/` directory:
+    python -m tools.wind_distribution [n_draws]
+"""
+import sys
+import random
+
+from game.minigames.archery import WIND_WEIGHTS, random_winds
+
+
+# chi-squared critical value, 8 degrees of freedom, p = 0.001
+CHI2_CRITICAL = 26.124
+
+
+def linear_scan_wind(rng: random.Random) -> int:
+    """ The original sampler, kept here as the reference. """
+    rand = rng.random()
+    total = sum(WIND_WEIGHTS)
+    weights = [ w / total for w in WIND_WEIGHTS ]
+    cur = 0
+    for i in range(len(weights)):
+        cur += weights[i]
+        if cur >= rand:
+            return i
+    return 0
+
+
+def chi_squared(counts: list, n_draws: int) -> float:
+    total = sum(WIND_WEIGHTS)
+    stat = 0.0
+    for count, weight in zip(counts, WIND_WEIGHTS):
+        if weight == 0:
+            continue
+        expected = n_draws * weight / total
+        stat += (count - expected) ** 2 / expected
+    return stat
+
+
+if __name__ == '__main__':
+    n_draws = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ok = True
+
+    counts = [ 0 ] * len(WIND_WEIGHTS)
+    for wind in random_winds(random.Random(0), n_draws):
+        counts[wind] += 1
+    stat = chi_squared(counts, n_draws)
+    print(f"counts: {counts}")
+    print(f"chi-squared: {stat:.2f} (critical {CHI2_CRITICAL})")
+    ok &= stat < CHI2_CRITICAL
+    for count, weight in zip(counts, WIND_WEIGHTS):
+        ok &= weight != 0 or count == 0
+
+    rng = random.Random(1)
+    reference = [ linear_scan_wind(rng) for _ in range(n_draws) ]
+    winds = random_winds(random.Random(1), n_draws)
+    mismatches = sum(a != b for a, b in zip(reference, winds))
+    print(f"draws differing from the linear-scan sampler: {mismatches} of {n_draws}")
+    ok &= mismatches == 0
+
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)